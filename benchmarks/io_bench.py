@@ -0,0 +1,175 @@
+"""Time session file I/O across row counts, column counts and formats.
+
+Usage (from the repository root):
+
+    python benchmarks/io_bench.py --rows 1000 10000 100000 --extra-columns 0 20 --formats csv xlsx
+    python benchmarks/io_bench.py --rows 1000 --compare benchmarks/results/io-20240705-143000.json
+
+Each grid cell measures ``helpers.write_data``, ``helpers.read_data`` and
+``SessionManager.add_record`` (the mean of one update of an existing card
+and one new card). Wall times are the median of ``--repeat`` runs; peak
+memory is taken in a separate tracemalloc pass so it does not distort the
+timings. Results are written as JSON under ``benchmarks/results/`` so runs
+can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from synthetic import generate_roster, load_mapping
+
+import openpyxl
+import pandas as pd
+
+from core.session_manager import SessionManager
+from utils.helpers import read_data, write_data
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def _peak_bytes(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_cell(workdir, rows, extra_columns, fmt, mapping, repeat):
+    roster = generate_roster(rows, mapping, extra_columns=extra_columns)
+    path = os.path.join(workdir, f"io {rows} {extra_columns}.{fmt}")
+    card_col = mapping["card_id"]
+    existing_card = roster[card_col].iloc[len(roster) // 2]
+
+    def write():
+        write_data(roster, path)
+
+    def read():
+        read_data(path)
+
+    def fresh_session():
+        # add_record appends the new card, so every run starts from a clean file.
+        write()
+        return SessionManager("io bench", {}, mapping, roster, session_path=path)
+
+    def add_record(sm):
+        sm.add_record({"card_id": existing_card, "attendance": "attend", "notes": "bench", "timestamp": "[00:00:00]"})
+        sm.add_record({
+            "card_id": "bench-new", "student_id": "0", "name": "Bench", "phone": "0",
+            "attendance": "attend", "notes": "", "timestamp": "[00:00:00]",
+        })
+
+    write()
+    cell = {
+        "rows": rows,
+        "columns": len(roster.columns),
+        "format": fmt,
+        "write_s": _timed(write, repeat),
+        "bytes_written": os.path.getsize(path),
+        "read_s": _timed(read, repeat),
+    }
+    add_times = []
+    for _ in range(repeat):
+        sm = fresh_session()
+        started = time.perf_counter()
+        add_record(sm)
+        add_times.append((time.perf_counter() - started) / 2)
+    cell["add_record_s"] = statistics.median(add_times)
+    cell["write_peak_bytes"] = _peak_bytes(write)
+    cell["read_peak_bytes"] = _peak_bytes(read)
+    sm = fresh_session()
+    cell["add_record_peak_bytes"] = _peak_bytes(lambda: add_record(sm))
+    return cell
+
+
+def run(rows_grid, extra_grid, formats, repeat):
+    mapping = load_mapping()
+    cells = []
+    with tempfile.TemporaryDirectory(prefix="io_bench_") as workdir:
+        for rows in rows_grid:
+            for extra_columns in extra_grid:
+                for fmt in formats:
+                    cell = measure_cell(workdir, rows, extra_columns, fmt, mapping, repeat)
+                    cells.append(cell)
+                    print_cell(cell)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "openpyxl": openpyxl.__version__,
+        },
+        "repeat": repeat,
+        "cells": cells,
+    }
+
+
+def print_cell(cell, baseline=None):
+    line = (
+        f"{cell['rows']:>7,} rows x {cell['columns']:>2} cols {cell['format']:<4}  "
+        f"write {cell['write_s'] * 1000:9.1f} ms  read {cell['read_s'] * 1000:9.1f} ms  "
+        f"add_record {cell['add_record_s'] * 1000:9.1f} ms  "
+        f"{cell['bytes_written'] / 1024:9.1f} KB  peak {max(cell['write_peak_bytes'], cell['read_peak_bytes']) / 2**20:7.1f} MB"
+    )
+    if baseline:
+        ratios = [
+            f"{key.split('_')[0]} x{cell[key] / baseline[key]:.2f}"
+            for key in ("write_s", "read_s", "add_record_s")
+            if baseline.get(key)
+        ]
+        line += "  vs baseline: " + ", ".join(ratios)
+    print(line)
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(c["rows"], c["columns"], c["format"]): c for c in baseline.get("cells", [])}
+    print(f"\nCompared with {baseline_path} ({baseline.get('created', 'unknown date')}):")
+    for cell in results["cells"]:
+        print_cell(cell, previous.get((cell["rows"], cell["columns"], cell["format"])))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--extra-columns", type=int, nargs="+", default=[0, 20], help="columns added beyond the mapped ones")
+    parser.add_argument("--formats", nargs="+", choices=["csv", "xlsx"], default=["csv", "xlsx"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/io-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.extra_columns, args.formats, args.repeat)
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"io-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Compare memory and load time of the roster held by a session.
+
+Usage (from the repository root):
+
+    python benchmarks/roster_memory.py --rows 1000 10000 100000
+
+For every roster size the tool builds the records the way ``SessionManager``
+used to (one dict of strings per student, via ``iterrows``) and the
+array-backed ``RosterStore`` that replaced them, from the same synthetic
+roster. Memory is what each structure still holds once built and the source
+table is dropped, measured with tracemalloc and reported per student; load
+time is the median of ``--repeat`` runs.
+"""
+import argparse
+import json
+import pickle
+import statistics
+import sys
+import time
+import tracemalloc
+
+from synthetic import generate_roster, load_mapping
+
+from core.roster_store import FIELDS, RosterStore
+
+
+def dict_records(df, mapping):
+    """One dict per student, as ``SessionManager.records`` was built."""
+    records = []
+    for _, row in df.iterrows():
+        records.append({field: row.get(mapping.get(field, field), "") for field in FIELDS})
+    return records
+
+
+def roster_store(df, mapping):
+    return RosterStore.from_frame(df, mapping)
+
+
+BUILDERS = {"dict records": dict_records, "roster store": roster_store}
+
+
+def _retained_bytes(builder, payload, mapping):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        # A fresh copy of the table, dropped after the build, so shared strings are counted.
+        df = pickle.loads(payload)
+        kept = builder(df, mapping)
+        del df
+        retained = tracemalloc.get_traced_memory()[0] - before
+        del kept
+        return retained
+    finally:
+        tracemalloc.stop()
+
+
+def _timed(build, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def run(rows_grid, repeat):
+    mapping = load_mapping()
+    results = []
+    for rows in rows_grid:
+        roster = generate_roster(rows, mapping)
+        payload = pickle.dumps(roster)
+        for label, builder in BUILDERS.items():
+            build = lambda: builder(roster, mapping)
+            entry = {
+                "rows": rows,
+                "structure": label,
+                "load_s": _timed(build, repeat),
+                "bytes": _retained_bytes(builder, payload, mapping),
+            }
+            entry["bytes_per_student"] = entry["bytes"] / rows if rows else 0.0
+            results.append(entry)
+            print_entry(entry)
+    return results
+
+
+def print_entry(entry):
+    print(
+        f"{entry['rows']:>7,} rows  {entry['structure']:<13}  load {entry['load_s'] * 1000:9.1f} ms  "
+        f"{entry['bytes'] / 2**20:8.1f} MB  {entry['bytes_per_student']:8.0f} B/student"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args(argv)
+    results = run(args.rows, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
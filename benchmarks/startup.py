@@ -0,0 +1,151 @@
+"""Measure dashboard import time and time to first paint.
+
+Usage (from the repository root):
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --import-budget-ms 400 --paint-budget-ms 1500
+
+Each measurement runs in a fresh interpreter so nothing is cached between
+runs. The import check also fails when a module that must stay lazy
+(pandas, openpyxl, the scan and settings windows) is pulled in by
+``ui.main_window``. First-paint timing builds the real ``App`` and needs a
+display; it is skipped when Tk cannot open one. The exit status is non-zero
+when a budget is exceeded or a lazy module leaks into startup, so the script
+can guard against regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+LAZY_MODULES = [
+    "pandas",
+    "openpyxl",
+    "core.session_manager",
+    "core.session_prefetch",
+    "core.roster_import",
+    "ui.scan_window",
+    "ui.settings_window",
+    "ui.past_sessions_window",
+    "ui.router_window",
+    "ui.session_viewer",
+    "ui.dialogs.session_summary_dialog",
+    "utils.folder_watcher",
+]
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import ui.main_window
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+PAINT_PROBE = """
+import json, time
+started = time.perf_counter()
+import customtkinter as ctk
+from ui.main_window import App
+ctk.set_appearance_mode("System")
+app = App()
+result = {}
+def painted():
+    result["first_paint"] = time.perf_counter() - started
+    app.after(0, settled)
+def settled():
+    # The logo is the first piece of deferred startup work to land.
+    if getattr(app, "logo_img", None) is None and time.perf_counter() - started < 10:
+        app.after(2, settled)
+        return
+    result["startup_done"] = time.perf_counter() - started
+    app.destroy()
+app.after_idle(painted)
+app.mainloop()
+print(json.dumps(result))
+"""
+
+
+def _run_probe(code):
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "probe failed"
+    return json.loads(proc.stdout.strip().splitlines()[-1]), None
+
+
+def heaviest_imports(limit):
+    """Top ``limit`` modules by cumulative import time under ``-X importtime``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ui.main_window"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        rows.append((int(parts[1]), parts[2].strip()))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=None)
+    parser.add_argument("--paint-budget-ms", type=float, default=None)
+    parser.add_argument("--top", type=int, default=10, help="list the N slowest imports")
+    args = parser.parse_args(argv)
+    failed = False
+
+    import_times, leaked = [], set()
+    for _ in range(args.runs):
+        result, error = _run_probe(IMPORT_PROBE)
+        if error:
+            print(f"Import probe failed: {error}")
+            return 1
+        import_times.append(result["seconds"] * 1000)
+        leaked.update(result["loaded"])
+    import_ms = statistics.median(import_times)
+    print(f"ui.main_window import: median {import_ms:.1f} ms over {args.runs} runs")
+    if leaked:
+        failed = True
+        print("  Loaded at startup but should be lazy: " + ", ".join(sorted(leaked)))
+    if args.import_budget_ms is not None and import_ms > args.import_budget_ms:
+        failed = True
+        print(f"  Over budget ({args.import_budget_ms:.0f} ms)")
+    print("  Slowest imports (cumulative):")
+    for cumulative_us, name in heaviest_imports(args.top):
+        print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+    paint_times, settle_times = [], []
+    for _ in range(args.runs):
+        result, error = _run_probe(PAINT_PROBE)
+        if error:
+            print(f"First paint skipped: {error}")
+            break
+        paint_times.append(result["first_paint"] * 1000)
+        settle_times.append(result["startup_done"] * 1000)
+    if paint_times:
+        paint_ms = statistics.median(paint_times)
+        print(f"Dashboard first paint: median {paint_ms:.1f} ms, deferred startup done {statistics.median(settle_times):.1f} ms")
+        if args.paint_budget_ms is not None and paint_ms > args.paint_budget_ms:
+            failed = True
+            print(f"  Over budget ({args.paint_budget_ms:.0f} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""Synthetic rosters and scan streams shared by the benchmark tools.
+
+Rosters follow the column names in ``Data archive/column_map.json`` so the
+generated files can be opened by the app exactly like an imported roster.
+"""
+import json
+import os
+import random
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+import pandas as pd
+
+from utils.helpers import MAPPING_FILE
+
+DEFAULT_MAPPING = {
+    "card_id": "Card ID",
+    "student_id": "Student ID",
+    "name": "Name",
+    "phone": "Phone",
+    "attendance": "Attendance Status",
+    "notes": "Note",
+    "timestamp": "Timestamp (e.g. 2024-07-05 14:30:00)",
+    "exam": "Exam 2 (Quiz)",
+    "homework": "Exam 1 (Homework)",
+}
+
+FIRST_NAMES = ["Ahmed", "Mohamed", "Omar", "Youssef", "Mariam", "Nour", "Salma", "Hana", "Karim", "Laila"]
+LAST_NAMES = ["Hassan", "Ali", "Ibrahim", "Mahmoud", "Saeed", "Fathy", "Mostafa", "Adel", "Kamal", "Nabil"]
+
+
+def load_mapping():
+    """Return the configured column map, falling back to the stock template."""
+    if os.path.exists(MAPPING_FILE):
+        with open(MAPPING_FILE) as f:
+            mapping = json.load(f)
+        if all(mapping.get(key) for key in DEFAULT_MAPPING):
+            return mapping
+    return dict(DEFAULT_MAPPING)
+
+
+def _grade(rng, missing_rate):
+    roll = rng.random()
+    if roll < missing_rate:
+        return ""
+    if roll < missing_rate * 1.3:
+        return "0"
+    return str(rng.randint(1, 20))
+
+
+def generate_roster(rows, mapping=None, *, seed=0, duplicate_rate=0.01, blank_card_rate=0.005,
+                    missing_grade_rate=0.15, extra_columns=0):
+    """Build a roster DataFrame of ``rows`` students as ``App.import_csv`` leaves it.
+
+    A ``duplicate_rate`` share of rows reuse another student's card, blank
+    cards become ``null N`` placeholders and ``missing_grade_rate`` of the
+    exam/homework cells are empty (with a smaller share of failing "0"s).
+    """
+    mapping = mapping or load_mapping()
+    rng = random.Random(seed)
+    cards = [f"{n:08d}" for n in rng.sample(range(10_000_000, 99_999_999), rows)]
+    null_counter = 1
+    for index in range(rows):
+        roll = rng.random()
+        if roll < blank_card_rate:
+            cards[index] = f"null {null_counter}"
+            null_counter += 1
+        elif index and roll < blank_card_rate + duplicate_rate:
+            cards[index] = cards[rng.randrange(index)]
+
+    columns = {
+        mapping["card_id"]: cards,
+        mapping["student_id"]: [str(100000 + index) for index in range(rows)],
+        mapping["name"]: [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(rows)],
+        mapping["phone"]: [f"01{rng.choice('0125')}{rng.randint(0, 99_999_999):08d}" for _ in range(rows)],
+        mapping["attendance"]: [""] * rows,
+        mapping["notes"]: [""] * rows,
+        mapping["timestamp"]: [""] * rows,
+        mapping["exam"]: [_grade(rng, missing_grade_rate) for _ in range(rows)],
+        mapping["homework"]: [_grade(rng, missing_grade_rate) for _ in range(rows)],
+    }
+    for extra in range(extra_columns):
+        columns[f"Extra {extra + 1}"] = [str(rng.randint(0, 9999)) for _ in range(rows)]
+    return pd.DataFrame(columns, dtype=str)
+
+
+def generate_scan_stream(roster, mapping=None, count=100, *, seed=0, repeat_rate=0.05, unknown_rate=0.02):
+    """Return ``count`` card IDs in the order a door line would present them.
+
+    Most taps are roster cards in random order; ``repeat_rate`` of them are
+    immediate double taps and ``unknown_rate`` are cards not on the roster.
+    """
+    mapping = mapping or load_mapping()
+    rng = random.Random(seed)
+    roster_cards = [card for card in roster[mapping["card_id"]].tolist() if not card.startswith("null")]
+    known = set(roster_cards)
+    rng.shuffle(roster_cards)
+    stream = []
+    cursor = 0
+    while len(stream) < count:
+        roll = rng.random()
+        if roll < unknown_rate or not roster_cards:
+            card = f"{rng.randint(10_000_000, 99_999_999):08d}"
+            if card in known:
+                continue
+            stream.append(card)
+        elif roll < unknown_rate + repeat_rate and stream:
+            stream.append(stream[-1])
+        else:
+            stream.append(roster_cards[cursor % len(roster_cards)])
+            cursor += 1
+    return stream
+
+
+def poisson_arrivals(count, rate, *, seed=0):
+    """Arrival times in seconds for ``count`` scans at ``rate`` scans per second."""
+    rng = random.Random(seed)
+    now, arrivals = 0.0, []
+    for _ in range(count):
+        now += rng.expovariate(rate)
+        arrivals.append(now)
+    return arrivals
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (``pct`` in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
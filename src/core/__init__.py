@@ -1,3 +1,10 @@
+from .event_log import EventLog
+from .gate_status import GateStatus
+from .grade_merge import GradeMergeError, merge_grades
+from .roster_store import RosterStore
+from .scan_dedupe import ScanDedupeCache
 from .session_manager import SessionManager
+from .session_router import SessionRouter
+from .student_registry import StudentRegistry
 
-__all__ = ["SessionManager"]
+__all__ = ["EventLog", "GateStatus", "GradeMergeError", "RosterStore", "ScanDedupeCache", "SessionManager", "SessionRouter", "StudentRegistry", "merge_grades"]
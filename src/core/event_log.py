@@ -0,0 +1,125 @@
+"""Append-only log of per-student scan actions.
+
+Each session gets a ``<session>.events.jsonl`` sidecar next to its session
+file. Actions (complete, override, deny, cancel, ...) are appended as one
+JSON line each, so recording an event never rewrites the session or grows a
+notes cell. The human-readable notes column is only rendered from the log
+when a session is exported.
+"""
+import json
+import os
+from datetime import datetime
+
+from utils.helpers import write_data
+
+EVENTS_SUFFIX = ".events.jsonl"
+
+ACTION_LABELS = {
+    "attend": "Attended",
+    "complete": "Completed {tasks} at center",
+    "override": "Attended with override (missing {tasks})",
+    "deny": "Denied Entry: No {tasks}",
+    "cancel": "Canceled",
+    "add_student": "Added manually",
+}
+
+
+def events_path_for(session_path):
+    return f"{os.path.splitext(session_path)[0]}{EVENTS_SUFFIX}"
+
+
+def _describe_tasks(tasks):
+    labels = {"exam": "Exam", "homework": "Homework"}
+    return " & ".join(labels.get(task, task.title()) for task in tasks)
+
+
+def render_event(event):
+    """Render one event as the ``[HH:MM:SS] ...`` line the notes column used to hold."""
+    tasks = _describe_tasks(event.get("missing") or []) or "requirements"
+    label = ACTION_LABELS.get(event.get("action"), str(event.get("action", "")).title()).format(tasks=tasks)
+    time_part = str(event.get("time", ""))[11:19]
+    line = f"[{time_part}] {label}." if time_part else f"{label}."
+    text = (event.get("text") or "").strip()
+    return f"{line} {text}" if text else line
+
+
+class EventLog:
+    def __init__(self, session_path):
+        self.path = events_path_for(session_path)
+
+    def append(self, card_id, action, *, missing=(), text="", at=None):
+        """Append one event; cost does not depend on how many events exist."""
+        return self.extend([(card_id, action, missing, text)], at=at)[0]
+
+    def extend(self, entries, at=None):
+        """Append ``(card_id, action, missing, text)`` entries with a single write."""
+        stamp = (at or datetime.now()).isoformat(timespec="seconds")
+        events = [
+            {"card_id": str(card_id), "time": stamp, "action": action, "missing": list(missing or []), "text": text or ""}
+            for card_id, action, missing, text in entries
+        ]
+        if events:
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write("".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events))
+        return events
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return []
+        events = []
+        with open(self.path, encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    # A torn last line after a crash should not hide the rest.
+                    continue
+        return events
+
+    def frame(self):
+        import pandas as pd
+
+        columns = ["card_id", "time", "action", "missing", "text"]
+        return pd.DataFrame(self.read(), columns=columns)
+
+    def counts(self, frame=None):
+        """Number of events per action, e.g. ``{"deny": 3, "override": 1}``."""
+        frame = self.frame() if frame is None else frame
+        if frame.empty:
+            return {}
+        return {action: int(count) for action, count in frame.groupby("action").size().items()}
+
+    def render_notes(self, frame=None):
+        """Map card ID to the rendered notes lines of its events, oldest first."""
+        frame = self.frame() if frame is None else frame
+        if frame.empty:
+            return {}
+        lines = frame.sort_values("time", kind="stable").apply(lambda row: render_event(row.to_dict()), axis=1)
+        return lines.groupby(frame["card_id"]).agg("\n".join).to_dict()
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def export_session(session_path, mapping, out_path):
+    """Write ``session_path`` to ``out_path`` with event lines appended to each student's notes."""
+    from core.session_store import read_session
+
+    df = read_session(session_path).fillna("")
+    card_col = mapping.get("card_id", "card_id")
+    notes_col = mapping.get("notes", "notes")
+    rendered = EventLog(session_path).render_notes()
+    if rendered and card_col in df.columns:
+        if notes_col not in df.columns:
+            df[notes_col] = ""
+        cards = df[card_col].astype(str).str.strip()
+        cards = cards.where(~cards.str.isdigit(), cards.str.zfill(8))
+        events = cards.map(rendered).fillna("")
+        notes = df[notes_col].astype(str).str.strip()
+        df[notes_col] = (notes + "\n" + events).where((notes != "") & (events != ""), notes + events)
+    write_data(df, out_path)
+    return out_path
@@ -0,0 +1,135 @@
+"""Compact per-student gate flags for the scan engine.
+
+Each row carries one byte of flags: missing exam, missing homework,
+attended, and blank exam / blank homework. A grade is missing for the gate
+when it is blank or a failing "0"; the stats strip and session summary
+count only blank grades, as they always have. The flags are computed for the whole roster with vectorized pandas
+when a session loads and then kept current one row at a time, so scan
+decisions and the stats strip never have to re-read grades from the table.
+"""
+import numpy as np
+
+MISSING_EXAM = 1
+MISSING_HOMEWORK = 2
+ATTENDED = 4
+BLANK_EXAM = 8
+BLANK_HOMEWORK = 16
+BLOCKED = MISSING_EXAM | MISSING_HOMEWORK
+
+TASK_FLAGS = (("exam", MISSING_EXAM), ("homework", MISSING_HOMEWORK))
+BLANK_FLAGS = {"exam": BLANK_EXAM, "homework": BLANK_HOMEWORK}
+
+
+def _text(series):
+    return series.fillna("").astype(str).str.strip()
+
+
+def grade_blank(value):
+    text = "" if value is None else str(value).strip()
+    return text == "" or text.lower() == "nan"
+
+
+def grade_missing(value):
+    """A grade counts as missing when it is blank or a failing "0"."""
+    return grade_blank(value) or str(value).strip() == "0"
+
+
+class GateStatus:
+    def __init__(self, restrictions):
+        self.restrictions = dict(restrictions or {})
+        self._index = {}
+        self._flags = bytearray()
+
+    @classmethod
+    def from_frame(cls, df, keys, mapping, restrictions):
+        """Build flags for ``df`` rows, one per entry of ``keys`` (same order)."""
+        gate = cls(restrictions)
+        flags = np.zeros(len(df), dtype=np.uint8)
+        for task, bit in TASK_FLAGS:
+            if not gate.restrictions.get(task):
+                continue
+            column = mapping.get(task, task)
+            if column in df.columns:
+                grades = _text(df[column])
+                blank = (grades == "") | (grades.str.lower() == "nan")
+                flags[(blank | (grades == "0")).to_numpy()] |= bit
+                flags[blank.to_numpy()] |= BLANK_FLAGS[task]
+            else:
+                flags |= bit | BLANK_FLAGS[task]
+        att_col = mapping.get("attendance", "attendance")
+        if att_col in df.columns:
+            flags[(_text(df[att_col]).str.lower() == "attend").to_numpy()] |= ATTENDED
+        gate._flags = bytearray(flags.tobytes())
+        gate._index = {key: pos for pos, key in enumerate(keys)}
+        return gate
+
+    def _compute(self, exam, homework, attendance):
+        flags = 0
+        for (task, bit), value in zip(TASK_FLAGS, (exam, homework)):
+            if self.restrictions.get(task) and grade_missing(value):
+                flags |= bit
+                if grade_blank(value):
+                    flags |= BLANK_FLAGS[task]
+        if str(attendance or "").strip().lower() == "attend":
+            flags |= ATTENDED
+        return flags
+
+    def set_row(self, key, *, exam="", homework="", attendance=""):
+        """Add ``key`` or recompute all of its flags from raw values."""
+        flags = self._compute(exam, homework, attendance)
+        pos = self._index.get(key)
+        if pos is None:
+            self._index[key] = len(self._flags)
+            self._flags.append(flags)
+        else:
+            self._flags[pos] = flags
+
+    def set_attended(self, key, attended):
+        pos = self._index.get(key)
+        if pos is None:
+            return
+        if attended:
+            self._flags[pos] |= ATTENDED
+        else:
+            self._flags[pos] &= ~ATTENDED & 0xFF
+
+    def set_grades(self, key, *, exam=None, homework=None):
+        pos = self._index.get(key)
+        if pos is None:
+            return
+        for task, bit, value in (("exam", MISSING_EXAM, exam), ("homework", MISSING_HOMEWORK, homework)):
+            if value is None:
+                continue
+            self._flags[pos] &= ~(bit | BLANK_FLAGS[task]) & 0xFF
+            if self.restrictions.get(task) and grade_missing(value):
+                self._flags[pos] |= bit
+                if grade_blank(value):
+                    self._flags[pos] |= BLANK_FLAGS[task]
+
+    def flags(self, key):
+        pos = self._index.get(key)
+        return 0 if pos is None else self._flags[pos]
+
+    def missing_tasks(self, key):
+        flags = self.flags(key)
+        return [task for task, bit in TASK_FLAGS if flags & bit]
+
+    def is_blocked(self, key):
+        return bool(self.flags(key) & BLOCKED)
+
+    def keys_with(self, mask):
+        """Keys whose flags share any bit with ``mask``."""
+        array = np.frombuffer(bytes(self._flags), dtype=np.uint8)
+        hits = set(np.flatnonzero(array & mask).tolist())
+        return [key for key, pos in self._index.items() if pos in hits]
+
+    def counts(self):
+        array = np.frombuffer(bytes(self._flags), dtype=np.uint8)
+        return {
+            "total": len(self._index),
+            "attended": int(np.count_nonzero(array & ATTENDED)),
+            # Blank grades only, as the stats strip has always counted them.
+            "missing_exam": int(np.count_nonzero(array & BLANK_EXAM)),
+            "missing_hw": int(np.count_nonzero(array & BLANK_HOMEWORK)),
+            "blocked": int(np.count_nonzero(array & BLOCKED)),
+        }
@@ -0,0 +1,95 @@
+"""Merge exam and homework grades from a grading sheet into a session table.
+
+The grading sheet is joined to the session with one vectorized merge, on
+card ID when the sheet has a card column and on student ID otherwise.
+Only non-blank grades overwrite the session; blank cells in the sheet leave
+the existing value alone.
+"""
+import pandas as pd
+
+KEY_ALIASES = {
+    "card_id": ["card_id", "card id", "card", "card no", "card number"],
+    "student_id": ["student_id", "student id", "id", "student no", "student number"],
+}
+GRADE_ALIASES = {
+    "exam": ["exam", "exam grade", "exam_grade", "exam score"],
+    "homework": ["homework", "hw", "h.w.", "homework grade", "homework_grade"],
+}
+
+
+class GradeMergeError(ValueError):
+    """The grading sheet cannot be matched against the session."""
+
+
+def _find_column(columns, mapped, aliases):
+    lookup = {str(col).strip().lower(): col for col in columns}
+    for name in [mapped, *aliases]:
+        if name and str(name).strip().lower() in lookup:
+            return lookup[str(name).strip().lower()]
+    return None
+
+
+def _normalize_keys(series, pad):
+    keys = series.fillna("").astype(str).str.strip()
+    keys = keys.str.replace(r"\.0$", "", regex=True)
+    if pad:
+        keys = keys.where(~keys.str.isdigit(), keys.str.zfill(8))
+    return keys
+
+
+def detect_columns(grades_df, mapping):
+    """Return ``(key, key_column, {task: grade_column})`` for ``grades_df``."""
+    grade_cols = {}
+    for task, aliases in GRADE_ALIASES.items():
+        column = _find_column(grades_df.columns, mapping.get(task, task), aliases)
+        if column is not None:
+            grade_cols[task] = column
+    if not grade_cols:
+        raise GradeMergeError("The grade file has no exam or homework column.")
+    for key in ("card_id", "student_id"):
+        column = _find_column(grades_df.columns, mapping.get(key, key), KEY_ALIASES[key])
+        if column is not None:
+            return key, column, grade_cols
+    raise GradeMergeError("The grade file needs a card ID or student ID column to match students.")
+
+
+def merge_grades(session_df, grades_df, mapping):
+    """Merge ``grades_df`` into a copy of ``session_df``.
+
+    Returns ``(merged_df, changes, unmatched)``. ``changes`` has one row per
+    updated student with its normalized card ID and the new grade columns
+    (``exam``/``homework``); ``unmatched`` counts grade rows with no student.
+    """
+    key, grade_key_col, grade_cols = detect_columns(grades_df, mapping)
+    session_key_col = mapping.get(key, key)
+    if session_key_col not in session_df.columns:
+        raise GradeMergeError(f"The session has no '{session_key_col}' column to match on.")
+
+    pad = key == "card_id"
+    grades = pd.DataFrame({"_key": _normalize_keys(grades_df[grade_key_col], pad)})
+    for task, column in grade_cols.items():
+        grades[task] = grades_df[column].fillna("").astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+    grades = grades[grades["_key"] != ""].drop_duplicates("_key", keep="last")
+
+    merged = session_df.copy()
+    session_keys = _normalize_keys(merged[session_key_col], pad)
+    joined = pd.DataFrame({"_key": session_keys}).merge(grades, on="_key", how="left")
+    joined.index = merged.index
+
+    changed = pd.Series(False, index=merged.index)
+    for task in grade_cols:
+        target = mapping.get(task, task)
+        if target not in merged.columns:
+            merged[target] = ""
+        current = merged[target].fillna("").astype(str).str.strip()
+        incoming = joined[task].fillna("")
+        update = (incoming != "") & (incoming != current)
+        merged.loc[update, target] = incoming[update]
+        changed |= update
+
+    card_col = mapping.get("card_id", "card_id")
+    changes = pd.DataFrame({"card_id": _normalize_keys(merged[card_col], True) if card_col in merged.columns else ""}, index=merged.index)
+    for task in grade_cols:
+        changes[task] = merged[mapping.get(task, task)].fillna("").astype(str)
+    unmatched = int((~grades["_key"].isin(session_keys)).sum())
+    return merged, changes[changed], unmatched
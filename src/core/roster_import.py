@@ -0,0 +1,241 @@
+"""Chunked, cancellable import of large roster files.
+
+A roster is read in windows of ``CHUNK_ROWS`` rows (``chunksize`` for CSV,
+openpyxl's read-only row stream for XLSX) so the reader never holds more
+than a few chunks of raw text. Each chunk is normalized (card IDs padded,
+attendance and timestamp cleared) and the finished chunks are concatenated
+once into the final frame.
+
+A CSV big enough to pay for a process pool is cut into raw byte slices on
+row boundaries instead; each worker parses and normalizes its slice, so the
+parent neither parses the file nor pickles DataFrames out to the workers.
+
+Blank card IDs become ``null 1``, ``null 2``, … in file order. Chunks are
+normalized independently, so the numbers are assigned here, in order, as
+each chunk comes back.
+"""
+import io
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils.helpers import read_data
+
+CHUNK_ROWS = 20_000
+# CSVs shorter than this are read in-process: starting spawn workers (each
+# imports pandas) costs more than parsing this many rows on several cores.
+PARALLEL_MIN_ROWS = 500_000
+MAX_WORKERS = 4
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+def count_rows(path):
+    """Data rows in ``path`` (a cheap estimate for progress), or ``None`` when unknown."""
+    if path.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        try:
+            max_row = workbook.worksheets[0].max_row
+        finally:
+            workbook.close()
+        return max(max_row - 1, 0) if max_row else None
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def _cell_text(value):
+    if value is None:
+        return None
+    text = str(value)
+    return text if text else None
+
+
+def _iter_xlsx_chunks(path, chunksize):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else f"Unnamed: {index}" for index, name in enumerate(header)]
+        width = len(columns)
+        window = []
+        for row in rows:
+            values = [_cell_text(value) for value in row[:width]]
+            # Spreadsheet rows with nothing in them are skipped, as read_excel does.
+            if not any(value is not None for value in values):
+                continue
+            values.extend([None] * (width - len(values)))
+            window.append(values)
+            if len(window) == chunksize:
+                yield pd.DataFrame(window, columns=columns, dtype=object)
+                window = []
+        if window:
+            yield pd.DataFrame(window, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+
+def iter_chunks(path, chunksize=CHUNK_ROWS):
+    """Yield ``path`` as text DataFrames of at most ``chunksize`` rows."""
+    if path.lower().endswith(".xlsx"):
+        yield from _iter_xlsx_chunks(path, chunksize)
+        return
+    with pd.read_csv(path, dtype=str, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def _first_row_end(data):
+    """End of the first complete row in ``data``, or ``None``.
+
+    ``data`` starts on a row boundary. A newline ends a row only outside
+    quotes, i.e. after an even number of quote characters (``""`` escapes).
+    """
+    end = data.find(b"\n")
+    while end >= 0:
+        if data.count(b'"', 0, end) % 2 == 0:
+            return end + 1
+        end = data.find(b"\n", end + 1)
+    return None
+
+
+def _last_row_end(data):
+    """End of the last complete row in ``data``, or ``None``; see ``_first_row_end``."""
+    end = len(data)
+    while True:
+        end = data.rfind(b"\n", 0, end)
+        if end < 0:
+            return None
+        if data.count(b'"', 0, end) % 2 == 0:
+            return end + 1
+
+
+def iter_csv_slices(path, slice_bytes):
+    """Yield ``(header, body)`` byte slices of a CSV, each holding whole rows."""
+    header = None
+    pending = b""
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(slice_bytes), b""):
+            data = pending + block
+            if header is None:
+                end = _first_row_end(data)
+                if end is None:
+                    pending = data
+                    continue
+                header, data = data[:end], data[end:]
+            end = _last_row_end(data)
+            if end is None:
+                pending = data
+                continue
+            yield header, data[:end]
+            pending = data[end:]
+    if header is None:
+        return
+    if pending.strip():
+        yield header, pending
+
+
+def parse_slice(header, body, card_col, clear_cols):
+    """Worker half of a pooled import: parse one slice of rows and normalize it."""
+    chunk = pd.read_csv(io.BytesIO(header + body), dtype=str)
+    return normalize_chunk(chunk, card_col, clear_cols)
+
+
+def normalize_chunk(chunk, card_col, clear_cols):
+    """Pad numeric card IDs to 8 digits and blank ``clear_cols``; blank card IDs are left NaN."""
+    if card_col in chunk.columns:
+        cards = chunk[card_col].astype("string").str.strip()
+        cards = cards.mask(cards.eq("") | cards.str.lower().eq("nan"))
+        digits = cards.str.isdigit().fillna(False).astype(bool)
+        cards = cards.mask(digits, cards.str.zfill(8))
+        chunk[card_col] = cards.astype(object).where(cards.notna(), None)
+    for column in clear_cols:
+        if column in chunk.columns:
+            chunk[column] = ""
+    return chunk
+
+
+def _number_blank_cards(chunk, card_col, next_null):
+    if card_col not in chunk.columns:
+        return next_null
+    blanks = chunk[card_col].isna().to_numpy()
+    count = int(blanks.sum())
+    if count:
+        chunk.loc[blanks, card_col] = [f"null {number}" for number in range(next_null, next_null + count)]
+    return next_null + count
+
+
+def import_roster(path, mapping, *, progress=None, cancelled=None, chunksize=CHUNK_ROWS):
+    """Read and normalize ``path``; returns the text DataFrame.
+
+    ``progress(done, total)`` is called after every chunk (``total`` may be
+    ``None``) and ``cancelled()`` is checked between chunks; when it
+    returns true, pending chunks are dropped and ``ImportCancelled`` raised.
+    """
+    card_col = mapping.get("card_id", "card_id")
+    clear_cols = [mapping.get("attendance", "attendance"), mapping.get("timestamp", "timestamp")]
+    total = count_rows(path)
+    workers = min(MAX_WORKERS, os.cpu_count() or 1)
+    pool = None
+    if workers > 1 and not path.lower().endswith(".xlsx") and total and total >= PARALLEL_MIN_ROWS:
+        # "spawn" everywhere: forking a process that runs Tk threads is not safe.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    chunks, pending = [], deque()
+    done = 0
+    next_null = 1
+
+    def collect(chunk):
+        nonlocal done, next_null
+        next_null = _number_blank_cards(chunk, card_col, next_null)
+        chunks.append(chunk)
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+
+    try:
+        if pool is None:
+            for chunk in iter_chunks(path, chunksize):
+                if cancelled and cancelled():
+                    raise ImportCancelled()
+                collect(normalize_chunk(chunk, card_col, clear_cols))
+        else:
+            # Slices of about ``chunksize`` rows, sized from the file's average row length.
+            slice_bytes = max(1 << 16, os.path.getsize(path) * chunksize // total)
+            for header, body in iter_csv_slices(path, slice_bytes):
+                if cancelled and cancelled():
+                    raise ImportCancelled()
+                pending.append(pool.submit(parse_slice, header, body, card_col, clear_cols))
+                # A bounded queue keeps only a few raw slices in memory while the reader runs ahead.
+                while len(pending) > 2 * workers:
+                    collect(pending.popleft().result())
+        while pending:
+            if cancelled and cancelled():
+                raise ImportCancelled()
+            collect(pending.popleft().result())
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    if not chunks:
+        # Header only: the plain reader gives the empty frame its columns.
+        return read_data(path)
+    df = pd.concat(chunks, ignore_index=True)
+    chunks.clear()
+    return df
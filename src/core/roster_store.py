@@ -0,0 +1,139 @@
+"""Compact, array-backed roster used by the session manager and scan window.
+
+A list of one dict per student repeats every key and keeps a separate
+string object per cell. ``RosterStore`` keeps one ``array("i")`` of codes per
+field plus the distinct values of that field, so attendance, grades and
+other repeated values are stored once, and each cell costs four bytes. A
+card → row numbers index makes lookups a single dict access.
+"""
+from array import array
+
+import pandas as pd
+
+from core.schema import factorize_text
+
+FIELDS = ("card_id", "student_id", "name", "phone", "attendance", "notes", "timestamp", "exam", "homework")
+
+
+def normalize_card(value):
+    """Card ID as scans are matched: missing values blank, digits zero padded to 8."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    text = str(value).strip()
+    if text.lower() == "nan":
+        return ""
+    return text.zfill(8) if text.isdigit() else text
+
+
+class RosterStore:
+    """Roster rows stored column-wise as interned value codes."""
+
+    def __init__(self, fields=FIELDS):
+        self.fields = tuple(fields)
+        self._codes = {field: array("i") for field in self.fields}
+        self._values = {field: [""] for field in self.fields}
+        # value -> code maps are built on first write to a field; most fields are only read.
+        self._positions = {}
+        # Rows per code, kept once has_value() has been asked about a field.
+        self._counts = {}
+        self._by_card = {}
+
+    @classmethod
+    def from_frame(cls, df, mapping, fields=FIELDS):
+        """Build a store from a session table, text or typed, with one factorize per column."""
+        store = cls(fields)
+        for field in store.fields:
+            column = mapping.get(field, field)
+            if column not in df.columns:
+                store._codes[field].frombytes(bytes(4 * len(df)))
+                continue
+            codes, uniques = factorize_text(df, column)
+            values = [""] + list(dict.fromkeys(value for value in uniques if value != ""))
+            positions = {value: code for code, value in enumerate(values)}
+            remap = pd.Series([positions[value] for value in uniques], dtype="int32").to_numpy()
+            store._codes[field].frombytes(remap[codes].astype("int32").tobytes() if len(codes) else b"")
+            store._values[field] = values
+        for row, card in enumerate(store.column("card_id")):
+            key = normalize_card(card)
+            if key:
+                store._by_card.setdefault(key, []).append(row)
+        return store
+
+    def __len__(self):
+        return len(self._codes[self.fields[0]])
+
+    def _positions_for(self, field):
+        positions = self._positions.get(field)
+        if positions is None:
+            positions = self._positions[field] = {value: code for code, value in enumerate(self._values[field])}
+        return positions
+
+    def _code(self, field, value):
+        value = "" if value is None else str(value).strip()
+        positions = self._positions_for(field)
+        code = positions.get(value)
+        if code is None:
+            code = positions[value] = len(self._values[field])
+            self._values[field].append(value)
+            if field in self._counts:
+                self._counts[field].append(0)
+        return code
+
+    def _counts_for(self, field):
+        counts = self._counts.get(field)
+        if counts is None:
+            counts = [0] * len(self._values[field])
+            for code in self._codes[field]:
+                counts[code] += 1
+            self._counts[field] = counts
+        return counts
+
+    def get(self, row, field):
+        return self._values[field][self._codes[field][row]]
+
+    def row(self, row):
+        return {field: self._values[field][self._codes[field][row]] for field in self.fields}
+
+    def column(self, field):
+        values = self._values[field]
+        return [values[code] for code in self._codes[field]]
+
+    def rows_for(self, card_id):
+        """Row numbers holding ``card_id`` (normalized like the scan window does)."""
+        return self._by_card.get(normalize_card(card_id), [])
+
+    def has_value(self, field, value):
+        if field not in self._codes:
+            return False
+        code = self._positions_for(field).get(str(value).strip())
+        # Code 0 is the blank value, which never counts as a match.
+        return bool(code) and self._counts_for(field)[code] > 0
+
+    def cards(self):
+        return self._by_card.keys()
+
+    def set(self, row, **values):
+        for field, value in values.items():
+            if field in self._codes:
+                code = self._code(field, value)
+                counts = self._counts.get(field)
+                if counts is not None:
+                    counts[self._codes[field][row]] -= 1
+                    counts[code] += 1
+                self._codes[field][row] = code
+
+    def append(self, values):
+        """Add a row from a ``{field: value}`` dict and return its row number."""
+        row = len(self)
+        for field in self.fields:
+            code = self._code(field, values.get(field, ""))
+            self._codes[field].append(code)
+            if field in self._counts:
+                self._counts[field][code] += 1
+        key = normalize_card(values.get("card_id", ""))
+        if key:
+            self._by_card.setdefault(key, []).append(row)
+        return row
+
+    def frame(self):
+        return pd.DataFrame({field: self.column(field) for field in self.fields})
@@ -0,0 +1,49 @@
+"""Short-lived suppression of repeated card taps."""
+import time
+
+
+class ScanDedupeCache:
+    """Remember recently accepted card IDs so double taps can be ignored.
+
+    A card is accepted once and every further tap within ``ttl`` seconds of
+    that first tap is reported as a repeat. Repeats do not extend the window,
+    so a student who keeps tapping is let through again once it expires.
+    """
+
+    PRUNE_THRESHOLD = 256
+
+    def __init__(self, ttl=3.0, clock=time.monotonic):
+        self.ttl = max(float(ttl or 0), 0.0)
+        self._clock = clock
+        self._seen = {}
+        self.suppressed = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def is_repeat(self, card_id):
+        """Return True if ``card_id`` was accepted less than ``ttl`` seconds ago."""
+        if not self.enabled or not card_id:
+            return False
+        now = self._clock()
+        accepted_at = self._seen.get(card_id)
+        if accepted_at is not None and now - accepted_at < self.ttl:
+            self.suppressed += 1
+            return True
+        self._seen[card_id] = now
+        if len(self._seen) > self.PRUNE_THRESHOLD:
+            self._prune(now)
+        return False
+
+    def forget(self, card_id):
+        """Drop ``card_id`` so its next tap is processed normally."""
+        self._seen.pop(card_id, None)
+
+    def clear(self):
+        self._seen.clear()
+
+    def _prune(self, now):
+        expired = [card for card, stamp in self._seen.items() if now - stamp >= self.ttl]
+        for card in expired:
+            del self._seen[card]
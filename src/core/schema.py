@@ -0,0 +1,168 @@
+"""Typed column schema for roster tables.
+
+``read_data`` loads every column as ``str`` so nothing is lost on the way in,
+but a roster held in memory for a whole session does not need that. The
+schema, driven by the template mapping, stores:
+
+* card IDs as nullable ``Int64`` (rendered back zero padded to 8 digits),
+* attendance as a categorical,
+* exam and homework grades as nullable ``Int64``,
+* timestamps as ``datetime64`` parsed once with the scan window's format.
+
+Any value that would not render back to exactly the same text (``"12.5"``
+as a grade, a card with letters, a hand-typed date) is kept verbatim in a
+per-column side table in ``df.attrs``, so ``to_strings`` gives back the
+original text for export.
+
+The schema is applied in place when a roster is imported. The scan path
+builds its ``RosterStore`` straight from the typed columns with
+``factorize_text``, which renders text once per distinct value instead of
+once per row; full text tables are only produced for writing files.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+TIMESTAMP_FORMAT = "%d/%m/%Y, %H:%M:%S"
+CARD_WIDTH = 8
+SCHEMA_ATTR = "schema"
+
+FIELD_KINDS = {
+    "card_id": "card",
+    "attendance": "category",
+    "exam": "grade",
+    "homework": "grade",
+    "timestamp": "timestamp",
+}
+
+
+def _to_card(text):
+    digits = text.str.fullmatch(r"\d{1,18}").fillna(False).astype(bool)
+    return pd.to_numeric(text.where(digits), errors="coerce").astype("Int64")
+
+
+def _from_card(values):
+    return values.astype("string").str.zfill(CARD_WIDTH)
+
+
+def _to_grade(text):
+    digits = text.str.fullmatch(r"-?\d{1,18}").fillna(False).astype(bool)
+    return pd.to_numeric(text.where(digits), errors="coerce").astype("Int64")
+
+
+def _from_grade(values):
+    return values.astype("string")
+
+
+def _to_timestamp(text):
+    return pd.to_datetime(text, format=TIMESTAMP_FORMAT, errors="coerce")
+
+
+def _from_timestamp(values):
+    return values.dt.strftime(TIMESTAMP_FORMAT).astype("string")
+
+
+def _to_category(text):
+    return text.astype("category")
+
+
+def _from_category(values):
+    return values.astype("string")
+
+
+CONVERTERS = {
+    "card": (_to_card, _from_card),
+    "grade": (_to_grade, _from_grade),
+    "timestamp": (_to_timestamp, _from_timestamp),
+    "category": (_to_category, _from_category),
+}
+
+
+def _text(series):
+    text = series.astype("string")
+    return text.mask(text.str.strip() == "")
+
+
+def schema_for(df, mapping):
+    """``{column: kind}`` for the mapped columns present in ``df``."""
+    schema = {}
+    for field, kind in FIELD_KINDS.items():
+        column = mapping.get(field, field)
+        if column in df.columns:
+            schema[column] = kind
+    return schema
+
+
+def apply_schema(df, mapping):
+    """Cast the mapped columns of a ``dtype=str`` table in place and return it; blank cells become missing values."""
+    columns = {}
+    for column, kind in schema_for(df, mapping).items():
+        to_typed, to_text = CONVERTERS[kind]
+        text = _text(df[column])
+        values = to_typed(text)
+        rendered = to_text(values)
+        # Keep anything the typed column cannot reproduce exactly.
+        lost = text.notna() & (rendered.fillna("") != text.fillna("")).astype(bool)
+        if lost.any() and kind != "category":
+            values = values.mask(lost)
+        df[column] = values
+        columns[column] = {"kind": kind, "side": {label: value for label, value in text[lost].items()}}
+    df.attrs[SCHEMA_ATTR] = columns
+    return df
+
+
+def to_strings(df):
+    """Copy of ``df`` with typed columns cast back to the text ``read_data`` would give."""
+    columns = df.attrs.get(SCHEMA_ATTR)
+    if not columns:
+        return df
+    out = df.copy()
+    out.attrs = {key: value for key, value in df.attrs.items() if key != SCHEMA_ATTR}
+    for column, spec in columns.items():
+        if column not in out.columns:
+            continue
+        text = CONVERTERS[spec["kind"]][1](out[column]).astype(object)
+        side = spec.get("side")
+        if side:
+            labels = [label for label in side if label in text.index]
+            text.loc[labels] = [side[label] for label in labels]
+        out[column] = text.where(text.notna(), float("nan"))
+    return out
+
+
+def _clean_text(series):
+    text = series.fillna("").astype(str).str.strip()
+    return text.mask(text.str.lower() == "nan", "")
+
+
+def factorize_text(df, column):
+    """``(codes, uniques)`` of ``df[column]`` as the text ``to_strings`` would give, blanks as ``""``.
+
+    Typed columns are factorized on their values, so only the distinct
+    values are rendered. ``uniques`` may repeat a text (a side table entry
+    equal to a rendered value); callers map codes through the text.
+    """
+    spec = (df.attrs.get(SCHEMA_ATTR) or {}).get(column)
+    if spec is None:
+        codes, uniques = pd.factorize(_clean_text(df[column]))
+        return codes, list(uniques)
+    codes, uniques = pd.factorize(df[column])
+    texts = _clean_text(pd.Series(CONVERTERS[spec["kind"]][1](pd.Series(uniques)), dtype=object)).tolist()
+    # Missing values (code -1) are blank.
+    codes = np.where(codes < 0, len(texts), codes)
+    texts.append("")
+    side = spec.get("side")
+    if side:
+        positions = df.index.get_indexer(list(side))
+        for position, value in zip(positions, side.values()):
+            if position >= 0:
+                codes[position] = len(texts)
+                texts.append(str(value).strip())
+    return codes, texts
+
+
+def schema_fingerprint(df):
+    """Stable text of the schema side tables, for content hashes of typed tables."""
+    columns = df.attrs.get(SCHEMA_ATTR) or {}
+    return json.dumps(columns, sort_keys=True, default=str)
@@ -0,0 +1,179 @@
+"""Monthly compressed archives for old session files.
+
+Sessions last modified before a cutoff are moved out of ``Sessions`` into
+``Data archive/sessions/YYYY-MM.zip`` (one archive per month of last
+modification) together with their event logs. ``index.json`` beside the
+archives lists every archived session, so the archive can be searched
+without opening any zip, and ``restore`` extracts just one member.
+Compact ``.session`` files keep referring to their roster snapshot, which
+stays in ``Data archive/rosters``.
+
+The long-running functions take ``progress(done, total)`` and
+``cancelled()`` callables so they can run on a ``BackgroundTask``.
+"""
+import json
+import os
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta
+
+from core.event_log import events_path_for
+from utils.helpers import SESSION_ARCHIVE_FOLDER, SESSION_EXTENSIONS, SESSIONS_FOLDER
+
+INDEX_FILE = "index.json"
+
+_lock = threading.Lock()
+
+
+def _index_path(folder):
+    return os.path.join(folder, INDEX_FILE)
+
+
+def load_index(folder=SESSION_ARCHIVE_FOLDER):
+    path = _index_path(folder)
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return []
+
+
+def _save_index(entries, folder):
+    os.makedirs(folder, exist_ok=True)
+    path = _index_path(folder)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(entries, handle, indent=2)
+    os.replace(tmp_path, path)
+
+
+def search(query="", folder=SESSION_ARCHIVE_FOLDER):
+    """Index entries whose session name contains ``query`` (case-insensitive), newest first."""
+    query = query.strip().lower()
+    entries = [entry for entry in load_index(folder) if query in entry["name"].lower()]
+    return sorted(entries, key=lambda entry: entry["modified"], reverse=True)
+
+
+def active_sessions(folder=SESSIONS_FOLDER):
+    """Session files in ``folder`` as ``(path, modified, size)``."""
+    files = []
+    if not os.path.isdir(folder):
+        return files
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            # Hidden files are temporary copies written while a session is saved.
+            if entry.is_file() and not entry.name.startswith(".") and entry.name.lower().endswith(SESSION_EXTENSIONS):
+                stats = entry.stat()
+                files.append((entry.path, stats.st_mtime, stats.st_size))
+    return files
+
+
+def _member_name(archive, filename):
+    names = set(archive.namelist())
+    if filename not in names:
+        return filename
+    base, ext = os.path.splitext(filename)
+    copy_no = 2
+    while f"{base} ({copy_no}){ext}" in names:
+        copy_no += 1
+    return f"{base} ({copy_no}){ext}"
+
+
+def archive_older_than(days, *, sessions_folder=SESSIONS_FOLDER, folder=SESSION_ARCHIVE_FOLDER, skip=(), progress=None, cancelled=None):
+    """Move sessions untouched for ``days`` days into monthly archives; returns how many moved.
+
+    Each file is compressed, the index updated, and only then the original
+    removed, so a cancel or crash part way leaves every session readable.
+    Paths in ``skip`` (sessions open for scanning) are never touched, and a
+    file written to after the job started is left where it is.
+    """
+    cutoff = time.time() - timedelta(days=days).total_seconds()
+    skip = {os.path.abspath(path) for path in skip}
+    candidates = sorted(
+        (item for item in active_sessions(sessions_folder) if item[1] < cutoff and os.path.abspath(item[0]) not in skip),
+        key=lambda item: item[1],
+    )
+    moved = 0
+    with _lock:
+        index = load_index(folder)
+        os.makedirs(folder, exist_ok=True)
+        for done, (path, modified, size) in enumerate(candidates):
+            if cancelled and cancelled():
+                break
+            try:
+                touched = os.stat(path).st_mtime != modified
+            except OSError:
+                touched = True
+            if touched:
+                # Reopened (or removed) since the job started; leave it alone.
+                if progress:
+                    progress(done + 1, len(candidates))
+                continue
+            month = datetime.fromtimestamp(modified).strftime("%Y-%m")
+            archive_name = f"{month}.zip"
+            events_path = events_path_for(path)
+            with zipfile.ZipFile(os.path.join(folder, archive_name), "a", compression=zipfile.ZIP_DEFLATED) as archive:
+                member = _member_name(archive, os.path.basename(path))
+                archive.write(path, member)
+                events_member = None
+                if os.path.exists(events_path):
+                    events_member = _member_name(archive, os.path.basename(events_path))
+                    archive.write(events_path, events_member)
+            index.append({
+                "name": os.path.splitext(os.path.basename(path))[0],
+                "filename": os.path.basename(path),
+                "archive": archive_name,
+                "member": member,
+                "events_member": events_member,
+                "modified": modified,
+                "size": size,
+                "archived": time.time(),
+            })
+            _save_index(index, folder)
+            os.remove(path)
+            if events_member:
+                os.remove(events_path)
+            moved += 1
+            if progress:
+                progress(done + 1, len(candidates))
+    return moved
+
+
+def restore(entry, *, sessions_folder=SESSIONS_FOLDER, folder=SESSION_ARCHIVE_FOLDER):
+    """Extract one archived session back into ``Sessions`` and drop it from the index."""
+    target = os.path.join(sessions_folder, entry["filename"])
+    if os.path.exists(target):
+        raise FileExistsError(f"A session named '{entry['filename']}' already exists.")
+    with _lock:
+        with zipfile.ZipFile(os.path.join(folder, entry["archive"])) as archive:
+            with archive.open(entry["member"]) as source, open(target, "wb") as handle:
+                handle.write(source.read())
+            if entry.get("events_member"):
+                with archive.open(entry["events_member"]) as source, open(events_path_for(target), "wb") as handle:
+                    handle.write(source.read())
+        os.utime(target, (entry["modified"], entry["modified"]))
+        index = [item for item in load_index(folder) if not (item["archive"] == entry["archive"] and item["member"] == entry["member"])]
+        _save_index(index, folder)
+    return target
+
+
+def delete_sessions(paths, *, progress=None, cancelled=None):
+    """Delete session files and their event logs; returns ``(deleted, failures)``."""
+    deleted, failures = 0, []
+    for done, path in enumerate(paths):
+        if cancelled and cancelled():
+            break
+        try:
+            os.remove(path)
+            events_path = events_path_for(path)
+            if os.path.exists(events_path):
+                os.remove(events_path)
+            deleted += 1
+        except OSError as exc:
+            failures.append(f"{os.path.basename(path)}: {exc}")
+        if progress:
+            progress(done + 1, len(paths))
+    return deleted, failures
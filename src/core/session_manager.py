@@ -1,67 +1,172 @@
 """Session management utilities."""
 import os
+import threading
 
 import pandas as pd
 
-from utils.helpers import SETTINGS, SESSIONS_FOLDER, read_data, write_data
+from core.grade_merge import merge_grades
+from core.roster_store import FIELDS, RosterStore
+from core.session_store import append_changes, is_delta_session, read_header, read_session, session_path_for
+from utils.helpers import SETTINGS, write_data
 
 class SessionManager:
-    def __init__(self, name, params, column_map, data_df):
+    def __init__(self, name, params, column_map, data_df, session_path=None):
         self.params       = params
         self.name         = name
         self.mapping      = column_map
         self.data_df      = data_df
-        self.records      = []
+        # Serializes session file rewrites between the UI thread and background merges.
+        self.io_lock      = threading.Lock()
+        # Batches written while a grade merge is running, replayed onto its result (full tables only).
+        self._merge_log   = None
         self.restrictions = SETTINGS["restrictions"]
-        # Use the correct extension based on SETTINGS
-        file_type = SETTINGS.get("file_type", "csv")
-        ext = "xlsx" if file_type == "xlsx" else "csv"
-        self.session_path = os.path.join(SESSIONS_FOLDER, f"{name}.{ext}")
+        if session_path is None:
+            # An existing session in any format, else the format chosen in SETTINGS
+            session_path = session_path_for(name)
+        self.session_path = session_path
+        # Delta sessions append change lines instead of rewriting the whole table.
+        self.is_delta     = is_delta_session(session_path)
+        # Only keep mapped columns
+        fields = [field for field in FIELDS if field not in ("exam", "homework") or self.restrictions.get(field)]
+        self.roster = RosterStore(fields)
         if os.path.exists(self.session_path):
-            df = read_data(self.session_path)
-            # Only keep mapped columns
-            mapped_keys = ["card_id", "student_id", "name", "phone", "attendance", "notes"]
-            if self.restrictions.get("exam"):
-                mapped_keys.append("exam")
-            if self.restrictions.get("homework"):
-                mapped_keys.append("homework")
-            self.records = []
-            for _, row in df.iterrows():
-                rec = {}
-                for k in mapped_keys:
-                    col = self.mapping.get(k, k)
-                    rec[k] = row.get(col, "")
-                self.records.append(rec)
+            self.roster = RosterStore.from_frame(read_session(self.session_path), self.mapping, fields)
 
     def add_record(self, rec):
-        df = read_data(self.session_path)
+        self.add_records([rec])
+
+    def add_records(self, batch):
+        """Apply every record in ``batch`` in memory and persist them with one write."""
+        if not batch:
+            return
+        with self.io_lock:
+            if self.is_delta:
+                self._append_records(batch)
+            else:
+                self._apply_records(batch)
+                if self._merge_log is not None:
+                    self._merge_log.append(batch)
+            self._update_roster(batch)
+
+    def _update_roster(self, batch):
+        for rec in batch:
+            values = {"attendance": rec["attendance"], "notes": rec["notes"]}
+            if rec.get("timestamp"):
+                values["timestamp"] = rec["timestamp"]
+            rows = self.roster.rows_for(rec["card_id"])
+            if rows:
+                for row in rows:
+                    self.roster.set(row, **values)
+            else:
+                self.roster.append({**rec, **values})
+
+    def _append_records(self, batch):
+        added = set()
+        att_col       = self.mapping.get("attendance", "attendance")
+        notes_col     = self.mapping.get("notes", "notes")
+        timestamp_col = self.mapping.get("timestamp", "timestamp")
+        changes = []
+        for rec in batch:
+            card_id = str(rec["card_id"])
+            values = {att_col: rec["attendance"], notes_col: rec["notes"]}
+            # An empty timestamp keeps the one already recorded.
+            if rec.get("timestamp"):
+                values[timestamp_col] = rec["timestamp"]
+            # Cards missing from the roster carry their identity so reads can add the row.
+            if not self.roster.rows_for(card_id) and card_id not in added:
+                for k in ("student_id", "name", "phone"):
+                    values[self.mapping.get(k, k)] = rec.get(k, "")
+                added.add(card_id)
+            changes.append((card_id, values))
+        append_changes(self.session_path, changes)
+
+    def _apply_records(self, batch):
+        self._write_table(self._apply_to_frame(read_session(self.session_path), batch))
+
+    def _write_table(self, df):
+        # Written beside the session and swapped in, so a reader outside io_lock never sees a partial file.
+        # The hidden name keeps the half-written copy out of the session lists.
+        folder, filename = os.path.split(self.session_path)
+        base, ext = os.path.splitext(filename)
+        tmp_path = os.path.join(folder, f".{base}.tmp{ext}")
+        write_data(df, tmp_path)
+        os.replace(tmp_path, self.session_path)
+
+    def _apply_to_frame(self, df, batch):
         card_col     = self.mapping.get("card_id", "card_id")
         att_col      = self.mapping.get("attendance", "attendance")
         notes_col    = self.mapping.get("notes", "notes")
         timestamp_col= self.mapping.get("timestamp", "timestamp")
-        mask = df[card_col].astype(str) == str(rec["card_id"])
+        # Row labels per card, built once so each record is a dict lookup instead of a column scan.
+        rows_by_card = df.groupby(df[card_col].astype(str)).groups if card_col in df.columns else {}
+        new_rows = {}
 
-        if mask.any():
-            # --- Preserve timestamp if already present ---
-            existing_timestamp = ""
-            if timestamp_col in df.columns:
-                existing_timestamp = df.loc[mask, timestamp_col].values[0]
-            # Only overwrite if rec["timestamp"] is not empty
-            if rec.get("timestamp"):
-                df.loc[mask, timestamp_col] = rec["timestamp"]
+        for rec in batch:
+            labels = rows_by_card.get(str(rec["card_id"]))
+            if labels is not None and len(labels):
+                # --- Preserve timestamp if already present ---
+                existing_timestamp = ""
+                if timestamp_col in df.columns:
+                    existing_timestamp = df.loc[labels, timestamp_col].values[0]
+                # Only overwrite if rec["timestamp"] is not empty
+                if rec.get("timestamp"):
+                    df.loc[labels, timestamp_col] = rec["timestamp"]
+                else:
+                    df.loc[labels, timestamp_col] = existing_timestamp
+                df.loc[labels, att_col]   = rec["attendance"]
+                df.loc[labels, notes_col] = rec["notes"]
+            elif str(rec["card_id"]) in new_rows:
+                row = new_rows[str(rec["card_id"])]
+                row[att_col]      = rec["attendance"]
+                row[notes_col]    = rec["notes"]
+                if rec.get("timestamp"):
+                    row[timestamp_col] = rec["timestamp"]
             else:
-                df.loc[mask, timestamp_col] = existing_timestamp
-            df.loc[mask, att_col]   = rec["attendance"]
-            df.loc[mask, notes_col] = rec["notes"]
-        else:
-            row = {col: "" for col in df.columns}
-            for k in ("card_id", "student_id", "name", "phone"):
-                col_name = self.mapping.get(k, k)
-                if col_name in df.columns:
-                    row[col_name] = rec.get(k, "")
-            row[att_col]      = rec["attendance"]
-            row[notes_col]    = rec["notes"]
-            row[timestamp_col]= rec.get("timestamp", "")
-            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+                row = {col: "" for col in df.columns}
+                for k in ("card_id", "student_id", "name", "phone"):
+                    col_name = self.mapping.get(k, k)
+                    if col_name in df.columns:
+                        row[col_name] = rec.get(k, "")
+                row[att_col]      = rec["attendance"]
+                row[notes_col]    = rec["notes"]
+                row[timestamp_col]= rec.get("timestamp", "")
+                new_rows[str(rec["card_id"])] = row
+
+        if new_rows:
+            df = pd.concat([df, pd.DataFrame(list(new_rows.values()))], ignore_index=True)
+        return df
+
+    def merge_grades(self, grades_df):
+        """Merge a grading sheet into the session file with one write.
 
-        write_data(df, self.session_path)
+        Returns ``(changes, unmatched)`` as produced by ``core.grade_merge.merge_grades``.
+        The read and the merge run without ``io_lock`` so scans keep being
+        saved meanwhile; the lock is only held for the final write, after
+        replaying any scans saved in between onto the merged table.
+        """
+        with self.io_lock:
+            self._merge_log = []
+        try:
+            df = read_session(self.session_path)
+            merged, changes, unmatched = merge_grades(df, grades_df, self.mapping)
+        except Exception:
+            with self.io_lock:
+                self._merge_log = None
+            raise
+        with self.io_lock:
+            replay, self._merge_log = self._merge_log, None
+            if len(changes) and self.is_delta:
+                # Grade lines only touch grade columns, so scans appended meanwhile stay valid.
+                card_col = read_header(self.session_path).get("card_column", self.mapping.get("card_id", "card_id"))
+                grade_cols = [self.mapping.get(task, task) for task in ("exam", "homework") if task in changes.columns]
+                rows = merged.loc[changes.index, [card_col, *grade_cols]].fillna("").astype(str)
+                append_changes(self.session_path, [(row[0], dict(zip(grade_cols, row[1:]))) for row in rows.itertuples(index=False)])
+            elif len(changes):
+                for batch in replay:
+                    merged = self._apply_to_frame(merged, batch)
+                self._write_table(merged)
+            tasks = [task for task in ("exam", "homework") if task in changes.columns]
+            for rec in changes.to_dict("records"):
+                for row in self.roster.rows_for(rec["card_id"]):
+                    self.roster.set(row, **{task: rec[task] for task in tasks})
+        return changes, unmatched
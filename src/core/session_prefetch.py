@@ -0,0 +1,102 @@
+"""Prepare a session in the background before the user confirms it.
+
+While the setup dialog is open the likely session is resolved, its data
+loaded or staged and its roster index built on a worker thread. Nothing
+visible changes until ``commit``: a new full-spreadsheet session is written
+under ``Data archive/staging`` and moved into the sessions folder, and a new
+compact session only gets its header written. ``discard`` throws an unused
+preparation away.
+"""
+import os
+import uuid
+
+from core.roster_store import RosterStore
+from core.schema import to_strings
+from core.session_manager import SessionManager
+from core.session_store import create_session, is_delta_session, save_roster, session_path_for
+from utils.helpers import STAGING_FOLDER, write_data
+
+
+class PreparedSession:
+    def __init__(self, name, params, mapping, data_df, roster_id=None):
+        self.name = name
+        self.params = params
+        self.mapping = mapping
+        self.data_df = data_df
+        self.roster_id = roster_id
+        self.session_path = session_path_for(name)
+        self.existed = os.path.exists(self.session_path)
+        self.staged_path = None
+        self.manager = None
+        self._discarded = False
+
+    def matches(self, name, data_df):
+        """Still valid for session ``name`` started from ``data_df``."""
+        return (
+            self.manager is not None
+            and self.name == name
+            and self.data_df is data_df
+            and self.session_path == session_path_for(name)
+            and os.path.exists(self.session_path) == self.existed
+        )
+
+    def prepare(self, task=None):
+        """Worker-thread half: load or stage the data and build the roster index."""
+        if self.existed:
+            self.manager = SessionManager(self.name, self.params, self.mapping, self.data_df, session_path=self.session_path)
+            return self
+        if is_delta_session(self.session_path):
+            if self.roster_id is None:
+                self.roster_id = save_roster(self.data_df)
+        else:
+            # A unique name per preparation, so an abandoned worker never touches a newer one's file.
+            os.makedirs(STAGING_FOLDER, exist_ok=True)
+            staged_path = os.path.join(STAGING_FOLDER, f"{uuid.uuid4().hex[:8]} {os.path.basename(self.session_path)}")
+            self.staged_path = staged_path
+            write_data(to_strings(self.data_df), staged_path)
+            if self._discarded or (task is not None and task.cancelled):
+                # discard() may have run mid-write and cleared staged_path; the local still names the file.
+                _remove(staged_path)
+                return self
+        if self._discarded or (task is not None and task.cancelled):
+            return self
+        manager = SessionManager(self.name, self.params, self.mapping, self.data_df, session_path=self.session_path)
+        # Built from the typed columns directly; no text copy of the roster is made.
+        manager.roster = RosterStore.from_frame(self.data_df, self.mapping, manager.roster.fields)
+        self.manager = manager
+        return self
+
+    def commit(self):
+        """Tk-thread half: make a new session file visible and return the manager."""
+        if not self.existed:
+            if self.staged_path:
+                os.replace(self.staged_path, self.session_path)
+                self.staged_path = None
+            else:
+                card_col = self.mapping.get("card_id", "card_id")
+                create_session(self.session_path, self.roster_id, name=self.name, params=self.params, card_column=card_col)
+        return self.manager
+
+    def discard(self):
+        self._discarded = True
+        self.manager = None
+        if self.staged_path:
+            _remove(self.staged_path)
+        self.staged_path = None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def clear_staging():
+    """Remove staged copies left behind by an earlier run; call before any session is prepared."""
+    if not os.path.isdir(STAGING_FOLDER):
+        return
+    with os.scandir(STAGING_FOLDER) as entries:
+        for entry in entries:
+            if entry.is_file():
+                _remove(entry.path)
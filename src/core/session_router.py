@@ -0,0 +1,54 @@
+"""Combined card index for scanning several sessions from one reader."""
+
+
+class SessionRouter:
+    """Map normalized card IDs to the session(s) that own them, with their rows.
+
+    Sessions are registered under any hashable key together with their
+    ``{card_id: rows}`` index. ``route`` is one dict lookup and returns
+    ``(key, rows)`` pairs, so the owning session can show the rows without
+    looking the card up again. A card owned by more than one session is a
+    conflict and is returned with every owner so the caller can flag it
+    instead of guessing.
+    """
+
+    def __init__(self):
+        self._owners = {}
+        self._sessions = []
+
+    @property
+    def sessions(self):
+        return list(self._sessions)
+
+    def add_session(self, key, rows_by_card):
+        if key not in self._sessions:
+            self._sessions.append(key)
+        for card_id, rows in rows_by_card.items():
+            self.add_card(key, card_id, rows)
+
+    def add_card(self, key, card_id, rows=()):
+        if not card_id:
+            return
+        owners = self._owners.get(card_id, ())
+        if all(owner != key for owner, _ in owners):
+            self._owners[card_id] = (*owners, (key, rows))
+
+    def remove_session(self, key):
+        if key not in self._sessions:
+            return
+        self._sessions.remove(key)
+        for card_id, owners in list(self._owners.items()):
+            remaining = tuple(entry for entry in owners if entry[0] != key)
+            if len(remaining) == len(owners):
+                continue
+            if remaining:
+                self._owners[card_id] = remaining
+            else:
+                del self._owners[card_id]
+
+    def route(self, card_id):
+        """``(session, rows)`` pairs owning ``card_id``: empty when unknown, several on conflict."""
+        return self._owners.get(card_id, ())
+
+    def conflicts(self):
+        return {card_id: tuple(key for key, _ in owners) for card_id, owners in self._owners.items() if len(owners) > 1}
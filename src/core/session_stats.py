@@ -0,0 +1,87 @@
+"""Partial reads and cached summary figures for past session previews.
+
+A preview needs the first rows of a session and a few totals. The rows come
+from a partial read (``nrows``); the totals need the whole attendance
+column once, after which they are cached in ``Data archive`` keyed by the
+file's size and modification time, so scrolling back over a session costs
+one small read.
+"""
+import json
+import os
+import threading
+
+from core.session_store import is_delta_session, read_session
+from utils.helpers import SESSION_STATS_FILE, read_data
+
+PREVIEW_ROWS = 20
+
+
+def read_head(path, nrows=PREVIEW_ROWS):
+    """The first ``nrows`` rows of a session; spreadsheets are only partly parsed."""
+    if is_delta_session(path):
+        return read_session(path).head(nrows)
+    return read_data(path, nrows=nrows)
+
+
+def compute_stats(path, mapping):
+    att_col = mapping.get("attendance", "attendance")
+    if is_delta_session(path):
+        df = read_session(path)
+    else:
+        try:
+            df = read_data(path, usecols=[att_col])
+        except ValueError:
+            # No attendance column: read everything just to count the rows.
+            df = read_data(path)
+    attended = 0
+    if att_col in df.columns:
+        attended = int(df[att_col].fillna("").astype(str).str.strip().str.lower().eq("attend").sum())
+    return {"rows": len(df), "attended": attended}
+
+
+class SessionStatsCache:
+    """Summary figures per session file, invalidated when the file or the attendance column changes."""
+
+    def __init__(self, path=SESSION_STATS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    return json.load(handle)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    @staticmethod
+    def _signature(session_path, mapping):
+        stats = os.stat(session_path)
+        return [stats.st_size, stats.st_mtime, mapping.get("attendance", "attendance")]
+
+    def get(self, session_path, mapping):
+        """Cached figures for ``session_path``, computing and storing them on a miss."""
+        key = os.path.abspath(session_path)
+        signature = self._signature(session_path, mapping)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry.get("signature") == signature:
+            return entry["stats"]
+        stats = compute_stats(session_path, mapping)
+        with self._lock:
+            self._entries[key] = {"signature": signature, "stats": stats}
+            # Entries for deleted files are dropped whenever the cache is written.
+            self._entries = {path: value for path, value in self._entries.items() if os.path.exists(path)}
+            self._save(self._entries)
+        return stats
+
+    def _save(self, entries):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(entries, handle)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
@@ -0,0 +1,194 @@
+"""Compact session storage: shared roster snapshots plus per-session changes.
+
+A roster is stored once under ``Data archive/rosters`` as gzipped CSV text,
+named by the hash of its content, so every session started from the same import points at the
+same snapshot. A ``.session`` file holds a one-line JSON header (roster
+reference, name, params) followed by one JSON line per change::
+
+    {"card_id": "00012345", "set": {"Attendance": "attend", "Time": "..."}}
+
+Creating a session therefore writes only the header, and recording
+attendance appends a line. ``read_session`` rebuilds the full table for any
+session path (legacy ``.csv``/``.xlsx`` sessions are read as before) and
+``export_session_table`` writes it out as a normal spreadsheet.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from core.roster_store import normalize_card
+from core.schema import schema_fingerprint, to_strings
+from utils.helpers import ROSTERS_FOLDER, SESSION_EXTENSIONS, SESSIONS_FOLDER, SETTINGS, read_data, write_data
+
+DELTA_EXTENSION = ".session"
+FORMAT_TAG = "scanner-session"
+ROSTER_EXTENSION = ".csv.gz"
+
+_roster_lock = threading.Lock()
+_rosters = {}
+
+
+def is_delta_session(path):
+    return str(path).lower().endswith(DELTA_EXTENSION)
+
+
+def session_path_for(name):
+    """Existing file for session ``name`` in any format, else the path the current settings would create."""
+    for ext in SESSION_EXTENSIONS:
+        candidate = os.path.join(SESSIONS_FOLDER, f"{name}{ext}")
+        if os.path.exists(candidate):
+            return candidate
+    if SETTINGS.get("session_storage", "delta") == "delta":
+        ext = DELTA_EXTENSION
+    else:
+        ext = ".xlsx" if SETTINGS.get("file_type", "csv") == "xlsx" else ".csv"
+    return os.path.join(SESSIONS_FOLDER, f"{name}{ext}")
+
+
+def roster_id_for(df):
+    """Content hash of a roster table (values, column names and schema side tables)."""
+    digest = hashlib.sha256("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(schema_fingerprint(df).encode("utf-8"))
+    return digest.hexdigest()[:24]
+
+
+def _roster_path(roster_id):
+    return os.path.join(ROSTERS_FOLDER, f"{roster_id}{ROSTER_EXTENSION}")
+
+
+def save_roster(df):
+    """Store ``df`` once under its content hash and return the roster ID.
+
+    The snapshot is the roster's text as gzipped CSV, so it reads back on
+    any pandas version or on another machine; the typed form is rebuilt
+    from the template mapping when needed.
+    """
+    roster_id = roster_id_for(df)
+    path = _roster_path(roster_id)
+    if not os.path.exists(path):
+        os.makedirs(ROSTERS_FOLDER, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        to_strings(df).to_csv(tmp_path, index=False, compression="gzip")
+        os.replace(tmp_path, path)
+    with _roster_lock:
+        _rosters.setdefault(roster_id, df.copy())
+    return roster_id
+
+
+def load_roster(roster_id):
+    """A fresh copy of roster ``roster_id``; the snapshot is read from disk once per process."""
+    with _roster_lock:
+        df = _rosters.get(roster_id)
+    if df is None:
+        path = _roster_path(roster_id)
+        legacy_path = os.path.join(ROSTERS_FOLDER, f"{roster_id}.pkl")
+        if os.path.exists(path):
+            # Only empty cells are missing values; "NA" or "null" in a roster is text.
+            df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""], compression="gzip")
+        elif os.path.exists(legacy_path):
+            df = pd.read_pickle(legacy_path)
+        else:
+            raise FileNotFoundError(
+                f"Roster snapshot {roster_id} is missing from {ROSTERS_FOLDER}. "
+                f"Copy {os.path.basename(path)} from the computer that recorded this session."
+            )
+        with _roster_lock:
+            df = _rosters.setdefault(roster_id, df)
+    return df.copy()
+
+
+def create_session(path, roster_id, *, name, params=None, card_column="card_id"):
+    """Write the header of a new delta session; cost does not depend on roster size."""
+    header = {
+        "format": FORMAT_TAG,
+        "version": 1,
+        "roster": roster_id,
+        "name": name,
+        "params": params or {},
+        "card_column": card_column,
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(json.dumps(header, ensure_ascii=False) + "\n")
+    return path
+
+
+def read_header(path):
+    with open(path, encoding="utf-8") as handle:
+        header = json.loads(handle.readline() or "{}")
+    if header.get("format") != FORMAT_TAG:
+        raise ValueError(f"{os.path.basename(path)} is not a session file.")
+    return header
+
+
+def append_changes(path, changes):
+    """Append ``(card_id, {column: value})`` changes with a single write."""
+    lines = [json.dumps({"card_id": str(card_id), "set": values}, ensure_ascii=False) + "\n" for card_id, values in changes]
+    if lines:
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write("".join(lines))
+
+
+def _read_changes(path):
+    changes = []
+    with open(path, encoding="utf-8") as handle:
+        handle.readline()
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                changes.append(json.loads(line))
+            except ValueError:
+                # A torn last line after a crash should not hide the rest.
+                continue
+    return changes
+
+
+def apply_changes(df, changes, card_column):
+    """Apply change records to ``df``: the last value per card and column wins.
+
+    Cards on both sides are compared normalized (digits zero padded to 8),
+    the same way the roster store and scan window look them up.
+    """
+    if not changes:
+        return df
+    updates = pd.DataFrame([change.get("set", {}) for change in changes])
+    updates["_card"] = [normalize_card(change.get("card_id", "")) for change in changes]
+    latest = updates.groupby("_card", sort=False).last()
+    if card_column not in df.columns:
+        df[card_column] = ""
+    cards = df[card_column].fillna("").astype(str).str.strip()
+    cards = cards.where(~cards.str.isdigit(), cards.str.zfill(8))
+    known = cards.isin(latest.index)
+    for column in latest.columns:
+        if column not in df.columns:
+            df[column] = pd.NA
+        values = cards.map(latest[column])
+        df[column] = values.where(known & values.notna(), df[column])
+    new_cards = latest.index[~latest.index.isin(cards)]
+    if len(new_cards):
+        added = latest.loc[new_cards].reset_index().rename(columns={"_card": card_column})
+        df = pd.concat([df, added[[col for col in added.columns if col in df.columns]]], ignore_index=True)
+    return df
+
+
+def read_session(path):
+    """Full session table for ``path`` with every column as ``str`` (or NaN), like ``read_data``."""
+    if not is_delta_session(path):
+        return read_data(path)
+    header = read_header(path)
+    # Snapshots may be typed (see core.schema); changes are applied to the text form.
+    df = apply_changes(to_strings(load_roster(header["roster"])), _read_changes(path), header.get("card_column", "card_id"))
+    return df.astype(object).where(df.notna(), float("nan"))
+
+
+def export_session_table(path, out_path):
+    """Write the full table of any session to a normal ``.csv``/``.xlsx`` file."""
+    write_data(read_session(path), out_path)
+    return out_path
@@ -0,0 +1,176 @@
+"""Master registry of students across every imported roster.
+
+Each student gets a stable integer ``registry_id``. Card, student ID and
+phone are normalized (zero padded cards, case and whitespace folded IDs,
+phones reduced to their last 10 digits) and hashed to 64-bit keys with
+``pd.util.hash_pandas_object``, so a student imported by several centers
+with slightly different formatting resolves to the same row. ``upsert``
+handles a whole roster with vectorized joins and one write.
+
+The registry is stored as gzipped CSV with explicit column types, so it
+reads back on any pandas version. A file that cannot be read is moved aside
+with a warning and never overwritten.
+"""
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from utils.helpers import STUDENT_REGISTRY_FILE
+
+KEY_FIELDS = ("student_id", "card_id", "phone")
+DISPLAY_FIELDS = ("name", "card_id", "student_id", "phone")
+COLUMNS = [
+    "registry_id",
+    *(f"{field}_hash" for field in KEY_FIELDS),
+    *DISPLAY_FIELDS,
+    "source",
+    "first_seen",
+    "last_seen",
+]
+
+
+def _text(series):
+    text = series.fillna("").astype(str).str.strip()
+    return text.mask(text.str.lower() == "nan", "")
+
+
+def normalize_card(series):
+    cards = _text(series).str.replace(r"\.0$", "", regex=True)
+    # "null N" placeholders are generated per import and identify nobody.
+    cards = cards.mask(cards.str.lower().str.startswith("null "), "")
+    return cards.where(~cards.str.isdigit(), cards.str.zfill(8))
+
+
+def normalize_student_id(series):
+    return _text(series).str.replace(r"\.0$", "", regex=True).str.replace(r"\s+", "", regex=True).str.casefold()
+
+
+def normalize_phone(series):
+    return _text(series).str.replace(r"\.0$", "", regex=True).str.replace(r"\D", "", regex=True).str[-10:]
+
+
+NORMALIZERS = {"card_id": normalize_card, "student_id": normalize_student_id, "phone": normalize_phone}
+
+
+def _dtype(column):
+    if column.endswith("_hash"):
+        return "uint64"
+    return "int64" if column == "registry_id" else "object"
+
+
+def hash_keys(series):
+    """64-bit hash per normalized key; blank keys hash to 0."""
+    hashed = pd.util.hash_pandas_object(series, index=False).astype("uint64")
+    return hashed.where(series != "", 0).astype("uint64")
+
+
+class StudentRegistry:
+    def __init__(self, path=STUDENT_REGISTRY_FILE):
+        self.path = path
+        self.df = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                df = pd.read_csv(
+                    self.path,
+                    dtype={column: _dtype(column) for column in COLUMNS},
+                    keep_default_na=False,
+                    compression="gzip",
+                )
+                return df[COLUMNS]
+            except Exception as exc:
+                # Keep the unreadable file for recovery; the next save must not replace it.
+                stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                bad_path = f"{self.path}.unreadable-{stamp}"
+                os.replace(self.path, bad_path)
+                print(f"Warning: student registry could not be read ({exc}); moved to {bad_path}")
+        legacy_path = f"{os.path.splitext(os.path.splitext(self.path)[0])[0]}.pkl"
+        if os.path.exists(legacy_path):
+            try:
+                return pd.read_pickle(legacy_path)[COLUMNS]
+            except Exception as exc:
+                # The new file has another name, so the old pickle is left as it is.
+                print(f"Warning: old student registry {legacy_path} could not be read: {exc}")
+        return pd.DataFrame({column: pd.Series(dtype=_dtype(column)) for column in COLUMNS})
+
+    def __len__(self):
+        return len(self.df)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        self.df.to_csv(tmp_path, index=False, compression="gzip")
+        os.replace(tmp_path, self.path)
+
+    def _keys_frame(self, df, mapping):
+        keys = pd.DataFrame(index=df.index)
+        for field in DISPLAY_FIELDS:
+            column = mapping.get(field, field)
+            keys[field] = _text(df[column]) if column in df.columns else ""
+        for field in KEY_FIELDS:
+            keys[f"{field}_hash"] = hash_keys(NORMALIZERS[field](keys[field]))
+        keys["card_id"] = normalize_card(keys["card_id"])
+        return keys
+
+    def _match(self, keys):
+        """Registry IDs for ``keys`` (``<NA>`` where unknown).
+
+        Rows match on student ID, then card. Phone is only used for rows with
+        neither, since siblings often share a parent's number. A card or phone
+        match is rejected when both sides carry different student IDs.
+        """
+        ids = pd.Series(pd.NA, index=keys.index, dtype="Int64")
+        for field in KEY_FIELDS:
+            column = f"{field}_hash"
+            known = self.df[self.df[column] != 0].drop_duplicates(column, keep="last").set_index(column)
+            usable = keys[column] != 0
+            if field == "phone":
+                usable &= (keys["student_id_hash"] == 0) & (keys["card_id_hash"] == 0)
+            if field != "student_id":
+                known_student = keys[column].map(known["student_id_hash"]).fillna(0)
+                usable &= (keys["student_id_hash"] == 0) | (known_student == 0)
+            matched = keys[column].map(known["registry_id"]).astype("Int64")
+            ids = ids.fillna(matched.where(usable))
+        return ids
+
+    def upsert(self, df, mapping, source=""):
+        """Add or refresh every row of ``df``; returns ``(registry_ids, new_count)`` with one write."""
+        keys = self._keys_frame(df, mapping)
+        has_key = (keys[[f"{field}_hash" for field in KEY_FIELDS]] != 0).any(axis=1)
+        keys = keys[has_key]
+        ids = self._match(keys)
+
+        # Rows nobody matched become new students; repeats within the import share one ID.
+        fresh = ids.isna()
+        if fresh.any():
+            identity = keys.loc[fresh, "student_id_hash"]
+            for field in ("card_id", "phone"):
+                identity = identity.where(identity != 0, keys.loc[fresh, f"{field}_hash"])
+            codes, _ = pd.factorize(identity)
+            next_id = int(self.df["registry_id"].max()) + 1 if len(self.df) else 1
+            ids[fresh] = codes + next_id
+        new_count = int(ids[fresh].nunique()) if fresh.any() else 0
+
+        now = datetime.now().isoformat(timespec="seconds")
+        # Blank incoming values must not erase what is already known.
+        incoming = keys.assign(registry_id=ids.astype("int64"), source=source, last_seen=now).replace("", pd.NA)
+        registry = self.df.set_index("registry_id")
+        for frame in (incoming, registry):
+            for field in KEY_FIELDS:
+                # Nullable UInt64 keeps the full 64-bit hash; a float NaN mask would round it.
+                hashed = frame[f"{field}_hash"].astype("UInt64")
+                frame[f"{field}_hash"] = hashed.mask(hashed == 0)
+        # Several rows of one import may describe the same student; keep the latest non-blank value of each field.
+        incoming = incoming.groupby("registry_id").last()
+        registry = incoming.combine_first(registry)
+        registry["first_seen"] = registry["first_seen"].fillna(now).astype(object)
+        registry["last_seen"] = registry["last_seen"].astype(object)
+        for field in KEY_FIELDS:
+            registry[f"{field}_hash"] = registry[f"{field}_hash"].fillna(0).astype("uint64")
+        for field in (*DISPLAY_FIELDS, "source"):
+            registry[field] = registry[field].fillna("").astype(object)
+        self.df = registry.reset_index()[COLUMNS]
+        self.save()
+        return ids.reindex(df.index), new_count
@@ -1,17 +1,22 @@
 """Application entry point for the RFID Attendance Manager."""
-import customtkinter as ctk
-
-from ui.main_window import App
-
-ctk.set_appearance_mode("System")
-ctk.set_default_color_theme("blue")
+import multiprocessing
 
 
 def main() -> None:
     """Launch the CustomTkinter application."""
+    # Imported here, not at module level: import workers re-import this module
+    # when they start and must not pay for Tk and the whole UI.
+    import customtkinter as ctk
+
+    from ui.main_window import App
+
+    ctk.set_appearance_mode("System")
+    ctk.set_default_color_theme("blue")
     app = App()
     app.mainloop()
 
 
 if __name__ == "__main__":
+    # Large imports normalize in worker processes; frozen builds must let them start.
+    multiprocessing.freeze_support()
     main()
@@ -1,5 +1,6 @@
 from .add_student_dialog import AddStudentDialog
+from .export_dialog import export_session_with_notes
 from .session_setup_dialog import SessionSetupDialog
 from .session_summary_dialog import SessionSummaryDialog
 
-__all__ = ["AddStudentDialog", "SessionSetupDialog", "SessionSummaryDialog"]
+__all__ = ["AddStudentDialog", "SessionSetupDialog", "SessionSummaryDialog", "export_session_with_notes"]
@@ -0,0 +1,52 @@
+"""Save-as flow that exports a session with its event log rendered into the notes."""
+import os
+from tkinter import filedialog, messagebox
+
+from core.event_log import export_session
+from utils.background import BackgroundTask
+from utils.helpers import SETTINGS
+
+
+def export_session_with_notes(parent, session_path, mapping, on_finished=None):
+    """Ask where to save ``session_path`` and export it on a worker thread.
+
+    Deny, override and complete events live only in the session's event log,
+    so this is the one place a session gets them back in its notes column.
+    ``on_finished()`` runs once the export has ended, whatever the outcome.
+    Returns the running task, or ``None`` if nothing was started.
+    """
+    if not session_path or not os.path.exists(session_path):
+        messagebox.showerror("Export Failed", "The session file could not be located.", parent=parent)
+        return None
+    base, ext = os.path.splitext(os.path.basename(session_path))
+    if ext.lower() not in (".csv", ".xlsx"):
+        # Compact sessions are exported as a full spreadsheet.
+        ext = ".csv" if SETTINGS.get("file_type") == "csv" else ".xlsx"
+    out_path = filedialog.asksaveasfilename(
+        parent=parent,
+        title="Export Session",
+        initialdir=os.path.dirname(os.path.abspath(session_path)),
+        initialfile=f"{base}_export{ext}",
+        defaultextension=ext,
+        filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")],
+    )
+    if not out_path:
+        return None
+
+    def on_done(path):
+        if on_finished:
+            on_finished()
+        messagebox.showinfo("Export Complete", f"Session exported to:\n{path}", parent=parent)
+
+    def on_error(exc):
+        if on_finished:
+            on_finished()
+        messagebox.showerror("Export Failed", str(exc), parent=parent)
+
+    return BackgroundTask(
+        parent,
+        lambda _task: export_session(session_path, dict(mapping or {}), out_path),
+        on_done=on_done,
+        on_error=on_error,
+        name="session-export",
+    ).start()
@@ -4,13 +4,19 @@ from customtkinter import CTkButton, CTkComboBox, CTkEntry, CTkFrame, CTkLabel,
 
 from utils.helpers import MIN_SESSION_SETUP_SIZE, bring_window_to_front, ensure_initial_size
 
+# Fields must be still this long before the likely session is prepared.
+SETTLE_MS = 400
+
 class SessionSetupDialog(CTkToplevel):
-    def __init__(self, parent, stages, centers, has_data, callback):
+    def __init__(self, parent, stages, centers, has_data, callback, on_change=None):
         super().__init__(parent)
         self.parent = parent
         self.stages = stages
         self.centers = centers
         self.callback = callback
+        # Called with the would-be payload once the fields settle, so the caller can prepare it.
+        self.on_change = on_change
+        self._settle_job = None
         self.has_data = has_data
         self.title("Start New Session")
         self.resizable(False, False)
@@ -45,15 +51,16 @@ class SessionSetupDialog(CTkToplevel):
         ).grid(row=0, column=0, columnspan=2, sticky="ew", padx=16, pady=(16, 8))
 
         CTkLabel(self, text="Stage:").grid(row=1, column=0, sticky="w", padx=(16, 8), pady=(0, 4))
-        self.stage_cb = CTkComboBox(self, values=self.stages, state="readonly")
+        self.stage_cb = CTkComboBox(self, values=self.stages, state="readonly", command=lambda _v: self._schedule_change())
         self.stage_cb.grid(row=1, column=1, sticky="ew", padx=(0, 16), pady=(0, 4))
 
         CTkLabel(self, text="Center:").grid(row=2, column=0, sticky="w", padx=(16, 8), pady=(0, 4))
-        self.center_cb = CTkComboBox(self, values=self.centers, state="readonly")
+        self.center_cb = CTkComboBox(self, values=self.centers, state="readonly", command=lambda _v: self._schedule_change())
         self.center_cb.grid(row=2, column=1, sticky="ew", padx=(0, 16), pady=(0, 4))
 
         CTkLabel(self, text="Session No.:").grid(row=3, column=0, sticky="w", padx=(16, 8), pady=(0, 4))
         self.session_ent = CTkEntry(self)
+        self.session_ent.bind("<KeyRelease>", lambda _e: self._schedule_change(), add="+")
         self.session_ent.grid(row=3, column=1, sticky="ew", padx=(0, 16), pady=(0, 4))
 
         CTkLabel(
@@ -92,32 +99,54 @@ class SessionSetupDialog(CTkToplevel):
         # Temporarily disable initial focus setting to debug
         pass
 
-    def _on_submit(self):
+    def _collect_payload(self):
         stage = self.stage_cb.get().strip()
         center = self.center_cb.get().strip()
         session_no = self.session_ent.get().strip()
         if not stage or not center or not session_no.isdigit():
-            self.error_var.set("Select stage, center, and enter a numeric session number.")
-            return
-        self.error_var.set("")
-        payload = {
+            return None
+        return {
             "stage": stage,
             "center": center,
             "no": int(session_no),
             "name": f"{stage} {center} session {int(session_no)}"
         }
+
+    def _schedule_change(self):
+        if not self.on_change:
+            return
+        if self._settle_job is not None:
+            self.after_cancel(self._settle_job)
+        self._settle_job = self.after(SETTLE_MS, self._notify_change)
+
+    def _notify_change(self):
+        self._settle_job = None
+        payload = self._collect_payload()
+        if payload and self.on_change:
+            self.on_change(payload)
+
+    def _cancel_jobs(self):
         if self._focus_after_id:
             self.after_cancel(self._focus_after_id)
             self._focus_after_id = None
+        if self._settle_job is not None:
+            self.after_cancel(self._settle_job)
+            self._settle_job = None
+
+    def _on_submit(self):
+        payload = self._collect_payload()
+        if payload is None:
+            self.error_var.set("Select stage, center, and enter a numeric session number.")
+            return
+        self.error_var.set("")
+        self._cancel_jobs()
         if self.callback:
             self.callback(payload)
             self.callback = None
         self.destroy()
 
     def _on_cancel(self):
-        if self._focus_after_id:
-            self.after_cancel(self._focus_after_id)
-            self._focus_after_id = None
+        self._cancel_jobs()
         if self.callback:
             self.callback(None)
             self.callback = None
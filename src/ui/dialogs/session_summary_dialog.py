@@ -6,16 +6,25 @@ from tkinter import messagebox
 
 from customtkinter import CTkButton, CTkFrame, CTkLabel, CTkToplevel
 
+from ui.dialogs.export_dialog import export_session_with_notes
 from utils.helpers import MIN_SUMMARY_SIZE, bring_window_to_front, ensure_initial_size
+from utils.metrics import STAGE_LABELS
+
+EVENT_LABELS = {
+    "complete": "Completed at center",
+    "override": "Attended with override",
+    "deny": "Denied entry",
+}
 
 class SessionSummaryDialog(CTkToplevel):
-    def __init__(self, parent, *, session_name, summary, session_path, read_only=False):
+    def __init__(self, parent, *, session_name, summary, session_path, read_only=False, mapping=None):
         super().__init__(parent)
         self.parent = parent
         self.session_name = session_name
         self.summary = summary or {}
         self.session_path = session_path
         self.read_only = read_only
+        self.mapping = mapping or {}
 
         self.title("Session Summary")
         self.minsize(*MIN_SUMMARY_SIZE)
@@ -56,10 +65,25 @@ class SessionSummaryDialog(CTkToplevel):
         cancels = self.summary.get("cancellations")
         if cancels is not None:
             metrics.append(("Cancellations", f"{cancels:,}"))
+        repeats = self.summary.get("repeat_scans")
+        if repeats:
+            metrics.append(("Repeat taps ignored", f"{repeats:,}"))
         if "missing_exam" in self.summary:
             metrics.append(("Missing exam", f"{self.summary['missing_exam']:,}"))
         if "missing_hw" in self.summary:
             metrics.append(("Missing homework", f"{self.summary['missing_hw']:,}"))
+        events = self.summary.get("events") or {}
+        for action, label in EVENT_LABELS.items():
+            if events.get(action):
+                metrics.append((label, f"{events[action]:,}"))
+        latency = self.summary.get("latency") or {}
+        for stage, label in STAGE_LABELS.items():
+            stats = latency.get(stage)
+            if stats and stats.get("count"):
+                metrics.append((
+                    f"{label} latency (p50 / p95)",
+                    f"{stats['p50_ms']:.1f} / {stats['p95_ms']:.1f} ms over {stats['count']:,} runs",
+                ))
 
         for row_index, (label_text, value_text) in enumerate(metrics):
             row = CTkFrame(metrics_frame, fg_color="transparent")
@@ -76,15 +100,18 @@ class SessionSummaryDialog(CTkToplevel):
 
         actions = CTkFrame(container, fg_color="transparent")
         actions.grid(row=3, column=0, sticky="ew", pady=(24, 0))
-        actions.grid_columnconfigure((0, 1), weight=1, uniform="summary_actions")
+        actions.grid_columnconfigure((0, 1, 2), weight=1, uniform="summary_actions")
 
         self.view_button = CTkButton(actions, text="View File Location", command=self._open_location)
         self.view_button.grid(row=0, column=0, padx=(0, 12), sticky="ew")
+        self.export_button = CTkButton(actions, text="Export with Notes", command=self._export_with_notes)
+        self.export_button.grid(row=0, column=1, padx=(0, 12), sticky="ew")
         if not session_path:
             self.view_button.configure(state="disabled")
+            self.export_button.configure(state="disabled")
 
         close_button = CTkButton(actions, text="Close", command=self._on_close)
-        close_button.grid(row=0, column=1, sticky="ew")
+        close_button.grid(row=0, column=2, sticky="ew")
 
         ensure_initial_size(self, min_size=MIN_SUMMARY_SIZE)
         self.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -120,6 +147,16 @@ class SessionSummaryDialog(CTkToplevel):
         except Exception as exc:
             messagebox.showerror("Unable to open location", str(exc), parent=self)
 
+    def _export_with_notes(self):
+        self.export_button.configure(state="disabled")
+        task = export_session_with_notes(self, self.session_path, self.mapping, on_finished=self._on_export_finished)
+        if task is None:
+            self._on_export_finished()
+
+    def _on_export_finished(self):
+        if self.winfo_exists():
+            self.export_button.configure(state="normal")
+
     def _on_close(self):
         if hasattr(self.parent, "summary_window") and self.parent.summary_window is self:
             self.parent.summary_window = None
@@ -129,3 +166,5 @@ class SessionSummaryDialog(CTkToplevel):
             pass
         if self.winfo_exists():
             self.destroy()
+        if hasattr(self.parent, "show_next_summary"):
+            self.parent.show_next_summary()
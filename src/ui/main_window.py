@@ -1,35 +1,37 @@
-"""Primary application window for the RFID Attendance Manager."""
+"""Primary application window for the RFID Attendance Manager.
+
+Only CustomTkinter and the helpers are imported up front so the dashboard
+paints quickly. pandas, PIL and the secondary windows are imported where
+they are first used, and warmed up on a background thread after the first
+paint.
+"""
 import json
 import os
 import subprocess
 import sys
+import threading
 from datetime import datetime
 from tkinter import filedialog, messagebox
 
 import customtkinter as ctk
-from customtkinter import CTk, CTkButton, CTkFrame, CTkLabel
-from PIL import Image, ImageTk
-
-from core.session_manager import SessionManager
-from ui.dialogs.add_student_dialog import AddStudentDialog
-from ui.dialogs.session_setup_dialog import SessionSetupDialog
-from ui.dialogs.session_summary_dialog import SessionSummaryDialog
-from ui.past_sessions_window import PastSessionsWindow
-from ui.scan_window import ScanWindow
-from ui.settings_window import SettingsWindow
+from customtkinter import CTk, CTkButton, CTkFrame, CTkLabel, CTkProgressBar
+
 from utils.helpers import (
+    HOME_BG_FILE,
     LAST_DATA_FILE,
     LOGO_FILE,
     MAPPING_FILE,
     MIN_DASHBOARD_SIZE,
     SETTINGS,
+    SETTINGS_BG_FILE,
     SETTINGS_FILE,
+    SESSION_EXTENSIONS,
     SESSIONS_FOLDER,
     bring_window_to_front,
     ensure_initial_size,
-    read_data,
     write_data,
 )
+from utils.watchdog import EventLoopWatchdog
 
 class App(CTk):
     def __init__(self):
@@ -37,6 +39,11 @@ class App(CTk):
         self.title("RFID Attendance Manager")
         self.column_map = {}
         self.data_df    = None
+        self.data_roster_id = None
+        # Session prepared in the background while the setup dialog is open.
+        self._prefetch = None
+        self._prefetch_task = None
+        self._import_task = None
         self.settings_window = None  # <-- Track settings window
         self.data_panel = None
         self.data_rows_var = ctk.StringVar(value="")
@@ -44,7 +51,10 @@ class App(CTk):
         self.current_data_path = None
         self._session_setup = None
         self.past_sessions_window = None
+        self.router_window = None
         self.summary_window = None
+        # Summaries waiting for the one on screen to close (hub sessions ended together).
+        self._summary_queue = []
 
         if os.path.exists(MAPPING_FILE):
             with open(MAPPING_FILE) as f:
@@ -57,6 +67,63 @@ class App(CTk):
         width, height = ensure_initial_size(self, min_size=MIN_DASHBOARD_SIZE)
         self.minsize(width, height)
         self._load_last_data()
+        self._after_first_paint(self._finish_startup)
+
+        self.stall_watchdog = None
+        stall_threshold = SETTINGS.get("stall_threshold_ms", 100)
+        if stall_threshold:
+            self.stall_watchdog = EventLoopWatchdog(self, threshold_ms=stall_threshold)
+            self.stall_watchdog.start()
+
+    def _after_first_paint(self, callback):
+        """Run ``callback`` once the idle redraws queued so far have been drawn."""
+        self.after_idle(lambda: self.after(1, callback))
+
+    def _finish_startup(self):
+        from utils import assets
+        from utils.images import COMMON_SIZES, prewarm
+
+        assets.preload()
+        self._load_logo()
+        self._start_sessions_watcher()
+        self._refresh_recent_sessions()
+        screen = (self.winfo_screenwidth(), self.winfo_screenheight())
+        prewarm([HOME_BG_FILE, SETTINGS_BG_FILE], sizes=[*COMMON_SIZES, screen])
+        threading.Thread(target=self._prewarm_modules, name="prewarm-imports", daemon=True).start()
+
+    @staticmethod
+    def _prewarm_modules():
+        """Import the heavy modules off the UI thread so the first click is quick, then clear stale staging."""
+        try:
+            import pandas  # noqa: F401
+            import openpyxl  # noqa: F401
+            from PIL import Image  # noqa: F401
+            import core.session_manager  # noqa: F401
+            import ui.scan_window  # noqa: F401
+        except Exception:
+            pass
+        try:
+            from core.session_prefetch import clear_staging
+
+            # Nothing is prepared until the setup dialog opens, so leftovers from a crash can go.
+            clear_staging()
+        except Exception:
+            pass
+
+    def _load_logo(self):
+        from PIL import ImageTk
+
+        from utils.assets import get_image
+
+        name = os.path.basename(LOGO_FILE)
+        try:
+            logo = get_image(name)
+        except OSError:
+            return
+        ratio = 56 / logo.width if logo.width else 1
+        logo = get_image(name, (56, int(logo.height * ratio)))
+        self.logo_img = ImageTk.PhotoImage(logo)
+        self.logo_label.configure(image=self.logo_img, width=56)
 
     def _build_ui(self):
         self.main_frame = CTkFrame(self, corner_radius=0)
@@ -76,11 +143,10 @@ class App(CTk):
         header.grid(row=0, column=0, sticky="ew", pady=(0, 12))
         header.grid_columnconfigure(1, weight=1)
 
-        logo = Image.open(LOGO_FILE)
-        ratio = 56 / logo.width if logo.width else 1
-        logo = logo.resize((56, int(logo.height * ratio)), Image.LANCZOS)
-        self.logo_img = ImageTk.PhotoImage(logo)
-        CTkLabel(header, image=self.logo_img, text="").grid(row=0, column=0, sticky="w", padx=(0, 12))
+        # The logo is decoded after the first paint; reserve its width meanwhile.
+        self.logo_img = None
+        self.logo_label = CTkLabel(header, text="", width=56)
+        self.logo_label.grid(row=0, column=0, sticky="w", padx=(0, 12))
 
         title_holder = CTkFrame(header, fg_color="transparent")
         title_holder.grid(row=0, column=1, sticky="w")
@@ -107,6 +173,7 @@ class App(CTk):
             ("Start New Session", self.open_scan_window),
             ("View Past Sessions", self.view_past_sessions),
             ("Settings", self.open_settings),
+            ("Hub Scanning", self.open_router_window),
         ]
         self.dashboard_buttons = []
         for index, (label, handler) in enumerate(button_specs):
@@ -131,7 +198,6 @@ class App(CTk):
         self.status_label.grid(row=1, column=0, sticky="ew", pady=(16, 0))
 
         self._recent_session_paths = {}
-        self._refresh_recent_sessions()
 
     def _build_data_status_panel(self, parent):
         panel = CTkFrame(parent, fg_color=("#f2f3f5", "#1f2933"), corner_radius=12)
@@ -157,6 +223,14 @@ class App(CTk):
             justify="left",
             wraplength=520
         ).grid(row=2, column=0, sticky="ew", padx=16, pady=(0, 12))
+        # Shown only while a file is being imported.
+        self.import_frame = CTkFrame(panel, fg_color="transparent")
+        self.import_frame.grid(row=3, column=0, sticky="ew", padx=16, pady=(0, 12))
+        self.import_frame.grid_columnconfigure(0, weight=1)
+        self.import_bar = CTkProgressBar(self.import_frame)
+        self.import_bar.grid(row=0, column=0, sticky="ew", padx=(0, 12))
+        CTkButton(self.import_frame, text="Cancel", width=90, command=self._cancel_import).grid(row=0, column=1)
+        self.import_frame.grid_remove()
         panel.grid_remove()
         self.data_panel = panel
 
@@ -176,7 +250,9 @@ class App(CTk):
         self.current_data_path = None
 
 
-    def show_session_summary(self, *, session_name, summary, session_path, read_only=False):
+    def show_session_summary(self, *, session_name, summary, session_path, read_only=False, mapping=None):
+        from ui.dialogs.session_summary_dialog import SessionSummaryDialog
+
         if self.summary_window is not None and self.summary_window.winfo_exists():
             try:
                 self.summary_window.destroy()
@@ -188,33 +264,56 @@ class App(CTk):
             summary=summary,
             session_path=session_path,
             read_only=read_only,
+            mapping=mapping,
         )
 
+    def show_session_summaries(self, payloads):
+        """Show several session summaries one after another."""
+        self._summary_queue = list(payloads)
+        self.show_next_summary()
+
+    def show_next_summary(self):
+        if self._summary_queue:
+            self.show_session_summary(**self._summary_queue.pop(0))
+
     def set_status(self, message):
         if hasattr(self, "status_var"):
             self.status_var.set(message)
 
+    def _start_sessions_watcher(self):
+        from utils.folder_watcher import FolderWatcher
+
+        self.sessions_watcher = FolderWatcher(self, SESSIONS_FOLDER, self._on_sessions_changed, suffixes=SESSION_EXTENSIONS).start()
+
+    def _on_sessions_changed(self, changes):
+        """Apply coalesced Sessions folder changes to the open session lists."""
+        self._refresh_recent_sessions()
+        if self.past_sessions_window is not None and self.past_sessions_window.winfo_exists():
+            self.past_sessions_window.apply_changes(changes)
+
     def _refresh_recent_sessions(self):
         if not hasattr(self, "recent_tree"):
             return
-        for item in self.recent_tree.get_children():
-            self.recent_tree.delete(item)
-        self._recent_session_paths = {}
-        if not os.path.isdir(SESSIONS_FOLDER):
-            self._on_recent_select()
-            return
-        files = []
-        for entry in os.listdir(SESSIONS_FOLDER):
-            path_entry = os.path.join(SESSIONS_FOLDER, entry)
-            if os.path.isfile(path_entry) and entry.lower().endswith((".csv", ".xlsx")):
-                files.append((path_entry, os.path.getmtime(path_entry)))
-        files.sort(key=lambda item: item[1], reverse=True)
-        for index, (path_entry, modified) in enumerate(files[:10]):
+        from utils.folder_watcher import scan_folder
+
+        watcher = getattr(self, "sessions_watcher", None)
+        snapshot = watcher.snapshot if watcher is not None else scan_folder(SESSIONS_FOLDER, SESSION_EXTENSIONS)
+        newest = sorted(snapshot.items(), key=lambda item: item[1][0], reverse=True)[:10]
+        # Rows are updated in place; only rows beyond the new count are removed.
+        for index, (path_entry, (modified, _size)) in enumerate(newest):
             name = os.path.splitext(os.path.basename(path_entry))[0]
             stamp = datetime.fromtimestamp(modified).strftime("%d %b %Y %H:%M")
             iid = f"recent_{index}"
-            self.recent_tree.insert("", "end", iid=iid, values=(name, stamp))
+            if self.recent_tree.exists(iid):
+                self.recent_tree.item(iid, values=(name, stamp))
+            else:
+                self.recent_tree.insert("", "end", iid=iid, values=(name, stamp))
             self._recent_session_paths[iid] = path_entry
+        for index in range(len(newest), len(self._recent_session_paths)):
+            iid = f"recent_{index}"
+            if self.recent_tree.exists(iid):
+                self.recent_tree.delete(iid)
+            self._recent_session_paths.pop(iid, None)
         self._on_recent_select()
 
     def _on_recent_select(self, _event=None):
@@ -234,21 +333,44 @@ class App(CTk):
         return self._recent_session_paths.get(selection[0])
 
     def _open_session_path(self, path_entry, *, read_only=False):
+        if read_only:
+            return self._view_session_path(path_entry)
+        from core.session_manager import SessionManager
+        from ui.scan_window import ScanWindow
+
         try:
             name = os.path.splitext(os.path.basename(path_entry))[0]
-            df = read_data(path_entry)
-            sm = SessionManager(name, {}, self.column_map, df)
-            ScanWindow(self, sm, read_only=read_only)
-            if read_only:
-                self.set_status(f"Session '{name}' opened in view-only mode.")
-            else:
-                self.set_status(f"Session '{name}' opened.")
+            # The manager reads the session file itself.
+            sm = SessionManager(name, {}, self.column_map, None, session_path=path_entry)
+            ScanWindow(self, sm)
+            self.set_status(f"Session '{name}' opened.")
             return True
         except Exception as exc:
             messagebox.showerror("Open Failed", str(exc))
             self.set_status("Failed to open session.")
             return False
 
+    def _view_session_path(self, path_entry):
+        from ui.session_viewer import SessionViewer
+
+        try:
+            SessionViewer(self, path_entry, mapping=self.column_map)
+        except Exception as exc:
+            messagebox.showerror("Open Failed", str(exc))
+            self.set_status("Failed to open session.")
+            return False
+        self.set_status(f"Session '{os.path.splitext(os.path.basename(path_entry))[0]}' opened in view-only mode.")
+        return True
+
+    def open_session_paths(self):
+        """Absolute paths of the sessions open in scan windows (including hub-routed ones)."""
+        paths = set()
+        for child in self.winfo_children():
+            path_entry = getattr(getattr(child, "sm", None), "session_path", None)
+            if path_entry:
+                paths.add(os.path.abspath(path_entry))
+        return paths
+
     def _reveal_session_path(self, path_entry):
         try:
             if sys.platform.startswith("win"):
@@ -282,11 +404,36 @@ class App(CTk):
         if self.past_sessions_window is not None and self.past_sessions_window.winfo_exists():
             bring_window_to_front(self.past_sessions_window)
             return
+        from ui.past_sessions_window import PastSessionsWindow
+
         self.past_sessions_window = PastSessionsWindow(self)
         bring_window_to_front(self.past_sessions_window)
         self.set_status("Browsing past sessions.")
 
 
+    def open_router_window(self):
+        if self.router_window is not None and self.router_window.winfo_exists():
+            bring_window_to_front(self.router_window)
+            return
+        if not self.column_map:
+            messagebox.showwarning("No Template", "Please configure a template first.")
+            return
+        paths = filedialog.askopenfilenames(
+            title="Select sessions to scan together",
+            initialdir=SESSIONS_FOLDER,
+            filetypes=[("Session files", "*.session *.csv *.xlsx")]
+        )
+        if not paths:
+            return
+        from ui.router_window import RouterWindow
+
+        self.router_window = RouterWindow(self, list(paths))
+        if self.router_window.winfo_exists():
+            self.set_status(f"Hub scanning {len(self.router_window.windows)} sessions.")
+        else:
+            self.router_window = None
+            self.set_status("None of the selected sessions could be opened.")
+
     def _load_last_data(self):
         self.data_df = None  # Always reset on startup
         self._hide_data_status_panel()
@@ -302,6 +449,8 @@ class App(CTk):
         if self.settings_window is not None and self.settings_window.winfo_exists():
             bring_window_to_front(self.settings_window)
             return
+        from ui.settings_window import SettingsWindow
+
         self.settings_window = SettingsWindow(self)
         bring_window_to_front(self.settings_window)
         self.settings_window.protocol("WM_DELETE_WINDOW", self._on_settings_close)
@@ -314,7 +463,19 @@ class App(CTk):
                 self.settings_window.destroy()
                 self.settings_window = None
 
-    def import_csv(self):
+    def import_csv(self, on_imported=None):
+        """Pick a roster file and import it on a worker; ``on_imported()`` runs once it is loaded.
+
+        Returns ``False`` when nothing was started.
+        """
+        from core.roster_import import ImportCancelled, import_roster
+        from core.schema import apply_schema
+        from utils.background import BackgroundTask
+
+        if self._import_task is not None:
+            self.set_status("An import is already in progress.")
+            return False
+
         # Check if template is configured
         if not self.column_map:
             messagebox.showwarning("No Template", "Please configure a template first.")
@@ -330,49 +491,101 @@ class App(CTk):
         if not path:
             self.set_status("Import canceled.")
             return False
-        try:
-            df = read_data(path)
-            # Pad card_id column to 8 digits and assign 'null N' for blanks
-            card_col = self.column_map.get("card_id", "card_id")
-            if card_col in df.columns:
-                null_counter = 1
-                new_card_ids = []
-                for val in df[card_col]:
-                    val_str = str(val).strip()
-                    if not val_str or val_str.lower() == "nan":
-                        new_card_ids.append(f"null {null_counter}")
-                        null_counter += 1
-                    elif val_str.isdigit():
-                        new_card_ids.append(val_str.zfill(8))
-                    else:
-                        new_card_ids.append(val_str)
-                df[card_col] = new_card_ids
-
-            # Clear attendance and timestamp columns for imported data only
-            att_col = self.column_map.get("attendance", "attendance")
-            ts_col  = self.column_map.get("timestamp", "timestamp")
-            if att_col in df.columns:
-                df[att_col] = ""
-            if ts_col in df.columns:
-                df[ts_col] = ""
-        except Exception as e:
-            messagebox.showerror("Load Error", str(e))
+
+        mapping = dict(self.column_map)
+
+        def work(task):
+            # Card IDs padded to 8 digits, 'null N' for blanks, attendance and timestamp cleared.
+            df = import_roster(path, mapping, progress=lambda done, total: task.report((done, total)), cancelled=lambda: task.cancelled)
+            # The registry is persistent, so a cancel must stop the import before it is written.
+            if task.cancelled:
+                raise ImportCancelled()
+            new_students = self._update_student_registry(df, path, mapping)
+            if task.cancelled:
+                raise ImportCancelled()
+            # Held for the whole app session, so it is typed in place; to_strings() gives the text for files.
+            return apply_schema(df, mapping), new_students
+
+        def on_done(result):
+            df, new_students = result
+            self._import_task = None
+            self.import_frame.grid_remove()
+            self.data_df = df
+            self.data_roster_id = None
+            with open(LAST_DATA_FILE, "w") as f:
+                json.dump({"path": path}, f, indent=2)
+            self._update_data_status_panel(path, len(df))
+            suffix = f" ({new_students} new in the student registry)" if new_students else ""
+            self.set_status(f"Imported {len(df)} records from {os.path.basename(path)}{suffix}.")
+            if on_imported:
+                on_imported()
+
+        def on_error(exc):
+            self._end_import()
+            messagebox.showerror("Load Error", str(exc))
             self.set_status("Import failed.")
-            return False
-        self.data_df = df
-        with open(LAST_DATA_FILE, "w") as f:
-            json.dump({"path": path}, f, indent=2)
-        self._update_data_status_panel(path, len(df))
-        self.set_status(f"Imported {len(df)} records from {os.path.basename(path)}.")
+
+        self.data_rows_var.set("Importing…")
+        self.data_path_var.set(f"File: {path}")
+        self.import_bar.set(0)
+        self.import_frame.grid()
+        self.data_panel.grid()
+        self.set_status(f"Importing {os.path.basename(path)}…")
+        self._import_task = BackgroundTask(
+            self,
+            work,
+            on_done=on_done,
+            on_error=on_error,
+            on_progress=self._on_import_progress,
+            name="roster-import",
+        ).start()
         return True
 
+    def _on_import_progress(self, value):
+        done, total = value
+        if total:
+            self.import_bar.set(min(done / total, 1))
+            self.data_rows_var.set(f"Importing… {done:,} of {total:,} rows")
+        else:
+            self.data_rows_var.set(f"Importing… {done:,} rows")
+
+    def _cancel_import(self):
+        if self._import_task is None:
+            return
+        # The worker stops at the next chunk; its result is never delivered.
+        self._import_task.cancel()
+        self._end_import()
+        self.set_status("Import canceled.")
+
+    def _end_import(self):
+        """Drop the progress row and show the previously loaded data again, if any."""
+        self._import_task = None
+        self.import_frame.grid_remove()
+        if self.data_df is not None and self.current_data_path:
+            self._update_data_status_panel(self.current_data_path, len(self.data_df))
+        else:
+            self._hide_data_status_panel()
+
+    def _update_student_registry(self, df, path, mapping):
+        """Bulk upsert an imported roster into the master registry; never blocks the import."""
+        from core.student_registry import StudentRegistry
+
+        try:
+            _, new_students = StudentRegistry().upsert(df, mapping, source=os.path.basename(path))
+        except Exception as exc:
+            print(f"Warning: student registry not updated: {exc}")
+            return 0
+        return new_students
+
     def open_scan_window(self):
         if self._session_setup is not None and self._session_setup.winfo_exists():
             bring_window_to_front(self._session_setup)
             return
 
-        if not self.import_csv():
-            return
+        self.import_csv(on_imported=self._open_session_setup)
+
+    def _open_session_setup(self):
+        from ui.dialogs.session_setup_dialog import SessionSetupDialog
 
         try:
             self._session_setup = SessionSetupDialog(
@@ -381,35 +594,90 @@ class App(CTk):
                 SETTINGS["center_options"],
                 has_data=self.data_df is not None,
                 callback=self._on_session_setup_finished,
+                on_change=self._prefetch_session,
             )
         except Exception as e:
             messagebox.showerror("Dialog Error", f"Failed to open session setup dialog: {e}")
             self._session_setup = None
             return
 
+    def _prefetch_session(self, payload):
+        """Prepare the session the setup dialog currently describes on a worker thread."""
+        from core.session_prefetch import PreparedSession
+        from utils.background import BackgroundTask
+
+        if self.data_df is None:
+            return
+        current = self._prefetch
+        if current is not None and current.name == payload["name"] and current.data_df is self.data_df:
+            return
+        self._discard_prefetch()
+        params = {"stage": payload["stage"], "center": payload["center"], "no": payload["no"]}
+        prepared = PreparedSession(payload["name"], params, self.column_map, self.data_df, roster_id=self.data_roster_id)
+        self._prefetch = prepared
+        self._prefetch_task = BackgroundTask(
+            self,
+            prepared.prepare,
+            on_error=lambda _exc: self._discard_prefetch(),
+            name="session-prefetch",
+        ).start()
+
+    def _discard_prefetch(self):
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+        if self._prefetch is not None:
+            self._prefetch.discard()
+            self._prefetch = None
+
+    def _take_prefetch(self, name):
+        """The prepared session for ``name`` if it is ready and still valid; anything else is thrown away."""
+        prepared = self._prefetch
+        if prepared is not None and prepared.matches(name, self.data_df):
+            self._prefetch_task.cancel()
+            self._prefetch = self._prefetch_task = None
+            return prepared
+        self._discard_prefetch()
+        return None
+
     def _on_session_setup_finished(self, payload):
+        from core.session_manager import SessionManager
+        from core.schema import to_strings
+        from core.session_store import create_session, is_delta_session, save_roster, session_path_for
+        from ui.scan_window import ScanWindow
+
         self._session_setup = None
         if not payload:
+            self._discard_prefetch()
             self.set_status("Session setup canceled.")
             return
         if self.data_df is None:
+            self._discard_prefetch()
             messagebox.showwarning("No Data", "Please import data before starting a session.")
             self.set_status("Session setup aborted - no data loaded.")
             return
         name = payload["name"]
         params = {"stage": payload["stage"], "center": payload["center"], "no": payload["no"]}
-        file_type = SETTINGS.get("file_type", "csv")
-        ext = "xlsx" if file_type == "xlsx" else "csv"
-        session_path = os.path.join(SESSIONS_FOLDER, f"{name}.{ext}")
-        created = False
-        if not os.path.exists(session_path):
-            write_data(self.data_df, session_path)
-            created = True
-        session_df = read_data(session_path)
-        sm = SessionManager(name, params, self.column_map, session_df)
-        self._refresh_recent_sessions()
-        if self.past_sessions_window is not None and self.past_sessions_window.winfo_exists():
-            self.past_sessions_window.refresh()
+        prepared = self._take_prefetch(name)
+        if prepared is not None:
+            created = not prepared.existed
+            sm = prepared.commit()
+            if prepared.roster_id is not None:
+                self.data_roster_id = prepared.roster_id
+        else:
+            session_path = session_path_for(name)
+            created = False
+            if not os.path.exists(session_path):
+                if is_delta_session(session_path):
+                    # The roster is stored once per import; the session file only references it.
+                    if self.data_roster_id is None:
+                        self.data_roster_id = save_roster(self.data_df)
+                    card_col = self.column_map.get("card_id", "card_id")
+                    create_session(session_path, self.data_roster_id, name=name, params=params, card_column=card_col)
+                else:
+                    write_data(to_strings(self.data_df), session_path)
+                created = True
+            sm = SessionManager(name, params, self.column_map, self.data_df, session_path=session_path)
         ScanWindow(self, sm)
         if created:
             self.set_status(f"Session '{name}' created.")
@@ -1,11 +1,21 @@
 """Window for browsing previously saved sessions."""
+import bisect
 import os
 from datetime import datetime
-from tkinter import messagebox, ttk
+from tkinter import messagebox, simpledialog, ttk
 
-from customtkinter import CTkButton, CTkFrame, CTkLabel, CTkToplevel
+import customtkinter as ctk
+from customtkinter import CTkButton, CTkCheckBox, CTkEntry, CTkFrame, CTkLabel, CTkProgressBar, CTkToplevel
 
-from utils.helpers import MIN_PAST_SESSIONS_SIZE, SESSIONS_FOLDER, bring_window_to_front, ensure_initial_size
+from core.session_archive import active_sessions, archive_older_than, delete_sessions, restore, search
+from core.session_stats import PREVIEW_ROWS, SessionStatsCache, read_head
+from ui.dialogs.export_dialog import export_session_with_notes
+from utils.background import BackgroundTask
+from utils.helpers import MIN_PAST_SESSIONS_SIZE, SETTINGS, bring_window_to_front, ensure_initial_size
+
+# Selection must rest this long before a preview is read, so arrowing through the list stays smooth.
+PREVIEW_DELAY_MS = 150
+PREVIEW_FIELDS = ("name", "card_id", "attendance")
 
 class PastSessionsWindow(CTkToplevel):
     def __init__(self, parent):
@@ -14,6 +24,17 @@ class PastSessionsWindow(CTkToplevel):
         self.title("Past Sessions")
         self.minsize(*MIN_PAST_SESSIONS_SIZE)
         self._paths = {}
+        self._archived = {}
+        # Active rows by path, with their modification times, so watcher changes apply in place.
+        self._iid_by_path = {}
+        self._modified = {}
+        self._next_iid = 0
+        self._bulk_task = None
+        self._stats_cache = SessionStatsCache()
+        # Bumped on every selection change; a preview result from an older generation is dropped.
+        self._preview_gen = 0
+        self._preview_job = None
+        self._preview_task = None
         self.protocol("WM_DELETE_WINDOW", self._on_close)
         self.after(50, lambda: bring_window_to_front(self))
         header = CTkLabel(
@@ -23,6 +44,19 @@ class PastSessionsWindow(CTkToplevel):
         )
         header.pack(anchor="w", padx=24, pady=(24, 12))
 
+        tools = CTkFrame(self, fg_color="transparent")
+        tools.pack(fill="x", padx=24, pady=(0, 8))
+        tools.grid_columnconfigure(2, weight=1)
+        self.search_var = ctk.StringVar()
+        CTkEntry(tools, textvariable=self.search_var, placeholder_text="Search sessions", width=220).grid(row=0, column=0, sticky="w")
+        self.search_var.trace_add("write", lambda *_: self.refresh())
+        self.show_archived_var = ctk.BooleanVar(value=False)
+        CTkCheckBox(tools, text="Show archived", variable=self.show_archived_var, command=self.refresh).grid(row=0, column=1, padx=(12, 0))
+        self.progress_var = ctk.StringVar(value="")
+        CTkLabel(tools, textvariable=self.progress_var, font=("Arial", 12), anchor="e").grid(row=0, column=2, sticky="e", padx=(12, 8))
+        self.progress_bar = CTkProgressBar(tools, width=160)
+        self.progress_bar.set(0)
+
         container = CTkFrame(self, fg_color="transparent")
         container.pack(fill="both", expand=True, padx=24, pady=(0, 12))
         container.grid_columnconfigure(0, weight=1)
@@ -42,6 +76,8 @@ class PastSessionsWindow(CTkToplevel):
         scrollbar.grid(row=0, column=1, sticky="ns")
         self.tree.configure(yscrollcommand=scrollbar.set)
 
+        self._build_preview(container)
+
         self.empty_label = CTkLabel(
             container,
             text="No session files found.",
@@ -54,11 +90,11 @@ class PastSessionsWindow(CTkToplevel):
 
         button_bar = CTkFrame(self, fg_color="transparent")
         button_bar.pack(fill="x", padx=24, pady=(0, 24))
-        button_bar.grid_columnconfigure((0, 1, 2, 3, 4), weight=1, uniform="past_actions")
+        button_bar.grid_columnconfigure((0, 1, 2, 3, 4, 5, 6), weight=1, uniform="past_actions")
 
         self.open_btn = CTkButton(
             button_bar,
-            text="Open in Scanner",
+            text="View Session",
             state="disabled",
             command=self._open_selected
         )
@@ -72,8 +108,19 @@ class PastSessionsWindow(CTkToplevel):
         )
         self.reveal_btn.grid(row=0, column=1, padx=6, sticky="ew")
 
+        self.export_btn = CTkButton(
+            button_bar,
+            text="Export with Notes",
+            state="disabled",
+            command=self._export_selected
+        )
+        self.export_btn.grid(row=0, column=2, padx=6, sticky="ew")
+
         self.refresh_btn = CTkButton(button_bar, text="Refresh", command=self.refresh)
-        self.refresh_btn.grid(row=0, column=2, padx=6, sticky="ew")
+        self.refresh_btn.grid(row=0, column=3, padx=6, sticky="ew")
+
+        self.archive_btn = CTkButton(button_bar, text="Archive Old…", command=self._archive_old_sessions)
+        self.archive_btn.grid(row=0, column=4, padx=6, sticky="ew")
 
         self.clear_btn = CTkButton(
             button_bar,
@@ -81,44 +128,175 @@ class PastSessionsWindow(CTkToplevel):
             state="disabled",
             command=self._clear_all_sessions
         )
-        self.clear_btn.grid(row=0, column=3, padx=6, sticky="ew")
+        self.clear_btn.grid(row=0, column=5, padx=6, sticky="ew")
 
         self.close_btn = CTkButton(button_bar, text="Close", command=self._on_close)
-        self.close_btn.grid(row=0, column=4, padx=(6, 0), sticky="ew")
+        self.close_btn.grid(row=0, column=6, padx=(6, 0), sticky="ew")
 
         self.refresh()
         ensure_initial_size(self, min_size=MIN_PAST_SESSIONS_SIZE)
 
+    def _build_preview(self, container):
+        preview = CTkFrame(container, corner_radius=10, fg_color=("#f1f5f9", "#12263a"), width=340)
+        preview.grid(row=0, column=2, sticky="nsew", padx=(12, 0))
+        preview.grid_columnconfigure(0, weight=1)
+        preview.grid_rowconfigure(2, weight=1)
+        self.preview_title_var = ctk.StringVar(value="Select a session to preview it.")
+        self.preview_stats_var = ctk.StringVar(value="")
+        CTkLabel(preview, textvariable=self.preview_title_var, font=("Arial", 14, "bold"), anchor="w", wraplength=300, justify="left").grid(row=0, column=0, sticky="ew", padx=12, pady=(12, 2))
+        CTkLabel(preview, textvariable=self.preview_stats_var, font=("Arial", 12), anchor="w").grid(row=1, column=0, sticky="ew", padx=12)
+        self.preview_tree = ttk.Treeview(preview, show="headings", selectmode="none", height=PREVIEW_ROWS)
+        self.preview_tree.grid(row=2, column=0, sticky="nsew", padx=12, pady=(8, 4))
+        self.preview_hint = CTkLabel(preview, text="", font=("Arial", 11), anchor="w")
+        self.preview_hint.grid(row=3, column=0, sticky="ew", padx=12, pady=(0, 12))
+
+    def _clear_preview(self, title="Select a session to preview it."):
+        self.preview_title_var.set(title)
+        self.preview_stats_var.set("")
+        self.preview_hint.configure(text="")
+        self.preview_tree.delete(*self.preview_tree.get_children())
+
+    def _schedule_preview(self):
+        self._preview_gen += 1
+        if self._preview_job is not None:
+            self.after_cancel(self._preview_job)
+            self._preview_job = None
+        if self._preview_task is not None:
+            self._preview_task.cancel()
+            self._preview_task = None
+        path_entry = self._get_selected_path()
+        if not path_entry:
+            self._clear_preview()
+            return
+        self._clear_preview(os.path.splitext(os.path.basename(path_entry))[0])
+        self.preview_stats_var.set("Loading…")
+        generation = self._preview_gen
+        self._preview_job = self.after(PREVIEW_DELAY_MS, lambda: self._start_preview(generation, path_entry))
+
+    def _start_preview(self, generation, path_entry):
+        self._preview_job = None
+        if generation != self._preview_gen:
+            return
+        mapping = dict(getattr(self.parent, "column_map", None) or {})
+
+        def work(task):
+            head = read_head(path_entry)
+            if task.cancelled or generation != self._preview_gen:
+                return None
+            return generation, head, self._stats_cache.get(path_entry, mapping)
+
+        self._preview_task = BackgroundTask(
+            self,
+            work,
+            on_done=lambda result: self._show_preview(result, mapping),
+            on_error=lambda exc: self._preview_failed(generation, exc),
+            name="session-preview",
+        ).start()
+
+    def _show_preview(self, result, mapping):
+        if result is None or result[0] != self._preview_gen:
+            return
+        _, head, stats = result
+        self._preview_task = None
+        rows, attended = stats["rows"], stats["attended"]
+        rate = f" ({attended / rows * 100:.1f}%)" if rows else ""
+        self.preview_stats_var.set(f"{rows:,} students · {attended:,} attended{rate}")
+        columns = [mapping.get(field, field) for field in PREVIEW_FIELDS if mapping.get(field, field) in head.columns]
+        columns = columns or list(head.columns[:3])
+        self.preview_tree.configure(columns=columns)
+        for column in columns:
+            self.preview_tree.heading(column, text=str(column))
+            self.preview_tree.column(column, anchor="w", width=100)
+        for values in head[columns].fillna("").itertuples(index=False, name=None):
+            self.preview_tree.insert("", "end", values=values)
+        self.preview_hint.configure(text=f"First {len(head)} of {rows:,} rows." if rows > len(head) else "")
+
+    def _preview_failed(self, generation, exc):
+        if generation != self._preview_gen:
+            return
+        self._preview_task = None
+        self.preview_stats_var.set(f"Preview unavailable: {exc}")
+
+    @property
+    def showing_archived(self):
+        return bool(self.show_archived_var.get())
+
     def refresh(self):
         for item in self.tree.get_children():
             self.tree.delete(item)
         self._paths.clear()
-        if not os.path.isdir(SESSIONS_FOLDER):
-            self._toggle_empty_state(True)
-            self._on_select()
-            self._update_clear_state()
-            return
-        files = []
-        for entry in os.listdir(SESSIONS_FOLDER):
-            path_entry = os.path.join(SESSIONS_FOLDER, entry)
-            if os.path.isfile(path_entry) and entry.lower().endswith((".csv", ".xlsx")):
-                stats = os.stat(path_entry)
-                files.append((path_entry, stats.st_mtime, stats.st_size))
-        files.sort(key=lambda item: item[1], reverse=True)
-        for index, (path_entry, modified, size) in enumerate(files):
-            name = os.path.splitext(os.path.basename(path_entry))[0]
+        self._archived.clear()
+        self._iid_by_path.clear()
+        self._modified.clear()
+        query = self.search_var.get().strip().lower()
+        if self.showing_archived:
+            # Archived sessions come from the index; no archive is opened to list them.
+            rows = [(entry, entry["name"], entry["modified"], entry["size"]) for entry in search(query)]
+        else:
+            rows = [(path, os.path.splitext(os.path.basename(path))[0], modified, size) for path, modified, size in active_sessions()]
+            rows = [row for row in rows if query in row[1].lower()]
+            rows.sort(key=lambda row: row[2], reverse=True)
+        for index, (target, name, modified, size) in enumerate(rows):
             stamp = datetime.fromtimestamp(modified).strftime("%d %b %Y %H:%M")
-            size_text = self._format_size(size)
             iid = f"past_{index}"
-            self.tree.insert("", "end", iid=iid, values=(name, stamp, size_text))
-            self._paths[iid] = path_entry
-        self._toggle_empty_state(len(self._paths) == 0)
+            self.tree.insert("", "end", iid=iid, values=(name, stamp, self._format_size(size)))
+            if self.showing_archived:
+                self._archived[iid] = target
+            else:
+                self._paths[iid] = target
+                self._iid_by_path[target] = iid
+                self._modified[iid] = modified
+        self._next_iid = len(rows)
+        self.open_btn.configure(text="Restore" if self.showing_archived else "View Session")
+        self._toggle_empty_state(not rows)
         self._on_select()
         self._update_clear_state()
 
+    def apply_changes(self, changes):
+        """Apply ``(kind, path, modified, size)`` folder changes to the active list in place."""
+        if self.showing_archived:
+            return
+        query = self.search_var.get().strip().lower()
+        selected = set(self.tree.selection())
+        reselect = False
+        for kind, path_entry, modified, size in changes:
+            name = os.path.splitext(os.path.basename(path_entry))[0]
+            iid = self._iid_by_path.get(path_entry)
+            reselect = reselect or iid in selected
+            if kind == "removed" or query not in name.lower():
+                if iid is not None:
+                    self.tree.delete(iid)
+                    del self._iid_by_path[path_entry]
+                    self._paths.pop(iid, None)
+                    self._modified.pop(iid, None)
+                continue
+            values = (name, datetime.fromtimestamp(modified).strftime("%d %b %Y %H:%M"), self._format_size(size))
+            if iid is None:
+                iid = f"past_{self._next_iid}"
+                self._next_iid += 1
+                self.tree.insert("", self._position_for(modified), iid=iid, values=values)
+                self._iid_by_path[path_entry] = iid
+                self._paths[iid] = path_entry
+            else:
+                # Detached rows keep their selection and are left out of the position search.
+                self.tree.detach(iid)
+                self.tree.item(iid, values=values)
+                self.tree.move(iid, "", self._position_for(modified))
+            self._modified[iid] = modified
+        self._toggle_empty_state(not self._paths)
+        self._update_clear_state()
+        if reselect:
+            self._on_select()
+
+    def _position_for(self, modified):
+        """Index that keeps the active list sorted newest first."""
+        keys = [-self._modified[iid] for iid in self.tree.get_children()]
+        return bisect.bisect_right(keys, -modified)
+
     def _update_clear_state(self):
-        state = "normal" if self._paths else "disabled"
-        self.clear_btn.configure(state=state)
+        busy = self._bulk_task is not None
+        self.clear_btn.configure(state="normal" if self._paths and not busy and not self.showing_archived else "disabled")
+        self.archive_btn.configure(state="disabled" if busy or self.showing_archived else "normal")
 
     def _toggle_empty_state(self, show):
         if show:
@@ -137,7 +315,14 @@ class PastSessionsWindow(CTkToplevel):
         selection = self.tree.selection()
         state = "normal" if selection else "disabled"
         self.open_btn.configure(state=state)
-        self.reveal_btn.configure(state=state)
+        self.reveal_btn.configure(state="disabled" if self.showing_archived else state)
+        self.export_btn.configure(state="disabled" if self.showing_archived else state)
+        self._schedule_preview()
+        if selection and self.showing_archived:
+            entry = self._archived.get(selection[0])
+            if entry:
+                self.preview_title_var.set(entry["name"])
+                self.preview_stats_var.set(f"Archived in {entry['archive']}")
 
     def _get_selected_path(self):
         selection = self.tree.selection()
@@ -146,12 +331,13 @@ class PastSessionsWindow(CTkToplevel):
         return self._paths.get(selection[0])
 
     def _open_selected(self):
+        if self.showing_archived:
+            self._restore_selected()
+            return
         path_entry = self._get_selected_path()
         if not path_entry:
             return
-        opened = self.parent._open_session_path(path_entry, read_only=True)
-        if opened:
-            self.parent._refresh_recent_sessions()
+        self.parent._open_session_path(path_entry, read_only=True)
 
     def _reveal_selected(self):
         path_entry = self._get_selected_path()
@@ -159,6 +345,79 @@ class PastSessionsWindow(CTkToplevel):
             return
         self.parent._reveal_session_path(path_entry)
 
+    def _export_selected(self):
+        path_entry = self._get_selected_path()
+        if not path_entry:
+            return
+        export_session_with_notes(self, path_entry, getattr(self.parent, "column_map", None))
+
+    def _restore_selected(self):
+        selection = self.tree.selection()
+        entry = self._archived.get(selection[0]) if selection else None
+        if not entry:
+            return
+        try:
+            restore(entry)
+        except Exception as exc:
+            messagebox.showerror("Restore Failed", str(exc), parent=self)
+            return
+        self.refresh()
+        self._notify_sessions_changed(f"Session '{entry['name']}' restored.")
+
+    def _notify_sessions_changed(self, message):
+        # The session lists themselves follow the folder watcher.
+        if hasattr(self.parent, "set_status"):
+            self.parent.set_status(message)
+
+    def _run_bulk(self, label, work, on_done):
+        """Run a delete/archive job on a worker with progress shown in the tool bar."""
+        self.progress_var.set(f"{label}…")
+        self.progress_bar.set(0)
+        self.progress_bar.grid(row=0, column=3, sticky="e")
+
+        def on_progress(value):
+            done, total = value
+            self.progress_var.set(f"{label} {done:,} of {total:,}")
+            self.progress_bar.set(done / total if total else 1)
+
+        def finish(result=None, exc=None):
+            self._bulk_task = None
+            self.progress_bar.grid_remove()
+            self.progress_var.set("")
+            if self.showing_archived:
+                self.refresh()
+            if exc is not None:
+                messagebox.showerror(f"{label} Failed", str(exc), parent=self)
+            else:
+                on_done(result)
+
+        self._bulk_task = BackgroundTask(
+            self,
+            lambda task: work(lambda done, total: task.report((done, total)), lambda: task.cancelled),
+            on_done=finish,
+            on_error=lambda exc: finish(exc=exc),
+            on_progress=on_progress,
+            name="past-sessions-bulk",
+        ).start()
+        self._update_clear_state()
+
+    def _archive_old_sessions(self):
+        days = simpledialog.askinteger(
+            "Archive Old Sessions",
+            "Archive sessions not modified in the last how many days?",
+            initialvalue=SETTINGS.get("archive_after_days", 90),
+            minvalue=1,
+            parent=self
+        )
+        if days is None:
+            return
+        open_paths = self.parent.open_session_paths() if hasattr(self.parent, "open_session_paths") else set()
+
+        def done(moved):
+            self._notify_sessions_changed(f"Archived {moved} session(s) older than {days} days." if moved else "No sessions old enough to archive.")
+
+        self._run_bulk("Archiving", lambda progress, cancelled: archive_older_than(days, skip=open_paths, progress=progress, cancelled=cancelled), done)
+
     def _clear_all_sessions(self):
         if not self._paths:
             return
@@ -169,36 +428,35 @@ class PastSessionsWindow(CTkToplevel):
         )
         if not confirm:
             return
-        failures = []
-        for path_entry in list(self._paths.values()):
-            try:
-                os.remove(path_entry)
-            except Exception as exc:
-                failures.append(f"{os.path.basename(path_entry)}: {exc}")
-        self.refresh()
-        if hasattr(self.parent, "_refresh_recent_sessions"):
-            try:
-                self.parent._refresh_recent_sessions()
-            except Exception:
-                pass
-        if failures:
-            messagebox.showerror(
-                "Delete Failed",
-                "Some session files could not be deleted:\n" + "\n".join(failures),
+        paths = list(self._paths.values())
+
+        def done(result):
+            _, failures = result
+            self._notify_sessions_changed("Some past sessions could not be removed." if failures else "All past sessions cleared.")
+            if failures:
+                messagebox.showerror(
+                    "Delete Failed",
+                    "Some session files could not be deleted:\n" + "\n".join(failures),
+                    parent=self
+                )
+                return
+            messagebox.showinfo(
+                "Sessions Cleared",
+                "All past session files have been deleted.",
                 parent=self
             )
-            if hasattr(self.parent, "set_status"):
-                self.parent.set_status("Some past sessions could not be removed.")
-            return
-        messagebox.showinfo(
-            "Sessions Cleared",
-            "All past session files have been deleted.",
-            parent=self
-        )
-        if hasattr(self.parent, "set_status"):
-            self.parent.set_status("All past sessions cleared.")
+
+        self._run_bulk("Deleting", lambda progress, cancelled: delete_sessions(paths, progress=progress, cancelled=cancelled), done)
 
     def _on_close(self):
+        self._preview_gen += 1
+        if self._preview_job is not None:
+            self.after_cancel(self._preview_job)
+        if self._preview_task is not None:
+            self._preview_task.cancel()
+        if self._bulk_task is not None:
+            # Both jobs stop between files, leaving every session intact.
+            self._bulk_task.cancel()
         if hasattr(self.parent, "past_sessions_window"):
             self.parent.past_sessions_window = None
         self.destroy()
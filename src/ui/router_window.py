@@ -0,0 +1,169 @@
+"""Hub window that routes one card reader across several open sessions."""
+import os
+from tkinter import messagebox
+
+import customtkinter as ctk
+from customtkinter import CTkButton, CTkEntry, CTkFrame, CTkLabel, CTkOptionMenu, CTkToplevel
+
+from core.roster_store import normalize_card
+from core.session_manager import SessionManager
+from core.session_router import SessionRouter
+from ui.scan_window import ScanWindow
+from utils.helpers import MIN_ROUTER_SIZE, bring_window_to_front, ensure_initial_size
+
+class RouterWindow(CTkToplevel):
+    """Single scan entry feeding one ``ScanWindow`` per session.
+
+    Each scan is normalized, deduplicated and looked up once in a combined
+    card index, and the owning session is handed the matching rows. Cards
+    owned by several sessions are flagged and not marked anywhere; unknown
+    cards go to the chosen "new cards" session.
+    """
+
+    def __init__(self, parent, session_paths):
+        super().__init__(parent)
+        self.parent = parent
+        self.router = SessionRouter()
+        self.windows = []
+        self._rows = {}
+        # Set while "End All Sessions" runs, so the summaries are queued instead of replacing each other.
+        self._ending = False
+        self._summaries = []
+        self.title("Hub Scanning")
+        self.minsize(*MIN_ROUTER_SIZE)
+        self.protocol("WM_DELETE_WINDOW", self._end_all)
+        self.after(50, lambda: bring_window_to_front(self))
+
+        CTkLabel(self, text="Hub Scanning", font=("Arial", 20, "bold")).pack(anchor="w", padx=24, pady=(24, 4))
+        CTkLabel(self, text="Scans are sent to the session that owns the card.", font=("Arial", 12)).pack(anchor="w", padx=24)
+
+        entry_bar = CTkFrame(self, fg_color="transparent")
+        entry_bar.pack(fill="x", padx=24, pady=(16, 8))
+        entry_bar.grid_columnconfigure(0, weight=1)
+        self.scan_entry = CTkEntry(entry_bar, placeholder_text="Scan card ID")
+        self.scan_entry.grid(row=0, column=0, sticky="ew")
+        self.scan_entry.bind("<Return>", lambda _e: self._on_scan())
+        CTkLabel(entry_bar, text="New cards go to", font=("Arial", 12)).grid(row=0, column=1, padx=(12, 6))
+        self.default_var = ctk.StringVar(value="")
+        self.default_menu = CTkOptionMenu(entry_bar, variable=self.default_var, values=[""])
+        self.default_menu.grid(row=0, column=2)
+
+        self.status_var = ctk.StringVar(value="Ready.")
+        self.status_label = CTkLabel(self, textvariable=self.status_var, font=("Arial", 13, "bold"), anchor="w")
+        self.status_label.pack(fill="x", padx=24, pady=(0, 8))
+
+        self.stats_frame = CTkFrame(self, corner_radius=10, fg_color=("#f1f5f9", "#12263a"))
+        self.stats_frame.pack(fill="both", expand=True, padx=24, pady=(0, 8))
+        self.stats_frame.grid_columnconfigure(0, weight=1)
+        for col, text in enumerate(("Session", "Attended", "Total", "Rate")):
+            CTkLabel(self.stats_frame, text=text, font=("Arial", 12, "bold")).grid(row=0, column=col, sticky="w" if col == 0 else "e", padx=12, pady=(8, 4))
+
+        self.conflicts_var = ctk.StringVar(value="")
+        CTkLabel(self, textvariable=self.conflicts_var, font=("Arial", 12), text_color=("#b3261e", "#f2b8b5"), anchor="w").pack(fill="x", padx=24)
+
+        CTkButton(self, text="End All Sessions", command=self._end_all).pack(anchor="e", padx=24, pady=(8, 24))
+
+        for path in session_paths:
+            self._open_session(path)
+        if not self.windows:
+            # Every session failed to open; each failure was already reported.
+            self.destroy()
+            return
+        self._refresh_sessions()
+        ensure_initial_size(self, min_size=MIN_ROUTER_SIZE)
+        self.after(200, self.focus_scan_entry)
+
+    def _open_session(self, path):
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            # The manager reads the session itself; no table is loaded here.
+            sm = SessionManager(name, {}, self.parent.column_map, None, session_path=path)
+            window = ScanWindow(self.parent, sm, router=self)
+        except Exception as exc:
+            messagebox.showerror("Open Failed", f"{name}: {exc}", parent=self)
+            return
+        self.windows.append(window)
+        self.router.add_session(window, window.card_rows())
+        row = len(self._rows) + 1
+        labels = [
+            CTkLabel(self.stats_frame, text=name, font=("Arial", 12), anchor="w"),
+            CTkLabel(self.stats_frame, textvariable=window.stats_vars["attended"], font=("Arial", 12)),
+            CTkLabel(self.stats_frame, textvariable=window.stats_vars["total"], font=("Arial", 12)),
+            CTkLabel(self.stats_frame, textvariable=window.stats_vars["percent"], font=("Arial", 12)),
+        ]
+        for col, label in enumerate(labels):
+            label.grid(row=row, column=col, sticky="w" if col == 0 else "e", padx=12, pady=2)
+        self._rows[window] = labels
+
+    def _refresh_sessions(self):
+        names = [window.sm.name for window in self.windows]
+        self.default_menu.configure(values=names or [""])
+        if self.default_var.get() not in names:
+            self.default_var.set(names[0] if names else "")
+        conflicts = self.router.conflicts()
+        self.conflicts_var.set(f"{len(conflicts):,} cards appear in more than one session." if conflicts else "")
+
+    def focus_scan_entry(self):
+        if self.winfo_exists():
+            self.scan_entry.focus_set()
+
+    def register_card(self, window, card_id):
+        self.router.add_card(window, card_id, window.card_rows().get(card_id, []))
+        self._refresh_sessions()
+
+    def detach_window(self, window, summary=None):
+        """Forget a closed session; ``summary`` is its summary dialog payload."""
+        if summary is not None:
+            if self._ending:
+                self._summaries.append(summary)
+            elif hasattr(self.parent, "show_session_summary"):
+                self.parent.after(160, lambda: self.parent.show_session_summary(**summary))
+        if window not in self._rows:
+            return
+        self.router.remove_session(window)
+        self.windows.remove(window)
+        for label in self._rows.pop(window):
+            label.destroy()
+        if not self.windows:
+            if self.winfo_exists():
+                self.destroy()
+            return
+        self._refresh_sessions()
+
+    def _on_scan(self):
+        card_id = normalize_card(self.scan_entry.get())
+        self.scan_entry.delete(0, "end")
+        if not card_id or not self.windows:
+            return
+        owners = self.router.route(card_id)
+        if len(owners) > 1:
+            names = ", ".join(window.sm.name for window, _ in owners)
+            self.status_var.set(f"Card {card_id} is in several sessions ({names}); mark it from the right session.")
+            self.status_label.configure(text_color=("#b3261e", "#f2b8b5"))
+            return
+        if owners:
+            target, rows = owners[0]
+        else:
+            target = next((window for window in self.windows if window.sm.name == self.default_var.get()), self.windows[0])
+            rows = ()
+        # Double taps are absorbed by the owning session's cache, so its summary still counts them.
+        if target.scan_dedupe.is_repeat(card_id):
+            return
+        if owners:
+            self.status_var.set(f"Card {card_id} → {target.sm.name}")
+        else:
+            self.status_var.set(f"Card {card_id} is not in any session; sent to {target.sm.name}.")
+        self.status_label.configure(text_color=("#1b1c1e", "#e3e2e6"))
+        target.scan_submit_routed(card_id, rows)
+
+    def _end_all(self):
+        self._ending = True
+        for window in list(self.windows):
+            if window.winfo_exists():
+                window.end_session()
+        self._ending = False
+        if self._summaries and hasattr(self.parent, "show_session_summaries"):
+            summaries, self._summaries = self._summaries, []
+            self.parent.after(160, lambda: self.parent.show_session_summaries(summaries))
+        if self.winfo_exists():
+            self.destroy()
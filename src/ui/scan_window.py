@@ -5,26 +5,34 @@ The "Focus View" feature has been redesigned into a modern, Material 3-style int
 to provide a guided, conversational user experience. All changes for this redesign are
 encapsulated within this file, primarily in the `scan_focus_` prefixed methods.
 """
-import os
 from datetime import datetime
-from tkinter import messagebox, ttk
+from tkinter import filedialog, messagebox, ttk
 
 import customtkinter as ctk
-from customtkinter import CTkButton, CTkEntry, CTkFrame, CTkLabel, CTkProgressBar, CTkTextbox, CTkToplevel
-from PIL import Image
+from customtkinter import CTkButton, CTkCheckBox, CTkEntry, CTkFrame, CTkLabel, CTkProgressBar, CTkTextbox, CTkToplevel
 
+from core.event_log import EventLog
+from core.gate_status import BLOCKED, GateStatus
+from core.grade_merge import GradeMergeError
+from core.roster_store import normalize_card
+from core.scan_dedupe import ScanDedupeCache
 from ui.dialogs.add_student_dialog import AddStudentDialog
+from utils.assets import get_icon
+from utils.background import BackgroundTask
 from utils.helpers import (
     HOME_BG_FILE,
     MIN_SCAN_SIZE,
+    SETTINGS,
     bring_window_to_front,
     ensure_initial_size,
     read_data,
 )
+from utils.images import BackgroundFitter, load_original
+from utils.metrics import ScanMetrics
 
-# --- Constants for the new Focus View Design ---
-ASSETS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "assets")
+METRICS_FLUSH_MS = 30000
 
+# --- Constants for the new Focus View Design ---
 # -- Colors --
 # Light Mode
 LIGHT_BG = "#f8faff"
@@ -77,28 +85,43 @@ STATUS_STYLES = {
     },
 }
 
+# Action bar shown for each status kind. Kinds with the same buttons share one bar, built once and raised on demand.
+ACTION_LAYOUTS = {
+    "empty": [],
+    "ok": [],
+    "duplicate": [],
+    "not_found": ["add_student"],
+    "missing_exam": ["deny", "override", "complete"],
+    "missing_homework": ["deny", "override", "complete"],
+    "ok_attended": ["cancel"],
+}
+
 
 class ScanWindow(CTkToplevel):
-    def __init__(self, parent, session_mgr, read_only=False):
+    def __init__(self, parent, session_mgr, read_only=False, router=None):
         super().__init__(parent)
         self.parent = parent
         self.sm = session_mgr
         self.read_only = read_only
-        self.state('zoomed')
+        # In router mode scans arrive from a RouterWindow, which owns the scan entry and focus.
+        self.router = router
+        try:
+            self.state('zoomed')
+        except Exception:
+            # X11 window managers do not know the "zoomed" state.
+            self.attributes('-zoomed', True)
         self.bind("<F11>", self.toggle_fullscreen)
         self.bind("<Escape>", self.toggle_fullscreen)
         self.restrictions = self.sm.restrictions
-        self.df = read_data(self.sm.session_path).fillna("")
-        self.mapping = self.sm.mapping or {col: col for col in self.df.columns}
-
-        # --- Icon Cache ---
-        self._icon_cache = {}
+        self.mapping = self.sm.mapping or {field: field for field in self.sm.roster.fields}
 
         # Load background image
-        self.original_bg = Image.open(HOME_BG_FILE)
-        self.bg_photo = ctk.CTkImage(light_image=self.original_bg, dark_image=self.original_bg, size=self.original_bg.size)
+        # The decoded original is shared by every scan window; resizes are debounced.
+        self.original_bg = load_original(HOME_BG_FILE)
+        self.bg_photo = self._make_bg_image(self.original_bg, self.original_bg.size)
         self.bg_label = CTkLabel(self, text="", image=self.bg_photo)
         self.bg_label.place(relwidth=1, relheight=1)
+        self.bg_fitter = BackgroundFitter(self, self.bg_label, HOME_BG_FILE, self._make_bg_image)
         self.bind("<Configure>", self._on_bg_resize)
 
         self.title("Scan Attendance")
@@ -107,16 +130,22 @@ class ScanWindow(CTkToplevel):
 
         # --- Instance Variables ---
         self._all_iids = []
+        self._card_index = {}
         self._search_entries = []
         self.search_var = None
+        self.blocked_only_var = None
+        self.gate = GateStatus(self.restrictions)
+        self.events = EventLog(self.sm.session_path)
         self._manual_additions = 0
         self._cancellations = 0
         self._focus_reset_job = None
         self._focus_guard_depth = 0
         self.scan_focus_ctx = None
-        self.scan_focus_visible_cache = []
         self.scan_focus_timer = None
         self.scan_focus_window = None
+        self.scan_dedupe = ScanDedupeCache(SETTINGS.get("scan_dedupe_ttl", 3.0))
+        self.metrics = ScanMetrics(enabled=SETTINGS.get("scan_metrics", True) and not read_only)
+        self._metrics_job = None
         self.stats_vars = {
             "total": ctk.StringVar(value="0"),
             "attended": ctk.StringVar(value="0"),
@@ -131,9 +160,11 @@ class ScanWindow(CTkToplevel):
         self._refresh_stats()
         ensure_initial_size(self, min_size=MIN_SCAN_SIZE)
 
-        if not self.read_only:
+        if not self.read_only and self.router is None:
             self.bind_all("<FocusIn>", self._global_focus_in, add="+ ")
             self.scan_entry.focus_set()
+        if self.metrics.enabled:
+            self._metrics_job = self.after(METRICS_FLUSH_MS, self._flush_metrics)
 
     def toggle_fullscreen(self, event=None):
         self.attributes("-fullscreen", not self.attributes("-fullscreen"))
@@ -142,26 +173,12 @@ class ScanWindow(CTkToplevel):
     # Redesigned Focus View (Material 3 Style)
     # --------------------------------------------------------------------------
 
-    def _load_icon(self, name, size=(24, 24)):
+    def _load_icon(self, name, size=(24, 24), tint=None):
         """
-        Loads an icon from the assets directory and caches it.
+        Returns the shared, process-wide icon for ``name``.
         Icons are expected to be white for proper coloring.
         """
-        if (name, size) in self._icon_cache:
-            return self._icon_cache[(name, size)]
-        
-        try:
-            img_path = os.path.join(ASSETS_PATH, name)
-            img = Image.open(img_path)
-            ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=size)
-            self._icon_cache[(name, size)] = ctk_img
-            return ctk_img
-        except FileNotFoundError:
-            print(f"Warning: Icon '{name}' not found at '{ASSETS_PATH}'")
-            # Return a placeholder transparent image
-            return ctk.CTkImage(light_image=Image.new("RGBA", size, (0,0,0,0)),
-                                dark_image=Image.new("RGBA", size, (0,0,0,0)),
-                                size=size)
+        return get_icon(name, size, tint)
 
     def scan_focus_create_ui(self, parent):
         """
@@ -219,23 +236,38 @@ class ScanWindow(CTkToplevel):
         self.scan_focus_notes.bind("<FocusOut>", self._on_notes_focus_out)
 
         # --- 3. Actions Zone (Bottom) ---
+        # One pre-packed bar per layout, stacked in the same grid cell; switching is a single tkraise.
         self.actions_zone = CTkFrame(parent, fg_color="transparent")
         self.actions_zone.pack(fill="x", padx=20, pady=(12, 20))
+        self.actions_zone.grid_columnconfigure(0, weight=1)
+        self._action_bars, bars = {}, {}
+        for layout, names in ACTION_LAYOUTS.items():
+            if tuple(names) not in bars:
+                bar = CTkFrame(self.actions_zone, fg_color=(LIGHT_BG, DARK_BG), height=1)
+                bar.grid(row=0, column=0, sticky="nsew")
+                bars[tuple(names)] = bar
+            self._action_bars[layout] = bars[tuple(names)]
+        self._active_bar = None
 
         # -- Button Definitions --
         # Primary (Filled)
-        self._btn_complete = CTkButton(self.actions_zone, text="Complete & Attend", image=self._load_icon("task_alt.png"), command=self.scan_focus_on_completed)
-        self._btn_add_student = CTkButton(self.actions_zone, text="Add New Student", image=self._load_icon("person_add.png"), command=self.scan_focus_on_add_student)
+        self._btn_complete = CTkButton(self._action_bars["missing_exam"], text="Complete & Attend", image=self._load_icon("task_alt.png"), command=self.scan_focus_on_completed)
+        self._btn_add_student = CTkButton(self._action_bars["not_found"], text="Add New Student", image=self._load_icon("person_add.png"), command=self.scan_focus_on_add_student)
         
         # Secondary (Outlined)
-        self._btn_override = CTkButton(self.actions_zone, text="Override & Attend", image=self._load_icon("gpp_good.png"), command=self.scan_focus_on_override, fg_color="transparent", border_width=1, border_color=(LIGHT_OUTLINE, DARK_OUTLINE))
+        self._btn_override = CTkButton(self._action_bars["missing_exam"], text="Override & Attend", image=self._load_icon("gpp_good.png"), command=self.scan_focus_on_override, fg_color="transparent", border_width=1, border_color=(LIGHT_OUTLINE, DARK_OUTLINE))
         
         # Negative (Text Button)
-        self._btn_deny = CTkButton(self.actions_zone, text="Deny Entry", command=self.scan_focus_on_deny, fg_color="transparent", text_color=(LIGHT_ERROR, DARK_ERROR), hover=False)
+        self._btn_deny = CTkButton(self._action_bars["missing_exam"], text="Deny Entry", command=self.scan_focus_on_deny, fg_color="transparent", text_color=(LIGHT_ERROR, DARK_ERROR), hover=False)
 
-        self._btn_cancel = CTkButton(self.actions_zone, text="Cancel Attendance", command=self.scan_focus_on_cancel_attendance, fg_color="transparent", border_width=1, border_color=(LIGHT_OUTLINE, DARK_OUTLINE))
+        self._btn_cancel = CTkButton(self._action_bars["ok_attended"], text="Cancel Attendance", command=self.scan_focus_on_cancel_attendance, fg_color="transparent", border_width=1, border_color=(LIGHT_OUTLINE, DARK_OUTLINE))
 
         self.scan_focus_buttons = [self._btn_complete, self._btn_add_student, self._btn_override, self._btn_deny, self._btn_cancel]
+        buttons = {"complete": self._btn_complete, "add_student": self._btn_add_student, "override": self._btn_override, "deny": self._btn_deny, "cancel": self._btn_cancel}
+        for names in bars:
+            for name in names:
+                # Pack buttons with primary actions last to appear on the right
+                buttons[name].pack(side="left", fill="x", expand=True, padx=4)
         
         if self.read_only:
             self.scan_focus_notes.configure(state="disabled")
@@ -269,11 +301,13 @@ class ScanWindow(CTkToplevel):
         window.bind("<Destroy>", lambda e: setattr(self, "scan_focus_window", None), add="+ ")
 
         self.scan_focus_window = window
+        self._focus_applied = {}
         self.scan_focus_create_ui(window)
         return window
 
     def scan_focus_show(self, scan_ctx):
         """Shows and populates the Focus View with student data."""
+        started = self.metrics.start()
         self.scan_focus_cancel_timer()
         window = self._ensure_scan_focus_window()
         if not window: return
@@ -289,7 +323,7 @@ class ScanWindow(CTkToplevel):
         ctx["status"] = status
 
         # Populate UI elements
-        self.scan_focus_name_label.configure(text=ctx.get("name") or "Unknown Student")
+        self._configure_if_changed(self.scan_focus_name_label, text=ctx.get("name") or "Unknown Student")
         
         card_display_val = ctx.get('card_display', '') or ''
         card_display = str(card_display_val).replace('null', '').strip() or '--'
@@ -297,7 +331,7 @@ class ScanWindow(CTkToplevel):
         student_id = str(student_id_val).replace('null', '').strip() or '--'
         
         id_text = f"Student ID: {student_id}  •  Card ID: {card_display}"
-        self.scan_focus_id_label.configure(text=id_text)
+        self._configure_if_changed(self.scan_focus_id_label, text=id_text)
 
         # Set notes
         if not self.read_only: self.scan_focus_notes.configure(state="normal")
@@ -324,6 +358,7 @@ class ScanWindow(CTkToplevel):
 
         # Set status and update dynamic UI parts
         self.scan_focus_set_status(status, ctx)
+        self.metrics.stop("focus_render", started)
 
     def scan_focus_set_status(self, kind, context):
         """Updates the entire Focus View UI based on the student's status."""
@@ -331,7 +366,7 @@ class ScanWindow(CTkToplevel):
 
         # 1. Update Status Icon
         style = STATUS_STYLES.get(kind, STATUS_STYLES["ok"])
-        self.scan_focus_status_icon.configure(image=self._load_icon(style["icon"], size=(48, 48)))
+        self._configure_if_changed(self.scan_focus_status_icon, image=self._load_icon(style["icon"], size=(48, 48)))
 
         # 2. Update Details Cards (Homework & Exam)
         missing_tasks = context.get("missing_tasks", [])
@@ -344,7 +379,7 @@ class ScanWindow(CTkToplevel):
 
         # Homework
         hw_missing = "homework" in missing_tasks
-        self.hw_icon_label.configure(image=problem_icon if hw_missing else success_icon)
+        self._configure_if_changed(self.hw_icon_label, image=problem_icon if hw_missing else success_icon)
         hw_grade = context.get("homework", "")
         hw_text = ""
         if hw_grade:
@@ -353,12 +388,12 @@ class ScanWindow(CTkToplevel):
                 hw_text += " (Fail)"
         else:
             hw_text = "Not Submitted"
-        self.hw_grade_label.configure(text=hw_text)
-        self.hw_card.configure(fg_color=problem_color if hw_missing else success_color)
+        self._configure_if_changed(self.hw_grade_label, text=hw_text)
+        self._configure_if_changed(self.hw_card, fg_color=problem_color if hw_missing else success_color)
 
         # Exam
         exam_missing = "exam" in missing_tasks
-        self.exam_icon_label.configure(image=problem_icon if exam_missing else success_icon)
+        self._configure_if_changed(self.exam_icon_label, image=problem_icon if exam_missing else success_icon)
         exam_grade = context.get("exam", "")
         exam_text = ""
         if exam_grade:
@@ -367,30 +402,27 @@ class ScanWindow(CTkToplevel):
                 exam_text += " (Fail)"
         else:
             exam_text = "Not Submitted"
-        self.exam_grade_label.configure(text=exam_text)
-        self.exam_card.configure(fg_color=problem_color if exam_missing else success_color)
+        self._configure_if_changed(self.exam_grade_label, text=exam_text)
+        self._configure_if_changed(self.exam_card, fg_color=problem_color if exam_missing else success_color)
 
         # 3. Update Action Buttons
         self._update_action_buttons(kind, context)
 
     def _update_action_buttons(self, kind, context):
-        """Shows and hides the correct action buttons based on the status."""
-        for btn in self.scan_focus_buttons: btn.pack_forget()
-
-        buttons_to_show = []
-        if kind == "not_found":
-            buttons_to_show = [self._btn_add_student]
-        elif kind in {"missing_exam", "missing_homework"}:
-            buttons_to_show = [self._btn_deny, self._btn_override, self._btn_complete]
-        elif kind == "ok" and context.get("already_attended"):
-            buttons_to_show = [self._btn_cancel]
-        
-        # Pack buttons with primary actions last to appear on the right
-        for btn in buttons_to_show: btn.pack(side="left", fill="x", expand=True, padx=4)
-        
-        # Special case for a single primary button to be centered
-        if len(buttons_to_show) == 1:
-            buttons_to_show[0].pack(side="top", fill="x", expand=True, padx=4)
+        """Raises the pre-built action bar for the status; nothing is re-packed."""
+        layout = "ok_attended" if kind == "ok" and context.get("already_attended") else kind
+        bar = self._action_bars.get(layout, self._action_bars["empty"])
+        if bar is self._active_bar: return
+        bar.tkraise()
+        self._active_bar = bar
+
+    def _configure_if_changed(self, widget, **options):
+        """Skip configure() calls that would not change anything on screen."""
+        applied = self._focus_applied.setdefault(str(widget), {})
+        changed = {key: value for key, value in options.items() if key not in applied or applied[key] != value}
+        if not changed: return
+        widget.configure(**changed)
+        applied.update(changed)
 
     def scan_focus_clear(self):
         """Hides the Focus View and resets its state."""
@@ -408,17 +440,21 @@ class ScanWindow(CTkToplevel):
         window = getattr(self, "scan_focus_window", None)
         if window and window.winfo_exists(): window.withdraw()
             
-        self.after(120, self.scan_entry.focus_set)
+        self.after(120, self._return_scan_focus)
 
     # --------------------------------------------------------------------------
     # Original ScanWindow methods (unchanged unless necessary for integration)
     # --------------------------------------------------------------------------
 
+    def _make_bg_image(self, image, size):
+        return ctk.CTkImage(light_image=image, dark_image=image, size=size)
+
     def _on_bg_resize(self, event):
-        if event.widget is self:
-            bg = self.original_bg.resize((event.width, event.height), Image.Resampling.LANCZOS)
-            self.bg_photo = ctk.CTkImage(light_image=bg, dark_image=bg, size=(event.width, event.height))
-            self.bg_label.configure(image=self.bg_photo)
+        self.bg_fitter.on_configure(event)
+
+    def _return_scan_focus(self):
+        if self.router is not None: self.router.focus_scan_entry()
+        else: self.scan_entry.focus_set()
 
     def _focus_scan_entry(self):
         self._focus_reset_job = None
@@ -453,8 +489,10 @@ class ScanWindow(CTkToplevel):
 
         if self.read_only:
             self.scan_entry.configure(state="disabled"); self.scan_entry.unbind("<Return>"); scan_block.grid_remove()
+        elif self.router is not None:
+            scan_block.grid_remove()
 
-        session_text = f"Session: {self.sm.name}" + (" (read-only)" if self.read_only else "")
+        session_text = f"Session: {self.sm.name}" + (" (read-only)" if self.read_only else " (hub)" if self.router is not None else "")
         CTkLabel(top_bar, text=session_text, font=("Arial", 12)).grid(row=0, column=1, sticky="w", padx=18)
 
         self.end_button = CTkButton(top_bar, text="End Session" if not self.read_only else "Close", command=self._on_end_scan)
@@ -472,6 +510,9 @@ class ScanWindow(CTkToplevel):
         search_entry.bind("<FocusIn>", lambda _e: self._pause_focus_guard())
         search_entry.bind("<FocusOut>", lambda _e: self._resume_focus_guard())
         self.smart_search_entry = search_entry
+        if self.restrictions.get("exam") or self.restrictions.get("homework"):
+            self.blocked_only_var = ctk.BooleanVar(value=False)
+            CTkCheckBox(search_frame, text="Blocked only", variable=self.blocked_only_var, command=self._filter_all).grid(row=0, column=1, padx=(10, 5))
 
         scan_main_content = CTkFrame(self, fg_color="transparent")
         scan_main_content.pack(fill="both", expand=True, padx=12, pady=(0, 12))
@@ -485,7 +526,7 @@ class ScanWindow(CTkToplevel):
         if self.restrictions.get("homework"): cols.append("homework")
         cols += ["attendance", "notes", "timestamp"]
 
-        self.tree = ttk.Treeview(tree_container, columns=cols, show="headings", selectmode="browse")
+        self.tree = ttk.Treeview(tree_container, columns=cols, show="headings", selectmode="extended")
         for col in cols:
             self.tree.heading(col, text=col.replace("_", " ").title()); self.tree.column(col, anchor="center", width=110)
         self.tree.grid(row=0, column=0, sticky="nsew")
@@ -495,10 +536,23 @@ class ScanWindow(CTkToplevel):
         self.tree.bind("<Double-1>", self.scan_on_row_double_click)
         if self.read_only: self.tree.unbind("<Double-1>")
 
+        # Focus matches are shown in an overlay so the main table is never rebuilt per scan.
+        self.focus_tree = ttk.Treeview(tree_container, columns=cols, show="headings", selectmode="browse")
+        for col in cols:
+            self.focus_tree.heading(col, text=col.replace("_", " ").title()); self.focus_tree.column(col, anchor="center", width=110)
+        if not self.read_only: self.focus_tree.bind("<Double-1>", self.scan_on_row_double_click)
+
         self.control_frame = CTkFrame(self, fg_color="transparent")
         self.control_frame.pack(fill="x", padx=12, pady=(0, 12))
         self.add_student_button = CTkButton(self.control_frame, text="Add Student", command=self._on_add_student_flow)
         self.add_student_button.pack(side="left")
+        self.merge_grades_button = CTkButton(self.control_frame, text="Merge Grades", command=self._on_merge_grades)
+        self.merge_grades_button.pack(side="left", padx=(8, 0))
+        self._merge_task = None
+        self.cancel_selected_button = CTkButton(self.control_frame, text="Cancel Selected", command=lambda: self._on_bulk_attendance(""), fg_color="transparent", border_width=1, border_color=(LIGHT_OUTLINE, DARK_OUTLINE), text_color=(LIGHT_PRIMARY_TEXT, DARK_PRIMARY_TEXT))
+        self.cancel_selected_button.pack(side="right")
+        self.mark_selected_button = CTkButton(self.control_frame, text="Mark Selected Present", command=lambda: self._on_bulk_attendance("attend"))
+        self.mark_selected_button.pack(side="right", padx=(0, 8))
         if self.read_only: self.control_frame.pack_forget()
 
     def scan_focus_cancel_timer(self):
@@ -512,40 +566,43 @@ class ScanWindow(CTkToplevel):
         self.scan_focus_timer = self.after(delay, self.scan_focus_clear)
 
     def scan_restore_from_focus(self):
-        if not self.scan_focus_visible_cache: return
-        for scan_iid in self.scan_focus_visible_cache:
-            if self.tree.exists(scan_iid):
-                try: self.tree.reattach(scan_iid, "", "end")
-                except Exception: pass
-        self.scan_focus_visible_cache = []
+        children = self.focus_tree.get_children()
+        if children: self.focus_tree.delete(*children)
+        self.focus_tree.place_forget()
 
     def scan_filter_for_focus(self, target_iids):
+        """Show only ``target_iids`` in the overlay; Tk work is bounded by the match count."""
         self.scan_restore_from_focus()
-        if not target_iids: return
-        current_visible = [iid for iid in self._all_iids if self.tree.exists(iid) and not self.tree.parent(iid)]
-        self.scan_focus_visible_cache = current_visible
-        for scan_iid in current_visible:
-            if scan_iid not in target_iids:
-                try: self.tree.detach(scan_iid)
-                except Exception: pass
-        for scan_iid in target_iids:
-            if self.tree.exists(scan_iid):
-                try: self.tree.reattach(scan_iid, "", "end")
-                except Exception: pass
-        primary = target_iids[0]
-        if self.tree.exists(primary):
-            self.tree.selection_set(primary); self.tree.focus(primary)
+        targets = [iid for iid in target_iids if self.tree.exists(iid)]
+        if not targets: return
+        for scan_iid in targets:
+            self.focus_tree.insert("", "end", iid=scan_iid, values=self.tree.item(scan_iid, "values"))
+        # Over the table only; the main table's scrollbar stays visible and usable beside it.
+        self.focus_tree.place(in_=self.tree, relx=0, rely=0, relwidth=1, relheight=1)
+        primary = targets[0]
+        self.focus_tree.selection_set(primary); self.focus_tree.focus(primary)
+        self.tree.selection_set(primary); self.tree.focus(primary)
+        if not self.tree.parent(primary): self.tree.see(primary)
 
     def scan_normalize_card(self, value):
-        text = self._clean_value(value)
-        return text.zfill(8) if text and text.isdigit() else text
+        # The hub router uses the same function, so both route a card the same way.
+        return normalize_card(value)
 
     def scan_lookup_matches(self, card_id):
         normalized = self.scan_normalize_card(card_id)
         if not normalized: return []
-        candidates = [iid for iid in self._all_iids if self.tree.exists(iid) and (self.scan_normalize_card(iid) == normalized or self.scan_normalize_card(self.scan_tree_get(iid, "card_id")) == normalized)]
-        unique = sorted(list(set(candidates)), key=lambda x: (x != normalized))
-        return unique
+        return self._live_rows(normalized, self._card_index.get(normalized, []))
+
+    def _live_rows(self, card_id, rows):
+        return sorted((iid for iid in rows if self.tree.exists(iid)), key=lambda x: (x != card_id))
+
+    def card_rows(self):
+        """The live ``{card_id: [row iids]}`` index; the hub router keeps references to its lists."""
+        return self._card_index
+
+    def _index_card(self, iid, card_value):
+        key = self.scan_normalize_card(card_value) or self.scan_normalize_card(iid)
+        if key: self._card_index.setdefault(key, []).append(iid)
 
     def scan_tree_get(self, iid, column):
         if column not in self.tree["columns"]:
@@ -554,27 +611,7 @@ class ScanWindow(CTkToplevel):
         except Exception: return ""
 
     def scan_collect_missing_tasks(self, iid):
-        missing = []
-        exam_grade = self.scan_tree_get(iid, "exam")
-        if self.restrictions.get("exam") and "exam" in self.tree["columns"] and (not exam_grade or exam_grade == "0"):
-            missing.append("exam")
-        
-        hw_grade = self.scan_tree_get(iid, "homework")
-        if self.restrictions.get("homework") and "homework" in self.tree["columns"] and (not hw_grade or hw_grade == "0"):
-            missing.append("homework")
-        return missing
-
-    def scan_describe_tasks(self, tasks):
-        if not tasks: return ""
-        labels = {"exam": "Exam", "homework": "Homework"}
-        mapped = [labels.get(task, task.title()) for task in tasks]
-        return mapped[0] if len(mapped) == 1 else " & ".join(mapped)
-
-    def scan_append_notes(self, original, addition):
-        original_clean, addition_clean = self._clean_value(original), self._clean_value(addition)
-        if not addition_clean: return original_clean
-        if not original_clean: return addition_clean
-        return f"{original_clean.rstrip()}\n{addition_clean}"
+        return self.gate.missing_tasks(iid)
 
     def scan_collect_new_note(self):
         if not hasattr(self, "scan_focus_notes"): return ""
@@ -595,7 +632,7 @@ class ScanWindow(CTkToplevel):
 
     def scan_build_context_for_iid(self, iid, *, source="manual"):
         context = {
-            "iid": iid, "card_id": self.scan_normalize_card(iid),
+            "iid": iid, "card_id": self.scan_normalize_card(self.scan_tree_get(iid, "card_id") or iid),
             "card_display": self.scan_tree_get(iid, "card_id") or self.scan_normalize_card(iid),
             "name": self.scan_tree_get(iid, "name"), "student_id": self.scan_tree_get(iid, "student_id"),
             "attendance": self.scan_tree_get(iid, "attendance").lower(),
@@ -621,35 +658,58 @@ class ScanWindow(CTkToplevel):
 
     def scan_on_scan(self):
         if self.read_only: return
-        normalized = self.scan_normalize_card(self.scan_entry.get())
+        card_id = self.scan_entry.get()
         self.scan_entry.delete(0, "end")
+        self.scan_submit(card_id)
+
+    def scan_submit(self, card_id):
+        """Run one scan of ``card_id`` through lookup, status and the focus view."""
+        if self.read_only: return
+        normalized = self.scan_normalize_card(card_id)
         if not normalized: return
-        
+        # Absorb double taps before any lookup or focus-view work.
+        if self.scan_dedupe.is_repeat(normalized): return
+        scan_started = self.metrics.start()
+
+        started = self.metrics.start()
         matches = self.scan_lookup_matches(normalized)
+        self.metrics.stop("lookup", started)
+        self._scan_show(normalized, matches, scan_started)
+
+    def scan_submit_routed(self, card_id, rows):
+        """Show a scan the hub router already normalized, deduplicated and looked up (``rows`` from its index)."""
+        if self.read_only: return
+        scan_started = self.metrics.start()
+        self._scan_show(card_id, self._live_rows(card_id, rows), scan_started)
+
+    def _scan_show(self, normalized, matches, scan_started):
         if not matches:
             context = self.scan_build_not_found_context(normalized)
             self.scan_focus_show(context)
-            return
-        
-        if len(matches) > 1:
+        elif len(matches) > 1:
             context = {
                 "card_id": normalized, "card_display": normalized, "name": "Multiple Records Found",
                 "student_id": "", "status": "duplicate", "focus_iids": matches, "skip_filter": True,
             }
             self.scan_focus_show(context)
-            return
-        
-        self.scan_on_open_row(matches[0], source="scan", card_id=normalized)
+        else:
+            self.scan_on_open_row(matches[0], source="scan", card_id=normalized)
+        self.metrics.stop("scan_total", scan_started)
+        # Idle callbacks run after Tk's pending redraws, so this approximates scan-to-paint.
+        if self.metrics.enabled: self.after_idle(self.metrics.stop, "focus_paint", scan_started)
 
     def scan_on_row_double_click(self, event):
         if self.read_only: return
-        scan_iid = self.tree.identify_row(event.y) or (self.tree.selection() and self.tree.selection()[0])
+        tree = event.widget if event.widget in (self.tree, self.focus_tree) else self.tree
+        scan_iid = tree.identify_row(event.y) or (tree.selection() and tree.selection()[0])
         if scan_iid: self.scan_on_open_row(scan_iid, source="manual")
 
     def scan_on_open_row(self, iid, *, source="manual", card_id=None):
         if self.read_only or not self.tree.exists(iid): return
         
+        started = self.metrics.start()
         context = self.scan_build_context_for_iid(iid, source=source)
+        self.metrics.stop("status", started)
         if card_id: context["card_id"] = context["card_display"] = card_id
         
         self.scan_focus_show(context)
@@ -660,51 +720,39 @@ class ScanWindow(CTkToplevel):
     def scan_handle_auto_attend(self, context):
         if not context: return
         tag = self.scan_now_tag()
-        typed = self.scan_collect_new_note()
-        final_note = self.scan_append_notes(context.get("existing_notes", ""), typed)
-        success = self.scan_commit_attendance(context["iid"], "attend", final_note, timestamp=tag)
-        if success:
+        if self.scan_commit_attendance(context["iid"], "attend", context.get("existing_notes", ""), timestamp=tag):
+            self.scan_record_event(context, "attend")
             self.scan_focus_schedule_clear()
 
     def scan_commit_attendance(self, iid, attendance, notes, *, timestamp=None, warn_on_duplicate=False):
         try: return bool(self._set_attendance(iid, attendance, notes, warn_on_duplicate=warn_on_duplicate, timestamp_override=timestamp))
         except Exception as exc: messagebox.showwarning("Attendance Update Failed", str(exc), parent=self); return False
 
-    def scan_focus_on_completed(self):
-        context = self.scan_focus_ctx or {}
-        if not context.get("iid"): return
-        tag = self.scan_now_tag()
-        desc = self.scan_describe_tasks(context.get("missing_tasks", [])) or "task"
-        action_note = f"{tag} Completed {desc} at center."
-        base = self.scan_append_notes(context.get("existing_notes", ""), action_note)
-        typed = self.scan_collect_new_note()
-        final_note = self.scan_append_notes(base, typed)
-        if self.scan_commit_attendance(context["iid"], "attend", final_note, timestamp=tag):
-            self.scan_focus_clear()
+    def scan_typed_addition(self, context):
+        """Text typed into the focus notes box beyond the student's existing notes."""
+        typed, original = self.scan_collect_new_note(), self._clean_value(context.get("existing_notes", ""))
+        if typed == original: return ""
+        return typed[len(original):].strip() if original and typed.startswith(original) else typed
 
-    def scan_focus_on_override(self):
-        context = self.scan_focus_ctx or {}
-        if not context.get("iid"): return
-        tag = self.scan_now_tag()
-        desc = self.scan_describe_tasks(context.get("missing_tasks", [])) or "task"
-        action_note = f"{tag} Attended with override (missing {desc})."
-        base = self.scan_append_notes(context.get("existing_notes", ""), action_note)
-        typed = self.scan_collect_new_note()
-        final_note = self.scan_append_notes(base, typed)
-        if self.scan_commit_attendance(context["iid"], "attend", final_note, timestamp=tag):
-            self.scan_focus_clear()
+    def scan_record_event(self, context, action, text=""):
+        """Log a focus action to the session's event sidecar; the notes cell is left alone."""
+        try: self.events.append(context.get("card_id") or context.get("iid"), action, missing=context.get("missing_tasks", []), text=text)
+        except OSError as exc: messagebox.showwarning("Event Log Failed", str(exc), parent=self)
 
-    def scan_focus_on_deny(self):
+    def _scan_focus_action(self, action, attendance):
         context = self.scan_focus_ctx or {}
-        if not context.get("iid"): return
-        tag = self.scan_now_tag()
-        desc = self.scan_describe_tasks(context.get("missing_tasks", [])) or "requirements"
-        action_note = f"{tag} Denied Entry: No {desc}."
-        base = self.scan_append_notes(context.get("existing_notes", ""), action_note)
-        typed = self.scan_collect_new_note()
-        final_note = self.scan_append_notes(base, typed)
-        if self.scan_commit_attendance(context["iid"], "", final_note, timestamp=tag):
-            self.scan_focus_clear()
+        if not context.get("iid"): return None
+        text = self.scan_typed_addition(context)
+        if not self.scan_commit_attendance(context["iid"], attendance, context.get("existing_notes", ""), timestamp=self.scan_now_tag()): return None
+        self.scan_record_event(context, action, text)
+        self.scan_focus_clear()
+        return context
+
+    def scan_focus_on_completed(self): self._scan_focus_action("complete", "attend")
+
+    def scan_focus_on_override(self): self._scan_focus_action("override", "attend")
+
+    def scan_focus_on_deny(self): self._scan_focus_action("deny", "")
 
     def scan_focus_on_add_student(self):
         if self.read_only: return
@@ -714,16 +762,10 @@ class ScanWindow(CTkToplevel):
         self._launch_add_student_dialog(card_id=card_id, default_notes=typed)
 
     def scan_focus_on_cancel_attendance(self):
-        context = self.scan_focus_ctx or {}
-        if not context.get("iid"): return
-        tag = self.scan_now_tag()
-        action_note = f"{tag} Canceled."
-        base = self.scan_append_notes(context.get("existing_notes", ""), action_note)
-        typed = self.scan_collect_new_note()
-        final_note = self.scan_append_notes(base, typed)
+        context = self._scan_focus_action("cancel", "")
+        if not context: return
         self._cancellations += 1
-        if self.scan_commit_attendance(context["iid"], "", final_note, timestamp=tag):
-            self.scan_focus_clear()
+        self.scan_dedupe.forget(context.get("card_id"))
 
     def _build_stats_strip(self):
         self.stats_frame = CTkFrame(self, fg_color=("#f1f5f9", "#12263a"), corner_radius=10)
@@ -750,29 +792,33 @@ class ScanWindow(CTkToplevel):
         self.tree.configure(style="Treeview")
 
     def _load_existing(self):
-        def pad_card_id(val):
-            val_str = str(val).strip()
-            return val_str.zfill(8) if val_str.isdigit() else val_str
+        import pandas as pd
 
         cols = self.tree["columns"]
-        session_records = {pad_card_id(rec.get("card_id", "")): rec for rec in self.sm.records}
+        roster = self.sm.roster
+        columns = [roster.column(col) if col in roster.fields else [""] * len(roster) for col in cols]
         self._all_iids = []
+        loaded = []
 
-        for _, row in self.df.iterrows():
-            cid = pad_card_id(row.get(self.mapping.get("card_id", "card_id"), ""))
-            rec = session_records.pop(cid, None)
-            values = [self._clean_value(rec.get(col) if rec and col in rec else row.get(self.mapping.get(col, col), "")) for col in cols]
-            self.tree.insert("", "end", iid=cid, values=tuple(values))
-            self._all_iids.append(cid)
-
-        for cid, rec in session_records.items():
-            values = [self._clean_value(rec.get(col, "")) for col in cols]
-            self.tree.insert("", "end", iid=cid, values=tuple(values))
-            self._all_iids.append(cid)
+        for values in zip(*columns):
+            values = list(values)
+            iid = self._unique_iid(self.scan_normalize_card(values[cols.index("card_id")]))
+            self.tree.insert("", "end", iid=iid, values=tuple(values))
+            self._all_iids.append(iid); loaded.append(values); self._index_card(iid, values[cols.index("card_id")])
 
+        # Gate flags are computed once for the whole roster, then kept current per edit.
+        self.gate = GateStatus.from_frame(pd.DataFrame(loaded, columns=list(cols)), self._all_iids, {}, self.restrictions)
         for iid in self._all_iids:
             self._update_row(iid, self.scan_tree_get(iid, "attendance"), self.scan_tree_get(iid, "notes"), self.scan_tree_get(iid, "timestamp"))
 
+    def _unique_iid(self, cid):
+        """Rows sharing a card ID get suffixed iids so duplicates stay visible."""
+        iid, copy_no = cid, 2
+        while self.tree.exists(iid):
+            iid = f"{cid} #{copy_no}"
+            copy_no += 1
+        return iid
+
     def _clean_value(self, value):
         import pandas as pd
         if value is None or (isinstance(value, float) and pd.isna(value)): return ""
@@ -780,16 +826,22 @@ class ScanWindow(CTkToplevel):
         return "" if text.lower() == "nan" else text
 
     def _compute_summary_metrics(self):
-        total = len(self._all_iids)
-        attended = sum(1 for iid in self._all_iids if self.tree.exists(iid) and self.scan_tree_get(iid, "attendance").lower() == "attend")
+        counts = self.gate.counts()
+        total, attended = counts["total"], counts["attended"]
         metrics = {"total": total, "attended": attended, "attendance_rate": f"{(attended / total) * 100:.1f}%" if total else "0%"}
-        if self.restrictions.get("exam"): metrics["missing_exam"] = sum(1 for iid in self._all_iids if self.tree.exists(iid) and not self.scan_tree_get(iid, "exam"))
-        if self.restrictions.get("homework"): metrics["missing_hw"] = sum(1 for iid in self._all_iids if self.tree.exists(iid) and not self.scan_tree_get(iid, "homework") )
+        if self.restrictions.get("exam"): metrics["missing_exam"] = counts["missing_exam"]
+        if self.restrictions.get("homework"): metrics["missing_hw"] = counts["missing_hw"]
         return metrics
 
     def _build_summary_payload(self):
         summary = self._compute_summary_metrics()
-        summary.update({"manual_additions": self._manual_additions, "cancellations": self._cancellations})
+        summary.update({
+            "manual_additions": self._manual_additions,
+            "cancellations": self._cancellations,
+            "repeat_scans": self.scan_dedupe.suppressed,
+            "events": self.events.counts(),
+            "latency": self.metrics.summary(),
+        })
         return summary
 
     def _refresh_stats(self):
@@ -802,24 +854,42 @@ class ScanWindow(CTkToplevel):
 
     def _finalize_and_close(self, status_message=None):
         if status_message is None: status_message = f"Session '{self.sm.name}' saved and closed."
+        mapping = self.mapping
         summary, session_name, session_path, parent, read_only = self._build_summary_payload(), self.sm.name, getattr(self.sm, "session_path", None), self.parent, getattr(self, "read_only", False)
+        if self._metrics_job is not None:
+            self.after_cancel(self._metrics_job); self._metrics_job = None
+        if self._merge_task is not None: self._merge_task.cancel()
+        try: self.metrics.flush(session_name)
+        except OSError: pass
         
         if getattr(self, "scan_focus_window", None): self.scan_focus_window.destroy()
+        payload = dict(session_name=session_name, summary=summary, session_path=session_path, read_only=read_only, mapping=mapping)
+        router = self.router
         if self.winfo_exists(): self.destroy()
         
-        if hasattr(parent, "_refresh_recent_sessions"): parent._refresh_recent_sessions()
-        if getattr(parent, "past_sessions_window", None) and parent.past_sessions_window.winfo_exists(): parent.past_sessions_window.refresh()
         if hasattr(parent, "set_status"): parent.set_status(status_message)
-        if hasattr(parent, "show_session_summary"):
-            parent.after(160, lambda: parent.show_session_summary(session_name=session_name, summary=summary, session_path=session_path, read_only=read_only))
+        # Hub sessions hand their summary to the router, which queues them when several end together.
+        if router is not None: router.detach_window(self, payload)
+        elif hasattr(parent, "show_session_summary"):
+            parent.after(160, lambda: parent.show_session_summary(**payload))
+
+    def _flush_metrics(self):
+        self._metrics_job = None
+        try: self.metrics.flush(self.sm.name)
+        except OSError: pass
+        if self.winfo_exists(): self._metrics_job = self.after(METRICS_FLUSH_MS, self._flush_metrics)
 
     def _on_search_change(self, *_): self._filter_all()
 
     def _filter_all(self):
         query = self._clean_value(self.search_var.get()).lower() if self.search_var else ""
         terms = [term for term in query.split() if term]
+        blocked = set(self.gate.keys_with(BLOCKED)) if self.blocked_only_var is not None and self.blocked_only_var.get() else None
         for iid in self._all_iids:
             if not self.tree.exists(iid): continue
+            if blocked is not None and iid not in blocked:
+                self.tree.detach(iid)
+                continue
             if not terms:
                 self.tree.reattach(iid, '', 'end')
                 continue
@@ -838,16 +908,98 @@ class ScanWindow(CTkToplevel):
         timestamp = timestamp_override or datetime.now().strftime("%d/%m/%Y, %H:%M:%S")
         rec = self._build_record_payload(code, target_attendance, self._clean_value(notes), timestamp)
         
+        started = self.metrics.start()
         try: self.sm.add_record(rec)
         except Exception as exc: messagebox.showwarning("Attendance Update Failed", str(exc), parent=self); return False
+        self.metrics.stop("file_write", started)
         
+        started = self.metrics.start()
         self._update_row(code, target_attendance, notes, timestamp)
+        self.metrics.stop("tree_update", started)
+        started = self.metrics.start()
         self._refresh_stats()
+        self.metrics.stop("stats", started)
         return True
 
+    def _on_bulk_attendance(self, attendance):
+        """Mark every selected row present (or cancel it) with one session write."""
+        if self.read_only: return
+        attend = attendance == "attend"
+        targets = [iid for iid in self.tree.selection() if self.tree.exists(iid) and (self.scan_tree_get(iid, "attendance").lower() == "attend") != attend]
+        if not targets:
+            messagebox.showinfo("Nothing to Update", "Select rows in the table first; rows already in that state are skipped.", parent=self)
+            return
+        verb = "Mark present" if attend else "Cancel attendance for"
+        if len(targets) > 1 and not messagebox.askyesno("Confirm", f"{verb} {len(targets)} students?", parent=self): return
+        self._set_attendance_batch(targets, attendance)
+
+    def _set_attendance_batch(self, codes, attendance):
+        timestamp = datetime.now().strftime("%d/%m/%Y, %H:%M:%S")
+        notes = {code: self.scan_tree_get(code, "notes") for code in codes}
+        batch = [self._build_record_payload(code, attendance, notes[code], timestamp) for code in codes]
+
+        started = self.metrics.start()
+        try: self.sm.add_records(batch)
+        except Exception as exc: messagebox.showwarning("Attendance Update Failed", str(exc), parent=self); return False
+        self.metrics.stop("file_write", started)
+
+        for code in codes: self._update_row(code, attendance, notes[code], timestamp)
+        action = "attend" if attendance == "attend" else "cancel"
+        cards = [self.scan_normalize_card(rec["card_id"]) for rec in batch]
+        try: self.events.extend([(card, action, self.gate.missing_tasks(code), "bulk") for card, code in zip(cards, codes)])
+        except OSError as exc: messagebox.showwarning("Event Log Failed", str(exc), parent=self)
+        if action == "cancel":
+            self._cancellations += len(codes)
+            for card in cards: self.scan_dedupe.forget(card)
+        self._refresh_stats()
+        return True
+
+    def _on_merge_grades(self):
+        if self.read_only or self._merge_task is not None: return
+        self._pause_focus_guard()
+        try: path = filedialog.askopenfilename(parent=self, title="Select Grade File", filetypes=[("Spreadsheets", "*.xlsx *.csv"), ("Excel", "*.xlsx"), ("CSV", "*.csv")])
+        finally: self._resume_focus_guard()
+        if not path: return
+
+        def work(_task):
+            return self.sm.merge_grades(read_data(path))
+
+        self.merge_grades_button.configure(state="disabled", text="Merging..."); self.pb.start()
+        self._merge_task = BackgroundTask(self, work, on_done=self._apply_grade_changes, on_error=self._on_merge_failed, name="merge-grades").start()
+
+    def _end_merge(self):
+        self._merge_task = None
+        self.pb.stop(); self.merge_grades_button.configure(state="normal", text="Merge Grades")
+
+    def _on_merge_failed(self, exc):
+        self._end_merge()
+        title = "Grade File Not Matched" if isinstance(exc, GradeMergeError) else "Merge Failed"
+        messagebox.showerror(title, str(exc), parent=self)
+
+    def _apply_grade_changes(self, result):
+        """Push merged grades into the table and gate flags; the file was already written once."""
+        self._end_merge()
+        changes, unmatched = result
+        tasks = [task for task in ("exam", "homework") if task in changes.columns]
+        updated = 0
+        for card, *grades in changes[["card_id", *tasks]].itertuples(index=False):
+            for iid in self._card_index.get(card, []):
+                if not self.tree.exists(iid): continue
+                values = dict(zip(tasks, grades))
+                for task, grade in values.items():
+                    if task in self.tree["columns"]: self.tree.set(iid, task, grade)
+                if self.focus_tree.exists(iid): self.focus_tree.item(iid, values=self.tree.item(iid, "values"))
+                self.gate.set_grades(iid, **values)
+                updated += 1
+        self._refresh_stats()
+        if self.blocked_only_var is not None and self.blocked_only_var.get(): self._filter_all()
+        message = f"Updated grades for {updated:,} students."
+        if unmatched: message += f"\n{unmatched:,} grade rows did not match any student."
+        messagebox.showinfo("Grades Merged", message, parent=self)
+
     def _build_record_payload(self, code, attendance, notes, timestamp):
         rec = {col: self.scan_tree_get(code, col) for col in ["student_id", "name", "phone", "exam", "homework"] if col in self.tree["columns"]}
-        rec.update({"card_id": code, "attendance": attendance, "notes": notes, "timestamp": timestamp})
+        rec.update({"card_id": self.scan_tree_get(code, "card_id") or code, "attendance": attendance, "notes": notes, "timestamp": timestamp})
         return rec
 
     def _update_row(self, code, attendance, notes, timestamp=None):
@@ -856,7 +1008,9 @@ class ScanWindow(CTkToplevel):
             self.tree.set(code, "attendance", self._clean_value(attendance))
             self.tree.set(code, "notes", self._clean_value(notes))
             if timestamp is not None: self.tree.set(code, "timestamp", self._clean_value(timestamp))
+            if self.focus_tree.exists(code): self.focus_tree.item(code, values=self.tree.item(code, "values"))
         except Exception: pass
+        self.gate.set_attended(code, self._clean_value(attendance).lower() == "attend")
 
     def _on_add_student_flow(self): self._launch_add_student_dialog()
 
@@ -884,22 +1038,25 @@ class ScanWindow(CTkToplevel):
         except Exception as exc: messagebox.showwarning("Unable to add student", str(exc), parent=self); return False
         
         self._manual_additions += 1
+        self.scan_record_event({"card_id": cid}, "add_student")
         row_values = [rec.get(col, "") for col in self.tree["columns"]]
         
         if self.tree.exists(cid): self.tree.item(cid, values=tuple(row_values))
-        else: self.tree.insert("", "end", iid=cid, values=tuple(row_values)); self._all_iids.append(cid)
+        else: self.tree.insert("", "end", iid=cid, values=tuple(row_values)); self._all_iids.append(cid); self._index_card(cid, cid)
+        if self.router is not None: self.router.register_card(self, self.scan_normalize_card(cid))
+        self.gate.set_row(cid, exam=rec.get("exam", ""), homework=rec.get("homework", ""), attendance=rec["attendance"])
         
         self._refresh_stats()
         
         if self.scan_focus_ctx and self.scan_focus_ctx.get("status") == "not_found":
             self.scan_focus_clear()
         
-        self.after(120, self.scan_entry.focus_set)
+        self.after(120, self._return_scan_focus)
         return True
 
     def _next_unknown_card_id(self):
         if not hasattr(self, "_unknown_counter"):
-            existing = [int(r.get("card_id", "").split("Unknown ")[-1]) for r in self.sm.records if str(r.get("card_id", "")).startswith("Unknown ")]
+            existing = [int(card.split("Unknown ")[-1]) for card in self.sm.roster.cards() if card.startswith("Unknown ") and card.split("Unknown ")[-1].isdigit()]
             self._unknown_counter = max(existing, default=0)
         self._unknown_counter += 1
         return f"Unknown {self._unknown_counter}"
@@ -908,6 +1065,10 @@ class ScanWindow(CTkToplevel):
         msg = f"Session '{self.sm.name}' closed (view-only)." if self.read_only else None
         self._finalize_and_close(status_message=msg)
 
+    def end_session(self):
+        """Save and close the session as the End Scan button does."""
+        self._on_end_scan()
+
     def _global_focus_in(self, _event):
         if self._focus_reset_job is not None:
             self.after_cancel(self._focus_reset_job); self._focus_reset_job = None
@@ -925,8 +1086,5 @@ class ScanWindow(CTkToplevel):
         self._focus_reset_job = self.after_idle(self._focus_scan_entry)
 
     def _student_id_or_phone_exists(self, student_id, phone):
-        df = read_data(self.sm.session_path)
-        sid_col, phone_col = self.mapping.get("student_id", "student_id"), self.mapping.get("phone", "phone")
-        id_exists = student_id in df[sid_col].astype(str).values if sid_col in df.columns else False
-        phone_exists = phone in df[phone_col].astype(str).values if phone_col in df.columns else False
-        return id_exists, phone_exists
\ No newline at end of file
+        roster = self.sm.roster
+        return roster.has_value("student_id", student_id), roster.has_value("phone", phone)
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""Lightweight read-only viewer for saved sessions.
+
+Viewing a past session does not need the scan machinery: no session
+manager, focus view, background image or focus guard. The file is read on a
+worker with the fastest reader available, and the table only ever holds the
+rows scrolled into view so far; sorting and searching work on the DataFrame
+and simply restart the paging.
+"""
+import os
+from tkinter import ttk
+
+import customtkinter as ctk
+from customtkinter import CTkButton, CTkEntry, CTkFrame, CTkLabel, CTkToplevel
+
+from core.session_store import read_session
+from ui.dialogs.export_dialog import export_session_with_notes
+from utils.background import BackgroundTask
+from utils.helpers import MIN_VIEWER_SIZE, bring_window_to_front, ensure_initial_size
+
+PAGE_SIZE = 200
+SEARCH_DELAY_MS = 250
+
+
+def read_fast(path):
+    """Read a session as text with the fastest reader installed.
+
+    pyarrow parses CSV on several threads and python-calamine reads XLSX in
+    native code; both are optional. ``read_session`` is the fallback when
+    they are missing or reject a file the normal reader accepts (ragged
+    rows, unusual quoting or encoding).
+    """
+    import pandas as pd
+
+    lower = path.lower()
+    try:
+        if lower.endswith(".csv"):
+            import pyarrow  # noqa: F401
+            return pd.read_csv(path, dtype=str, engine="pyarrow")
+        if lower.endswith(".xlsx"):
+            import python_calamine  # noqa: F401
+            return pd.read_excel(path, dtype=str, engine="calamine")
+    except ImportError:
+        pass
+    except Exception as exc:
+        print(f"Warning: fast reader failed for {os.path.basename(path)}, using the standard reader: {exc}")
+    return read_session(path)
+
+
+class SessionViewer(CTkToplevel):
+    """Read-only table of one session with lazy paging, sorting and search."""
+
+    def __init__(self, parent, session_path, mapping=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.session_path = session_path
+        self.mapping = mapping or {}
+        self.name = os.path.splitext(os.path.basename(session_path))[0]
+        self.df = None
+        self._view = None
+        self._haystack = None
+        self._shown = 0
+        self._sort = None
+        self._search_job = None
+        self.title(f"{self.name} (view only)")
+        self.minsize(*MIN_VIEWER_SIZE)
+        self.after(50, lambda: bring_window_to_front(self))
+
+        header = CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=24, pady=(24, 8))
+        header.grid_columnconfigure(0, weight=1)
+        CTkLabel(header, text=self.name, font=("Arial", 20, "bold"), anchor="w").grid(row=0, column=0, sticky="w")
+        self.search_var = ctk.StringVar()
+        self.search_entry = CTkEntry(header, textvariable=self.search_var, placeholder_text="Search", width=220)
+        self.search_entry.grid(row=0, column=1, sticky="e")
+        # The event log (deny, override, complete) only reaches the notes column on export.
+        self.export_button = CTkButton(header, text="Export with Notes", command=self._export)
+        self.export_button.grid(row=0, column=2, sticky="e", padx=(12, 0))
+        self.search_var.trace_add("write", lambda *_: self._schedule_search())
+
+        self.status_var = ctk.StringVar(value="Loading…")
+        CTkLabel(self, textvariable=self.status_var, font=("Arial", 12), anchor="w").pack(fill="x", padx=24)
+
+        container = CTkFrame(self, fg_color="transparent")
+        container.pack(fill="both", expand=True, padx=24, pady=(8, 24))
+        container.grid_columnconfigure(0, weight=1)
+        container.grid_rowconfigure(0, weight=1)
+        self.tree = ttk.Treeview(container, show="headings", selectmode="browse")
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(container, orient="vertical", command=self.tree.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+        ensure_initial_size(self, min_size=MIN_VIEWER_SIZE)
+        self._load_task = BackgroundTask(self, self._load, on_done=self._on_loaded, on_error=self._on_load_failed, name="session-viewer").start()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _load(self, _task):
+        df = read_fast(self.session_path).fillna("")
+        # One lowercase line per row, so a search is a single vectorized contains().
+        columns = [df[column].astype(str) for column in df.columns]
+        haystack = columns[0].str.cat(columns[1:], sep="\x1f").str.lower() if columns else df.index.to_series().astype(str)
+        return df, haystack
+
+    def _on_loaded(self, result):
+        self.df, self._haystack = result
+        columns = list(self.df.columns)
+        self.tree.configure(columns=columns)
+        for column in columns:
+            self.tree.heading(column, text=str(column), command=lambda c=column: self._sort_by(c))
+            self.tree.column(column, anchor="center", width=120)
+        self._show(self.df)
+
+    def _export(self):
+        export_session_with_notes(self, self.session_path, self.mapping)
+
+    def _on_load_failed(self, exc):
+        self.status_var.set(f"Could not read the session: {exc}")
+
+    def _summary(self):
+        total = len(self.df)
+        text = f"{len(self._view):,} of {total:,} rows" if len(self._view) != total else f"{total:,} rows"
+        att_col = self.mapping.get("attendance", "attendance")
+        if att_col in self.df.columns:
+            attended = int(self.df[att_col].astype(str).str.strip().str.lower().eq("attend").sum())
+            text += f" · {attended:,} attended"
+        return text
+
+    def _show(self, view):
+        self._view = view
+        self._shown = 0
+        self.tree.delete(*self.tree.get_children())
+        self.tree.yview_moveto(0)
+        self._append_page()
+        self.status_var.set(self._summary())
+
+    def _append_page(self):
+        page = self._view.iloc[self._shown:self._shown + PAGE_SIZE]
+        for values in page.itertuples(index=False, name=None):
+            self.tree.insert("", "end", values=values)
+        self._shown += len(page)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Fetch the next page once the last rows come into view.
+        if self._view is not None and self._shown < len(self._view) and float(last) > 0.9:
+            self._append_page()
+
+    def _sort_by(self, column):
+        import pandas as pd
+
+        if self.df is None:
+            return
+        ascending = not (self._sort == (column, True))
+        self._sort = (column, ascending)
+        values = self._view[column].astype(str)
+        numbers = pd.to_numeric(values, errors="coerce")
+        # Numeric columns sort by value, everything else case-insensitively.
+        key = numbers if numbers.notna().sum() >= values.ne("").sum() else values.str.lower()
+        order = key.sort_values(ascending=ascending, kind="stable", na_position="last").index
+        self._show(self._view.loc[order])
+
+    def _schedule_search(self):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY_MS, self._apply_search)
+
+    def _apply_search(self):
+        self._search_job = None
+        if self.df is None:
+            return
+        query = self.search_var.get().strip().lower()
+        view = self.df[self._haystack.str.contains(query, regex=False)] if query else self.df
+        if self._sort is not None:
+            column, ascending = self._sort
+            self._sort = (column, not ascending)
+            self._view = view
+            self._sort_by(column)
+        else:
+            self._show(view)
+
+    def _on_close(self):
+        self._load_task.cancel()
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self.destroy()
@@ -15,7 +15,7 @@ from customtkinter import (
     CTkTabview,
     CTkToplevel,
 )
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
 from utils.helpers import (
     MAPPING_FILE,
@@ -26,6 +26,7 @@ from utils.helpers import (
     bring_window_to_front,
     ensure_initial_size,
 )
+from utils.images import BackgroundFitter, load_original
 
 class SettingsWindow(CTkToplevel):
     mapping_placeholder = "-- Select --"
@@ -35,10 +36,11 @@ class SettingsWindow(CTkToplevel):
         self.title("Settings")
         self.minsize(*MIN_SETTINGS_SIZE)
 
-        self.original_bg = Image.open(SETTINGS_BG_FILE)
+        self.original_bg = load_original(SETTINGS_BG_FILE)
         self.bg_photo = ImageTk.PhotoImage(self.original_bg)
         self.bg_label = CTkLabel(self, text="", image=self.bg_photo)
         self.bg_label.place(relwidth=1, relheight=1)
+        self.bg_fitter = BackgroundFitter(self, self.bg_label, SETTINGS_BG_FILE, lambda image, _size: ImageTk.PhotoImage(image))
         self.bind("<Configure>", self._on_resize)
         self.after(50, lambda: bring_window_to_front(self))
 
@@ -68,6 +70,11 @@ class SettingsWindow(CTkToplevel):
         self.var_exam = ctk.BooleanVar(value=SETTINGS["restrictions"].get("exam", False))
         self.var_homework = ctk.BooleanVar(value=SETTINGS["restrictions"].get("homework", False))
         self.var_file_type = ctk.StringVar(value=SETTINGS.get("file_type", "xlsx"))
+        self.var_session_storage = ctk.StringVar(value=SETTINGS.get("session_storage", "delta"))
+        self.var_archive_days = ctk.StringVar(value=str(SETTINGS.get("archive_after_days", 90)))
+        self.var_dedupe_ttl = ctk.StringVar(value=f"{SETTINGS.get('scan_dedupe_ttl', 3.0):g}")
+        self.var_scan_metrics = ctk.BooleanVar(value=SETTINGS.get("scan_metrics", True))
+        self.var_stall_threshold = ctk.StringVar(value=str(SETTINGS.get("stall_threshold_ms", 100)))
 
         self.template_status_var = ctk.StringVar()
 
@@ -81,11 +88,13 @@ class SettingsWindow(CTkToplevel):
         self.stage_tab = self.tabview.add("Stage & Center")
         self.restrictions_tab = self.tabview.add("Restrictions")
         self.filetype_tab = self.tabview.add("File Type")
+        self.scanning_tab = self.tabview.add("Scanning")
 
         self._build_template_tab()
         self._build_stage_tab()
         self._build_restrictions_tab()
         self._build_filetype_tab()
+        self._build_scanning_tab()
 
         btn_frame = CTkFrame(self, fg_color="transparent")
         btn_frame.pack(side="bottom", fill="x", padx=24, pady=20)
@@ -107,10 +116,7 @@ class SettingsWindow(CTkToplevel):
         ensure_initial_size(self, min_size=MIN_SETTINGS_SIZE)
 
     def _on_resize(self, event):
-        if event.widget is self:
-            resized = self.original_bg.resize((event.width, event.height), Image.LANCZOS)
-            self.bg_photo = ImageTk.PhotoImage(resized)
-            self.bg_label.configure(image=self.bg_photo)
+        self.bg_fitter.on_configure(event)
 
     def _build_template_tab(self):
         CTkLabel(
@@ -336,6 +342,67 @@ class SettingsWindow(CTkToplevel):
             value="xlsx",
             command=self._update_apply_state
         ).pack(anchor="w", pady=6)
+        CTkLabel(
+            self.filetype_tab,
+            text="Choose how new sessions are saved."
+        ).pack(anchor="w", pady=(18, 8))
+        CTkRadioButton(
+            self.filetype_tab,
+            text="Compact (shared roster + changes only)",
+            variable=self.var_session_storage,
+            value="delta",
+            command=self._update_apply_state
+        ).pack(anchor="w", pady=6)
+        CTkRadioButton(
+            self.filetype_tab,
+            text="Full spreadsheet per session",
+            variable=self.var_session_storage,
+            value="full",
+            command=self._update_apply_state
+        ).pack(anchor="w", pady=6)
+        CTkLabel(
+            self.filetype_tab,
+            text="Compact sessions use the roster snapshot in Data archive/rosters. Use Export with Notes for a standalone spreadsheet.",
+            font=("Arial", 11)
+        ).pack(anchor="w")
+        archive_row = CTkFrame(self.filetype_tab, fg_color="transparent")
+        archive_row.pack(fill="x", pady=(18, 6))
+        CTkLabel(archive_row, text="Suggest archiving sessions untouched for (days):").pack(side="left")
+        CTkEntry(archive_row, textvariable=self.var_archive_days, width=80).pack(side="left", padx=(12, 0))
+        CTkLabel(
+            self.filetype_tab,
+            text="Used as the default by \"Archive Old…\" in Past Sessions.",
+            font=("Arial", 11)
+        ).pack(anchor="w")
+
+    def _build_scanning_tab(self):
+        CTkLabel(
+            self.scanning_tab,
+            text="Tune how the scan window reacts to card taps."
+        ).pack(anchor="w", pady=(12, 8))
+        row = CTkFrame(self.scanning_tab, fg_color="transparent")
+        row.pack(fill="x", pady=6)
+        CTkLabel(row, text="Ignore repeat taps within (seconds):").pack(side="left")
+        CTkEntry(row, textvariable=self.var_dedupe_ttl, width=80).pack(side="left", padx=(12, 0))
+        CTkLabel(
+            self.scanning_tab,
+            text="Set to 0 to process every tap.",
+            font=("Arial", 11)
+        ).pack(anchor="w")
+        CTkCheckBox(
+            self.scanning_tab,
+            text="Record scan timing metrics",
+            variable=self.var_scan_metrics
+        ).pack(anchor="w", pady=(12, 6))
+        stall_row = CTkFrame(self.scanning_tab, fg_color="transparent")
+        stall_row.pack(fill="x", pady=6)
+        CTkLabel(stall_row, text="Log UI freezes longer than (ms):").pack(side="left")
+        CTkEntry(stall_row, textvariable=self.var_stall_threshold, width=80).pack(side="left", padx=(12, 0))
+        CTkLabel(
+            self.scanning_tab,
+            text="Set to 0 to turn the freeze log off. Takes effect after a restart.",
+            font=("Arial", 11)
+        ).pack(anchor="w")
 
     def _apply_settings(self):
         if not self._is_mapping_valid():
@@ -350,6 +417,21 @@ class SettingsWindow(CTkToplevel):
             "homework": bool(self.var_homework.get()),
         }
         file_type = self.var_file_type.get()
+        try:
+            dedupe_ttl = float(self.var_dedupe_ttl.get().strip() or 0)
+        except ValueError:
+            dedupe_ttl = -1
+        if dedupe_ttl < 0:
+            messagebox.showerror("Invalid Value", "Repeat tap window must be a number of seconds (0 or more).", parent=self)
+            return
+        stall_text = self.var_stall_threshold.get().strip() or "0"
+        if not stall_text.isdigit():
+            messagebox.showerror("Invalid Value", "Freeze threshold must be a whole number of milliseconds.", parent=self)
+            return
+        archive_text = self.var_archive_days.get().strip()
+        if not archive_text.isdigit() or int(archive_text) < 1:
+            messagebox.showerror("Invalid Value", "Archive age must be a whole number of days (1 or more).", parent=self)
+            return
 
         try:
             with open(MAPPING_FILE, "w", encoding="utf-8") as file:
@@ -358,6 +440,11 @@ class SettingsWindow(CTkToplevel):
             SETTINGS["center_options"] = center_options
             SETTINGS["restrictions"].update(restrictions)
             SETTINGS["file_type"] = file_type
+            SETTINGS["session_storage"] = self.var_session_storage.get()
+            SETTINGS["archive_after_days"] = int(archive_text)
+            SETTINGS["scan_dedupe_ttl"] = dedupe_ttl
+            SETTINGS["scan_metrics"] = bool(self.var_scan_metrics.get())
+            SETTINGS["stall_threshold_ms"] = int(stall_text)
             with open(SETTINGS_FILE, "w", encoding="utf-8") as file:
                 json.dump(SETTINGS, file, indent=2)
         except OSError as exc:
@@ -0,0 +1,103 @@
+"""Process-wide cache of asset images and shared ``CTkImage`` icons.
+
+Every window asks this module for its icons instead of opening files itself.
+Images are keyed by ``(name, size, tint)``: the decoded PIL image is shared
+and so is the ``CTkImage`` built from it, so a second scan window or the
+focus view never reads ``ASSETS_DIR`` again. ``preload`` decodes all assets
+on a background thread at startup.
+"""
+import os
+import threading
+
+import customtkinter as ctk
+from PIL import Image
+
+from utils.helpers import ASSETS_DIR
+from utils.images import load_original
+
+PRELOAD_SIZES = [(24, 24), (48, 48)]
+
+_lock = threading.Lock()
+_images = {}
+_icons = {}
+
+
+def _normalize_tint(tint):
+    if tint is None or isinstance(tint, str):
+        return tint
+    return tuple(tint)
+
+
+def _tinted(image, color):
+    """Recolor a white-on-transparent icon to ``color`` keeping its alpha."""
+    solid = Image.new("RGBA", image.size, color)
+    solid.putalpha(image.getchannel("A"))
+    return solid
+
+
+def get_image(name, size=None, tint=None):
+    """Shared PIL image for asset ``name``, resized to ``size`` and tinted if asked.
+
+    ``tint`` is a single color. Raises ``FileNotFoundError`` for unknown assets.
+    """
+    key = (name, tuple(size) if size else None, tint)
+    with _lock:
+        image = _images.get(key)
+    if image is not None:
+        return image
+    image = load_original(os.path.join(ASSETS_DIR, name))
+    if size and tuple(size) != image.size:
+        image = image.resize(tuple(size), Image.Resampling.LANCZOS)
+    if tint:
+        image = _tinted(image.convert("RGBA"), tint)
+    with _lock:
+        return _images.setdefault(key, image)
+
+
+def get_icon(name, size=(24, 24), tint=None):
+    """Shared ``CTkImage`` for asset ``name``.
+
+    ``tint`` may be one color or a ``(light, dark)`` pair. Missing assets
+    yield a transparent placeholder so a lost file never breaks a window.
+    """
+    tint = _normalize_tint(tint)
+    key = (name, tuple(size), tint)
+    icon = _icons.get(key)
+    if icon is not None:
+        return icon
+    light_tint, dark_tint = tint if isinstance(tint, tuple) else (tint, tint)
+    try:
+        light = get_image(name, size, light_tint)
+        dark = light if dark_tint == light_tint else get_image(name, size, dark_tint)
+    except FileNotFoundError:
+        print(f"Warning: Icon '{name}' not found at '{ASSETS_DIR}'")
+        light = dark = Image.new("RGBA", tuple(size), (0, 0, 0, 0))
+    icon = ctk.CTkImage(light_image=light, dark_image=dark, size=tuple(size))
+    _icons[key] = icon
+    return icon
+
+
+def preload(sizes=PRELOAD_SIZES):
+    """Decode every image in ``ASSETS_DIR`` on a background thread.
+
+    Icon-sized PNGs are also resized to each of ``sizes`` up front.
+    """
+    def work():
+        try:
+            names = sorted(os.listdir(ASSETS_DIR))
+        except OSError:
+            return
+        for name in names:
+            if not name.lower().endswith((".png", ".jpg", ".jpeg")):
+                continue
+            try:
+                original = get_image(name)
+                if name.lower().endswith(".png") and max(original.size) <= 256:
+                    for size in sizes:
+                        get_image(name, size)
+            except OSError:
+                continue
+
+    thread = threading.Thread(target=work, name="preload-assets", daemon=True)
+    thread.start()
+    return thread
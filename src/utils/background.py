@@ -0,0 +1,89 @@
+"""Run slow work off the Tk thread and hand its results back to the UI.
+
+Tk widgets must only be touched from the thread running ``mainloop``, so a
+``BackgroundTask`` never calls back from its worker. The worker puts
+progress, results and errors on a queue and the owning widget polls it with
+``after()``; every callback therefore runs on the Tk thread.
+"""
+import queue
+import threading
+
+
+class BackgroundTask:
+    """Run ``work(task)`` on a daemon thread.
+
+    ``work`` may call ``task.report(value)`` to send progress and should
+    check ``task.cancelled`` between steps. ``on_done(result)``,
+    ``on_error(exc)`` and ``on_progress(value)`` run on the Tk thread; none
+    of them run once the task is cancelled or the widget is destroyed.
+    """
+
+    def __init__(self, widget, work, *, on_done=None, on_error=None, on_progress=None, poll_ms=50, name="background-task"):
+        self.widget = widget
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.poll_ms = poll_ms
+        self.name = name
+        self._events = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = None
+        self._job = None
+        self.finished = False
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._job = self.widget.after(self.poll_ms, self._poll)
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def report(self, value):
+        if not self.cancelled:
+            self._events.put(("progress", value))
+
+    def _run(self):
+        try:
+            result = self.work(self)
+        except Exception as exc:
+            self._events.put(("error", exc))
+        else:
+            self._events.put(("done", result))
+
+    def _poll(self):
+        self._job = None
+        if self.cancelled:
+            return
+        try:
+            if not self.widget.winfo_exists():
+                return
+        except Exception:
+            return
+        while True:
+            try:
+                kind, value = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if self.on_progress:
+                    self.on_progress(value)
+                continue
+            self.finished = True
+            callback = self.on_done if kind == "done" else self.on_error
+            if callback:
+                callback(value)
+            return
+        self._job = self.widget.after(self.poll_ms, self._poll)
@@ -0,0 +1,187 @@
+"""Watch a folder and report file changes to the Tk thread in coalesced batches.
+
+On Linux the folder is watched with inotify through ``ctypes``; elsewhere,
+or when inotify is unavailable, a thread compares directory snapshots every
+couple of seconds. Either backend only collects the names that changed. The
+owning widget drains them with ``after()`` every ``coalesce_ms``, stats just
+those files and hands ``on_changes`` a list of
+``(kind, path, modified, size)`` tuples, ``kind`` being ``"added"``,
+``"modified"`` or ``"removed"``. A burst of writes to one file is reported
+once.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def scan_folder(folder, suffixes=()):
+    """``{path: (modified, size)}`` for the matching, non-hidden files directly in ``folder``."""
+    snapshot = {}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.startswith(".") and (not suffixes or entry.name.lower().endswith(suffixes)):
+                    stats = entry.stat()
+                    snapshot[entry.path] = (stats.st_mtime, stats.st_size)
+    except OSError:
+        pass
+    return snapshot
+
+
+class FolderWatcher:
+    def __init__(self, widget, folder, on_changes, *, suffixes=(), coalesce_ms=300, poll_interval=2.0):
+        self.widget = widget
+        self.folder = folder
+        self.on_changes = on_changes
+        self.suffixes = tuple(suffixes)
+        self.coalesce_ms = coalesce_ms
+        self.poll_interval = poll_interval
+        self.snapshot = {}
+        self.backend = None
+        self._dirty = set()
+        self._rescan = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._job = None
+        self._fd = None
+
+    def start(self):
+        self.snapshot = scan_folder(self.folder, self.suffixes)
+        libc = _load_inotify()
+        if libc is not None and self._open_inotify(libc):
+            self.backend = "inotify"
+            target = self._run_inotify
+        else:
+            self.backend = "polling"
+            target = self._run_polling
+        self._thread = threading.Thread(target=target, name="folder-watcher", daemon=True)
+        self._thread.start()
+        self._job = self.widget.after(self.coalesce_ms, self._drain)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _mark(self, names=(), rescan=False):
+        with self._lock:
+            self._dirty.update(names)
+            self._rescan = self._rescan or rescan
+
+    def _open_inotify(self, libc):
+        fd = libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if fd < 0:
+            return False
+        if libc.inotify_add_watch(fd, os.fsencode(self.folder), WATCH_MASK) < 0:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def _run_inotify(self):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([self._fd], [], [], 0.5)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                names, offset = set(), 0
+                while offset + EVENT_HEADER.size <= len(data):
+                    _wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                    offset += EVENT_HEADER.size
+                    raw = data[offset:offset + length].split(b"\0", 1)[0]
+                    offset += length
+                    if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF | IN_MOVE_SELF):
+                        self._mark(rescan=True)
+                    elif raw:
+                        names.add(os.path.join(self.folder, os.fsdecode(raw)))
+                if names:
+                    self._mark(names)
+        finally:
+            os.close(self._fd)
+
+    def _run_polling(self):
+        previous = dict(self.snapshot)
+        while not self._stop.wait(self.poll_interval):
+            current = scan_folder(self.folder, self.suffixes)
+            changed = {path for path in current.keys() | previous.keys() if current.get(path) != previous.get(path)}
+            if changed:
+                self._mark(changed)
+            previous = current
+
+    def _drain(self):
+        self._job = None
+        if self._stop.is_set():
+            return
+        try:
+            if not self.widget.winfo_exists():
+                return
+        except Exception:
+            return
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            rescan, self._rescan = self._rescan, False
+        if rescan:
+            current = scan_folder(self.folder, self.suffixes)
+            dirty |= current.keys() | self.snapshot.keys()
+        changes = []
+        for path in sorted(dirty):
+            if os.path.basename(path).startswith(".") or (self.suffixes and not path.lower().endswith(self.suffixes)):
+                continue
+            try:
+                stats = os.stat(path)
+                info = (stats.st_mtime, stats.st_size)
+            except OSError:
+                info = None
+            previous = self.snapshot.get(path)
+            if info is None:
+                if previous is not None:
+                    del self.snapshot[path]
+                    changes.append(("removed", path, None, None))
+            elif info != previous:
+                self.snapshot[path] = info
+                changes.append(("modified" if previous else "added", path, *info))
+        if changes:
+            try:
+                self.on_changes(changes)
+            except Exception as exc:
+                print(f"Warning: folder change handler failed: {exc}")
+        self._job = self.widget.after(self.coalesce_ms, self._drain)
@@ -3,8 +3,6 @@ import os
 import sys
 from pathlib import Path
 
-import pandas as pd
-
 def get_runtime_base():
     """Return the folder containing the script or executable."""
     if getattr(sys, 'frozen', False):
@@ -55,13 +53,24 @@ ARCHIVE_FOLDER   = os.path.join(BASE_FOLDER, 'Data archive')
 MAPPING_FILE     = os.path.join(ARCHIVE_FOLDER, 'column_map.json')
 SETTINGS_FILE    = os.path.join(ARCHIVE_FOLDER, 'app_settings.json')
 LAST_DATA_FILE   = os.path.join(ARCHIVE_FOLDER, 'last_data.json')
+SCAN_METRICS_FILE = os.path.join(ARCHIVE_FOLDER, 'scan_metrics.json')
+STALL_LOG_FILE   = os.path.join(ARCHIVE_FOLDER, 'ui_stalls.log')
+IMAGE_CACHE_FOLDER = os.path.join(ARCHIVE_FOLDER, 'cache')
+STUDENT_REGISTRY_FILE = os.path.join(ARCHIVE_FOLDER, 'student_registry.csv.gz')
+ROSTERS_FOLDER   = os.path.join(ARCHIVE_FOLDER, 'rosters')
+STAGING_FOLDER   = os.path.join(ARCHIVE_FOLDER, 'staging')
+SESSION_STATS_FILE = os.path.join(ARCHIVE_FOLDER, 'session_stats.json')
+SESSION_ARCHIVE_FOLDER = os.path.join(ARCHIVE_FOLDER, 'sessions')
+SESSION_EXTENSIONS = (".session", ".csv", ".xlsx")
 
 MIN_DASHBOARD_SIZE     = (980, 640)
 MIN_SCAN_SIZE          = (900, 560)
 MIN_SETTINGS_SIZE      = (640, 480)
 MIN_SESSION_SETUP_SIZE = (360, 240)
 MIN_SUMMARY_SIZE       = (380, 320)
-MIN_PAST_SESSIONS_SIZE = (720, 480)
+MIN_PAST_SESSIONS_SIZE = (980, 520)
+MIN_ROUTER_SIZE        = (560, 360)
+MIN_VIEWER_SIZE        = (720, 480)
 for folder in (DATA_FOLDER, SESSIONS_FOLDER, ARCHIVE_FOLDER):
     os.makedirs(folder, exist_ok=True)
 
@@ -72,7 +81,12 @@ SETTINGS = {
         "Zayed", "Haram", "Dokki", "Maadi", "15 May"
     ],
     "restrictions": {"exam": True, "homework": True},
-    "file_type": "xlsx"
+    "file_type": "xlsx",
+    "session_storage": "delta",
+    "archive_after_days": 90,
+    "scan_dedupe_ttl": 3.0,
+    "scan_metrics": True,
+    "stall_threshold_ms": 100,
 }
 
 
@@ -119,6 +133,8 @@ def ensure_initial_size(window, *, min_size=None, padding=(0, 0)):
     return width, height
 
 def read_data(path, **kwargs):
+    # pandas is imported on first use to keep it out of application startup.
+    import pandas as pd
     if path.lower().endswith(".xlsx"):
         return pd.read_excel(path, dtype=str, **kwargs)
     else:
@@ -0,0 +1,184 @@
+"""Shared decoding and scaling of window background images.
+
+Originals are decoded once per process and shared by every window. Scaled
+variants are kept in a small in-memory LRU and on disk under
+``Data archive/cache/backgrounds`` so common window sizes never need a
+LANCZOS pass after the first run. ``BackgroundFitter`` debounces
+``<Configure>`` storms: while the user drags, a cheap bilinear preview is
+shown at most every ``preview_ms``; the high quality image is applied once
+the geometry has settled.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from utils.helpers import IMAGE_CACHE_FOLDER
+
+COMMON_SIZES = [(1280, 720), (1366, 768), (1440, 900), (1536, 864), (1600, 900), (1920, 1080)]
+MEMORY_CACHE_SIZE = 12
+
+_lock = threading.Lock()
+_originals = {}
+_scaled = OrderedDict()
+
+
+def load_original(path):
+    """Return the fully decoded image at ``path``, decoding it at most once."""
+    with _lock:
+        image = _originals.get(path)
+    if image is not None:
+        return image
+    image = Image.open(path)
+    image.load()
+    with _lock:
+        return _originals.setdefault(path, image)
+
+
+def _disk_path(path, size):
+    stats = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stats.st_mtime_ns}|{stats.st_size}|{size[0]}x{size[1]}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+    ext = os.path.splitext(path)[1].lower() or ".png"
+    return os.path.join(IMAGE_CACHE_FOLDER, "backgrounds", f"{digest}{ext}")
+
+
+def _remember(key, image):
+    with _lock:
+        _scaled[key] = image
+        _scaled.move_to_end(key)
+        while len(_scaled) > MEMORY_CACHE_SIZE:
+            _scaled.popitem(last=False)
+
+
+def cached_scaled(path, size):
+    """Return the high quality variant if it is already in memory, else None."""
+    key = (path, tuple(size))
+    with _lock:
+        image = _scaled.get(key)
+        if image is not None:
+            _scaled.move_to_end(key)
+        return image
+
+
+def get_scaled(path, size):
+    """High quality ``size`` variant of ``path`` from memory, disk or a fresh LANCZOS resize."""
+    size = (max(int(size[0]), 1), max(int(size[1]), 1))
+    image = cached_scaled(path, size)
+    if image is not None:
+        return image
+    disk_path = _disk_path(path, size)
+    image = None
+    if os.path.exists(disk_path):
+        try:
+            image = Image.open(disk_path)
+            image.load()
+        except OSError:
+            image = None
+    if image is None:
+        image = load_original(path).resize(size, Image.Resampling.LANCZOS)
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            tmp_path = f"{disk_path}.tmp"
+            image.save(tmp_path, format=load_original(path).format or "PNG", quality=90)
+            os.replace(tmp_path, disk_path)
+        except OSError:
+            pass
+    _remember((path, size), image)
+    return image
+
+
+def get_preview(path, size):
+    """Fast, lower quality resize used while a window is being dragged."""
+    size = (max(int(size[0]), 1), max(int(size[1]), 1))
+    return load_original(path).resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+
+def prewarm(paths, sizes=COMMON_SIZES):
+    """Decode ``paths`` and build their common-size variants on a background thread."""
+    def work():
+        for path in paths:
+            try:
+                load_original(path)
+                for size in sizes:
+                    if not os.path.exists(_disk_path(path, size)):
+                        get_scaled(path, size)
+            except OSError:
+                continue
+
+    thread = threading.Thread(target=work, name="prewarm-backgrounds", daemon=True)
+    thread.start()
+    return thread
+
+
+class BackgroundFitter:
+    """Keep ``label`` showing ``path`` scaled to ``window`` with debounced resizes.
+
+    ``make_image(pil_image, size)`` turns a PIL image into whatever the label
+    accepts (a ``CTkImage`` or an ``ImageTk.PhotoImage``).
+    """
+
+    def __init__(self, window, label, path, make_image, *, settle_ms=150, preview_ms=80):
+        self.window = window
+        self.label = label
+        self.path = path
+        self.make_image = make_image
+        self.settle_ms = settle_ms
+        self.preview_ms = preview_ms
+        self.photo = None
+        self._applied_size = None
+        self._pending_size = None
+        self._settle_job = None
+        self._preview_job = None
+
+    def on_configure(self, event):
+        if event.widget is not self.window:
+            return
+        size = (event.width, event.height)
+        if size == self._applied_size or size == self._pending_size:
+            return
+        self._pending_size = size
+        cached = cached_scaled(self.path, size)
+        if cached is not None:
+            self._cancel_jobs()
+            self._show(cached, size, final=True)
+            return
+        if self._settle_job is not None:
+            self.window.after_cancel(self._settle_job)
+        self._settle_job = self.window.after(self.settle_ms, self._apply_final)
+        if self._preview_job is None:
+            self._preview_job = self.window.after(self.preview_ms, self._apply_preview)
+
+    def _apply_preview(self):
+        self._preview_job = None
+        size = self._pending_size
+        if size is None or self._settle_job is None:
+            return
+        self._show(get_preview(self.path, size), size, final=False)
+
+    def _apply_final(self):
+        self._settle_job = None
+        size = self._pending_size
+        if size is None:
+            return
+        self._show(get_scaled(self.path, size), size, final=True)
+
+    def _show(self, image, size, *, final):
+        if not self.label.winfo_exists():
+            return
+        self.photo = self.make_image(image, size)
+        self.label.configure(image=self.photo)
+        if final:
+            self._applied_size = size
+            self._pending_size = None
+
+    def _cancel_jobs(self):
+        for job in (self._settle_job, self._preview_job):
+            if job is not None:
+                try:
+                    self.window.after_cancel(job)
+                except Exception:
+                    pass
+        self._settle_job = self._preview_job = None
@@ -0,0 +1,136 @@
+"""Low-overhead timing probes for the scan path.
+
+Probes are used in pairs around a stage::
+
+    started = metrics.start()
+    ...
+    metrics.stop("lookup", started)
+
+When the collector is disabled ``start`` returns ``0.0`` and ``stop`` returns
+immediately, so a probe costs two method calls (well under a microsecond).
+Samples land in log-scaled histograms that can be summarized for the session
+summary and written to ``Data archive/scan_metrics.json``.
+"""
+import json
+import os
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+from utils.helpers import SCAN_METRICS_FILE
+
+# Bucket upper bounds in seconds: 10 per decade from 1 microsecond to 100 seconds.
+BUCKET_BOUNDS = [10 ** (exponent / 10) * 1e-6 for exponent in range(0, 81)]
+MAX_RUNS_KEPT = 50
+
+STAGE_LABELS = {
+    "scan_total": "Whole scan",
+    "lookup": "Card lookup",
+    "status": "Status check",
+    "file_write": "File write",
+    "tree_update": "Table update",
+    "stats": "Stats refresh",
+    "focus_render": "Focus view",
+    "focus_paint": "Scan to paint",
+}
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the ``pct`` percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        target = pct / 100 * self.count
+        running = 0
+        for index, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target and bucket_count:
+                return min(BUCKET_BOUNDS[index], self.max) if index < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class ScanMetrics:
+    """Stage histograms for one run of a session (one open-to-close of its scan window)."""
+
+    def __init__(self, enabled=True, clock=time.perf_counter):
+        self.enabled = bool(enabled)
+        self._clock = clock
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.stages = {}
+        self._dirty = False
+
+    def start(self):
+        return self._clock() if self.enabled else 0.0
+
+    def stop(self, stage, started):
+        if not started:
+            return
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram()
+        histogram.add(self._clock() - started)
+        self._dirty = True
+
+    def summary(self):
+        return {stage: histogram.summary() for stage, histogram in self.stages.items()}
+
+    def flush(self, session_name, path=SCAN_METRICS_FILE):
+        """Write this run's summary into the shared metrics file if anything changed.
+
+        Entries are keyed by session name and run start, so reopening a
+        session adds a run instead of replacing the earlier one.
+        """
+        if not self._dirty:
+            return False
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        runs = data.get("sessions")
+        if not isinstance(runs, dict):
+            runs = {}
+        key = f"{session_name} @ {self.started}"
+        runs.pop(key, None)
+        runs[key] = {
+            "session": session_name,
+            "started": self.started,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "stages": self.summary(),
+        }
+        while len(runs) > MAX_RUNS_KEPT:
+            runs.pop(next(iter(runs)))
+        data["sessions"] = runs
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+        self._dirty = False
+        return True
@@ -0,0 +1,99 @@
+"""Watchdog that detects Tk event-loop stalls and logs where they happened.
+
+The Tk thread posts a heartbeat through ``after()`` every ``interval_ms``.
+A daemon thread checks how late the latest heartbeat is; once it is more
+than ``threshold_ms`` overdue the main thread's stack is captured with
+``sys._current_frames`` and, when the loop comes back, the stall is written
+to a rotating log with its duration and the innermost frames.
+"""
+import logging
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
+
+from utils.helpers import STALL_LOG_FILE
+
+LOG_MAX_BYTES = 512 * 1024
+LOG_BACKUPS = 3
+
+
+def _stall_logger(path):
+    logger = logging.getLogger("scanner.ui_stalls")
+    if not logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class EventLoopWatchdog:
+    def __init__(self, root, *, threshold_ms=100, interval_ms=50, max_frames=12, log_path=STALL_LOG_FILE):
+        self.root = root
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.max_frames = max_frames
+        self.log_path = log_path
+        self.stall_count = 0
+        self._interval_ms = interval_ms
+        self._last_beat = time.monotonic()
+        self._pending = None
+        self._job = None
+        self._main_ident = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Begin heartbeats; must be called from the Tk thread."""
+        if self._thread is not None:
+            return
+        self._main_ident = threading.get_ident()
+        self._logger = _stall_logger(self.log_path)
+        self._beat()
+        self._thread = threading.Thread(target=self._watch, name="ui-stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+        if not self._stop.is_set():
+            self._job = self.root.after(self._interval_ms, self._beat)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval / 2):
+            last_beat = self._last_beat
+            if self._pending is None:
+                lag = time.monotonic() - last_beat - self.interval
+                if lag > self.threshold:
+                    self._pending = (last_beat, self._capture_stack())
+            elif last_beat != self._pending[0]:
+                started, stack = self._pending
+                self._pending = None
+                self._report(last_beat - started - self.interval, stack)
+
+    def _capture_stack(self):
+        frame = sys._current_frames().get(self._main_ident)
+        if frame is None:
+            return []
+        return traceback.extract_stack(frame)[-self.max_frames:]
+
+    def _report(self, duration, stack):
+        self.stall_count += 1
+        lines = [f"UI stall {duration * 1000:.0f} ms (threshold {self.threshold * 1000:.0f} ms)"]
+        for entry in reversed(stack):
+            lines.append(f"    {entry.filename}:{entry.lineno} in {entry.name}")
+        try:
+            self._logger.info("\n".join(lines))
+        except Exception:
+            pass